@@ -1,21 +1,38 @@
 """
 Simple API interface for the Image File Namer.
 
-This module provides a simplified interface for programmatic usage.
+This module provides a simplified interface for programmatic usage. Models are
+shared through the process-wide model registry, so repeated calls (and several
+API objects) load the OCR and NER models only once.
 """
 
+import threading
 from pathlib import Path
-from typing import Union
+from typing import Dict, List, Optional, Tuple, Union
 
 from src import ImageFileNamer, BatchProcessor
-from src.utils import setup_dependencies
+from src.utils import get_model_registry, setup_dependencies
+
+# Dependency setup runs once per process
+_setup_lock = threading.Lock()
+_setup_done = False
+
+
+def _setup_once() -> bool:
+    """Run setup_dependencies unless it already succeeded in this process."""
+    global _setup_done
+    with _setup_lock:
+        if not _setup_done:
+            _setup_done = setup_dependencies()
+        return _setup_done
 
 
 class ImageFileNamerAPI:
     """
     Simple API interface for the Image File Namer.
 
-    This class provides a simplified interface for common use cases.
+    This class provides a simplified interface for common use cases. It is safe
+    to share between threads.
     """
 
     def __init__(self, auto_setup: bool = True):
@@ -23,27 +40,78 @@ class ImageFileNamerAPI:
         Initialize the API.
 
         Args:
-            auto_setup: Automatically setup dependencies if True
+            auto_setup: Automatically setup dependencies if True (once per process)
         """
+        self._lock = threading.Lock()
         self._namer = None
-        self._batch_processor = None
+        # Rate limit -> batch processor and the lock serializing its runs
+        self._batch_processors: Dict[int, Tuple[BatchProcessor, threading.Lock]] = {}
 
         if auto_setup:
-            setup_dependencies()
+            _setup_once()
 
     @property
     def namer(self) -> ImageFileNamer:
         """Get or create the ImageFileNamer instance."""
-        if self._namer is None:
-            self._namer = ImageFileNamer()
-        return self._namer
+        with self._lock:
+            if self._namer is None:
+                self._namer = ImageFileNamer()
+            return self._namer
 
     @property
     def batch_processor(self) -> BatchProcessor:
         """Get or create the BatchProcessor instance."""
-        if self._batch_processor is None:
-            self._batch_processor = BatchProcessor()
-        return self._batch_processor
+        return self._get_batch_processor(100)[0]
+
+    def _get_batch_processor(
+        self, rate_limit: int
+    ) -> Tuple[BatchProcessor, threading.Lock]:
+        """Get or create the batch processor for a rate limit."""
+        with self._lock:
+            if rate_limit not in self._batch_processors:
+                self._batch_processors[rate_limit] = (
+                    BatchProcessor(rate_limit_per_minute=rate_limit),
+                    threading.Lock(),
+                )
+            return self._batch_processors[rate_limit]
+
+    def warm_up(self):
+        """Load the OCR and NER models now instead of on the first image."""
+        self.namer.load_models()
+
+    @staticmethod
+    def loaded_models() -> List[str]:
+        """
+        List the models loaded in this process.
+
+        Returns:
+            Descriptions of the loaded models
+        """
+        return get_model_registry().loaded()
+
+    @staticmethod
+    def unload_models(name: Optional[str] = None) -> int:
+        """
+        Free the memory of loaded models; they are reloaded when next needed.
+
+        Args:
+            name: Model to unload ("docling" or "spacy"), all models if None
+
+        Returns:
+            Number of models unloaded
+        """
+        return get_model_registry().evict(name)
+
+    def close(self):
+        """Stop the threads of the namer and batch processors created by this API."""
+        with self._lock:
+            if self._namer is not None:
+                self._namer.close()
+                self._namer = None
+            for processor, lock in self._batch_processors.values():
+                with lock:
+                    processor.close()
+            self._batch_processors.clear()
 
     def rename_single_image(self, image_path: Union[str, Path]) -> str:
         """
@@ -57,6 +125,22 @@ class ImageFileNamerAPI:
         """
         return self.namer.generate_new_filename(str(image_path))
 
+    def name_image(self, image_path: Union[str, Path]) -> Dict[str, str]:
+        """
+        Generate a new filename for an image and return the output of every stage.
+
+        Args:
+            image_path: Path to the image file
+
+        Returns:
+            Dictionary with the ``filename`` (without extension) and the
+            ``ocr_text``, ``description``, ``keywords`` and ``ner_words`` it was
+            built from
+        """
+        analysis = self.namer.analyze_image(str(image_path))
+        filename = self.namer.build_filename(str(image_path), **analysis).strip()
+        return {"filename": filename, **analysis}
+
     def process_folder(
         self,
         source_folder: Union[str, Path],
@@ -71,8 +155,27 @@ class ImageFileNamerAPI:
             target_folder: Folder to save renamed images
             rate_limit: Maximum images to process per minute
         """
-        processor = BatchProcessor(rate_limit_per_minute=rate_limit)
-        processor.process_images(source_folder, target_folder)
+        processor, lock = self._get_batch_processor(rate_limit)
+        with lock:
+            processor.process_images(source_folder, target_folder)
+
+
+_default_api: Optional[ImageFileNamerAPI] = None
+_default_api_lock = threading.Lock()
+
+
+def get_api() -> ImageFileNamerAPI:
+    """
+    Get the API instance shared by the convenience functions.
+
+    Returns:
+        The process-wide ImageFileNamerAPI
+    """
+    global _default_api
+    with _default_api_lock:
+        if _default_api is None:
+            _default_api = ImageFileNamerAPI()
+        return _default_api
 
 
 # Convenience functions for quick usage
@@ -86,8 +189,7 @@ def rename_image(image_path: Union[str, Path]) -> str:
     Returns:
         Generated filename
     """
-    api = ImageFileNamerAPI()
-    return api.rename_single_image(image_path)
+    return get_api().rename_single_image(image_path)
 
 
 def process_images(
@@ -103,5 +205,4 @@ def process_images(
         target_folder: Target folder for renamed images
         rate_limit: Processing rate limit
     """
-    api = ImageFileNamerAPI()
-    api.process_folder(source_folder, target_folder, rate_limit)
+    get_api().process_folder(source_folder, target_folder, rate_limit)
@@ -0,0 +1,6 @@
+"""
+Offline benchmarks for the Image File Namer.
+
+``run_suite.py`` runs all scenarios against fake OCR and LLM backends and writes
+a JSON report; the ``bench_*.py`` scripts are focused micro-benchmarks.
+"""
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled date scanner on multi-megabyte OCR text.
+
+Compares the previous approach (re.findall with every pattern over the whole
+text, then taking the last match) with DateScanner in "first" and "last" mode,
+for dates near the start, in the middle and near the end of the text, and for
+a text without any date.
+
+Usage:
+    python benchmarks/bench_dates.py
+    python benchmarks/bench_dates.py --megabytes 8 --repeat 3
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils import DateScanner
+
+# The patterns as they were before they were combined into one scanner
+LEGACY_DATE_PATTERNS = [
+    r"(?<!\d)(20\d{2}-\d{2}-\d{2})(?!\d)",
+    r"(?<!\d)(20\d{6})(?!\d)",
+    r"(?<!\d)(20\d{2}-\d{1,2}-\d{1,2})(?!\d)",
+    r"(?<!\d)(\d{1,2}/\d{1,2}/20\d{2})(?!\d)",
+    r"(?<!\d)(\d{1,2}\.\d{1,2}\.20\d{2})(?!\d)",
+]
+
+_LINES = [
+    "Reply Retweet Like Share",
+    "1.2K Retweets 45K Likes 3h",
+    "Order #123456789 Subtotal $23.99",
+    "Call 555-1234 or visit www.example.com",
+    "Version 2.10.3 build 20991",
+    "Trurnp says the exarnple was darnage control",
+]
+
+
+def legacy_find_dates(text: str):
+    matches = []
+    for pattern in LEGACY_DATE_PATTERNS:
+        matches.extend(re.findall(pattern, text))
+    return matches
+
+
+def make_text(rng: random.Random, megabytes: float, date_at: float = None) -> str:
+    """OCR-like filler text with one date inserted at a relative position."""
+    lines = []
+    size = 0
+    while size < megabytes * 1024 * 1024:
+        line = rng.choice(_LINES)
+        lines.append(line)
+        size += len(line) + 1
+    if date_at is not None:
+        lines.insert(int(len(lines) * date_at), "Posted 2023-05-17 14:02")
+    return "\n".join(lines)
+
+
+def timed(func, text: str, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark date extraction")
+    parser.add_argument("--megabytes", type=float, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    scanner = DateScanner()
+    cases = [("date at 1%", 0.01), ("date at 50%", 0.5), ("date at 99%", 0.99), ("no date", None)]
+
+    print(f"{args.megabytes} MB of OCR text, best of {args.repeat}")
+    print(f"{'case':<14} {'findall x5':>11} {'first':>9} {'last':>9}  last date")
+    for name, position in cases:
+        text = make_text(rng, args.megabytes, position)
+        legacy, found = timed(legacy_find_dates, text, args.repeat)
+        first, _ = timed(scanner.first, text, args.repeat)
+        last, date = timed(scanner.last, text, args.repeat)
+        print(
+            f"{name:<14} {legacy * 1000:>9.1f}ms {first * 1000:>7.1f}ms "
+            f"{last * 1000:>7.1f}ms  {date.date if date else None} "
+            f"(findall: {found[-1] if found else None})"
+        )
+
+
+if __name__ == "__main__":
+    main()
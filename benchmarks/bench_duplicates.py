@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark exact-duplicate detection.
+
+Writes a temporary folder of random files with photo-like sizes, a share of
+them exact copies, then times DuplicateFinder (size, partial hash, full hash)
+against hashing every file completely, and checks both find the same copies.
+
+Usage:
+    python benchmarks/bench_duplicates.py
+    python benchmarks/bench_duplicates.py --files 5000 --duplicates 0.15 --mean-size 500000
+"""
+import argparse
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils import DuplicateFinder
+
+
+def hash_all(paths):
+    """Find duplicates by hashing every file completely."""
+    seen = {}
+    duplicates = 0
+    for path in paths:
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(chunk)
+        if digest.hexdigest() in seen:
+            duplicates += 1
+        else:
+            seen[digest.hexdigest()] = path
+    return duplicates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark exact-duplicate detection")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--duplicates", type=float, default=0.15)
+    parser.add_argument("--mean-size", type=int, default=300_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        originals = []
+        for i in range(args.files):
+            if originals and rng.random() < args.duplicates:
+                data = rng.choice(originals)
+            else:
+                size = max(1, int(rng.expovariate(1 / args.mean_size)))
+                data = os.urandom(size)
+                originals.append(data)
+            path = Path(tmp) / f"{i:06d}.jpg"
+            path.write_bytes(data)
+            paths.append(str(path))
+        total = sum(os.path.getsize(path) for path in paths)
+        print(f"Wrote {args.files} files ({total / 1e6:.0f} MB)")
+
+        start = time.perf_counter()
+        expected = hash_all(paths)
+        print(f"full hash of every file  {time.perf_counter() - start:7.3f} s")
+
+        start = time.perf_counter()
+        finder = DuplicateFinder()
+        found = sum(finder.find_original(path) is not None for path in paths)
+        print(f"DuplicateFinder          {time.perf_counter() - start:7.3f} s")
+
+        print(f"Found {found}/{expected} duplicates")
+        return 0 if found == expected else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
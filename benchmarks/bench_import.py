@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark the import time of the package and the CLI startup.
+
+Each statement runs in a fresh interpreter, so nothing is cached between runs.
+Besides the time, the check fails if a heavy dependency (spaCy, Docling, ollama,
+tqdm, torch) was imported: those must only be loaded when first used.
+
+Usage:
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --runs 10 --max-ms 500
+    python benchmarks/bench_import.py --importtime "from src import BatchProcessor"
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("spacy", "docling", "ollama", "httpx", "tqdm", "torch")
+
+STATEMENTS = [
+    "import src",
+    "import src.config",
+    "from src import BatchProcessor",
+    "from src import ImageFileNamer",
+    "from src.processors import ContentProcessor, NERProcessor, AsyncContentProcessor",
+    "from src.processors import NERProcessor; NERProcessor()",
+    "import main",
+    "import api",
+]
+
+# Run in the child: time the statement, then report which heavy modules it loaded
+CHILD = """
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def time_statement(statement: str):
+    """Run a statement in a new interpreter and return (seconds, heavy modules)."""
+    code = CHILD.format(statement=statement, heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    heavy = output[1].split(",") if len(output) > 1 else []
+    return float(output[0]), heavy
+
+
+def time_help() -> float:
+    """Wall time of ``python main.py --help``, interpreter startup included."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "main.py", "--help"],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+def print_importtime(statement: str, top: int):
+    """Print the slowest imports of a statement according to -X importtime."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    print(f"Slowest imports of: {statement}")
+    for cumulative, module in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms {module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark package import time")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per statement")
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=None,
+        help="Fail if the median import time of a statement exceeds this",
+    )
+    parser.add_argument(
+        "--importtime",
+        metavar="STATEMENT",
+        help="Show the slowest imports of a statement instead",
+    )
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.importtime:
+        print_importtime(args.importtime, args.top)
+        return 0
+
+    failed = False
+    for statement in STATEMENTS:
+        times = []
+        heavy = []
+        for _ in range(args.runs):
+            seconds, heavy = time_statement(statement)
+            times.append(seconds * 1000)
+        median = statistics.median(times)
+        note = ""
+        if heavy:
+            note = f"  imported {', '.join(heavy)}"
+            failed = True
+        if args.max_ms is not None and median > args.max_ms:
+            note += f"  over {args.max_ms:.0f} ms"
+            failed = True
+        print(f"{median:8.1f} ms  {statement}{note}")
+
+    help_ms = statistics.median(time_help() * 1000 for _ in range(args.runs))
+    print(f"{help_ms:8.1f} ms  python main.py --help (wall time)")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark near-duplicate lookups in the perceptual-hash index.
+
+Fills a temporary NearDuplicateIndex with random fingerprints, then times
+lookups of hashes a few bits away from indexed ones (hits) and of random
+hashes (misses), and checks every hit was found.
+
+Usage:
+    python benchmarks/bench_near_duplicates.py
+    python benchmarks/bench_near_duplicates.py --entries 100000 --queries 2000 --max-distance 6
+
+Filling the index with a million entries takes about a minute.
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import NEAR_DUPLICATE_MAX_DISTANCE
+from src.utils import Fingerprint, NearDuplicateIndex
+
+ASPECT = 1440 / 3120
+
+
+def flip_bits(value: int, count: int, rng: random.Random) -> int:
+    for bit in rng.sample(range(64), count):
+        value ^= 1 << bit
+    return value
+
+
+def time_lookups(index: NearDuplicateIndex, queries):
+    """Run lookups, returning the durations in microseconds and the results."""
+    durations = []
+    results = []
+    for phash in queries:
+        start = time.perf_counter()
+        results.append(index.find(Fingerprint(phash, ASPECT)))
+        durations.append((time.perf_counter() - start) * 1e6)
+    return durations, results
+
+
+def report(label: str, durations):
+    durations = sorted(durations)
+    p90 = durations[min(len(durations) - 1, int(len(durations) * 0.9))]
+    p99 = durations[min(len(durations) - 1, int(len(durations) * 0.99))]
+    print(
+        f"{label:<8} median {statistics.median(durations):8.1f} µs   "
+        f"p90 {p90:8.1f} µs   p99 {p99:8.1f} µs"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the near-duplicate index")
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--max-distance", type=int, default=NEAR_DUPLICATE_MAX_DISTANCE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = NearDuplicateIndex(
+            Path(tmp) / "near_duplicates.sqlite3", max_distance=args.max_distance
+        )
+        hashes = [rng.getrandbits(64) for _ in range(args.entries)]
+        start = time.perf_counter()
+        batch = 50_000
+        for offset in range(0, args.entries, batch):
+            index.add_many(
+                (f"{offset + i:064x}", Fingerprint(phash, ASPECT))
+                for i, phash in enumerate(hashes[offset : offset + batch])
+            )
+        print(
+            f"Indexed {args.entries} fingerprints in {time.perf_counter() - start:.1f} s "
+            f"(max distance {args.max_distance})"
+        )
+
+        targets = rng.sample(range(args.entries), args.queries)
+        near = [
+            flip_bits(hashes[i], rng.randint(0, args.max_distance), rng) for i in targets
+        ]
+        durations, results = time_lookups(index, near)
+        found = sum(
+            any(content_hash == f"{i:064x}" for _, content_hash in matches)
+            for i, matches in zip(targets, results)
+        )
+        report("hits", durations)
+        durations, _ = time_lookups(
+            index, [rng.getrandbits(64) for _ in range(args.queries)]
+        )
+        report("misses", durations)
+        print(f"Found {found}/{args.queries} near-duplicates")
+        return 0 if found == args.queries else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark spaCy NER throughput: one document at a time vs. batched nlp.pipe.
+
+Compares the full en_core_web_sm pipeline called per document (the old
+behaviour), the trimmed NER-only pipeline called per document, and the trimmed
+pipeline through NERProcessor.get_words_of_interest_batch.
+
+Usage:
+    python benchmarks/bench_ner.py
+    python benchmarks/bench_ner.py --docs 1000 --batch-size 128 --n-process 2
+    python benchmarks/bench_ner.py --corpus ocr_texts.txt
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import spacy
+
+from src.config import SPACY_MODEL
+from src.processors import NERProcessor
+
+# Fragments resembling what OCR returns for screenshots of news, posts and receipts
+_HEADLINES = [
+    "Joe Biden meets Emmanuel Macron in Paris to discuss NATO funding",
+    "Apple announces the iPhone 15 at its Cupertino headquarters",
+    "Hurricane Ian makes landfall in Florida, thousands without power",
+    "Elon Musk says Tesla will open a new factory in Berlin",
+    "The Supreme Court rules on the Texas immigration law",
+    "Taylor Swift's Eras Tour breaks records in Los Angeles",
+    "Microsoft and OpenAI expand partnership in Seattle",
+    "Protesters gather outside the European Parliament in Brussels",
+]
+_NOISE = [
+    "Reply Retweet Like Share",
+    "12:45 PM · Mar 3, 2023 · Twitter for iPhone",
+    "Subtotal $23.99 Tax $1.92 Total $25.91 VISA ****1234",
+    "Sponsored · Learn more",
+    "|||| ~~ »» ©",
+    "Follow @nypost for more",
+    "Read more at www.example.com/news/article-2023",
+]
+
+
+def generate_corpus(docs: int, seed: int = 0) -> list:
+    """Generate OCR-like texts mixing headlines, UI chrome and noise."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(docs):
+        parts = rng.sample(_HEADLINES, rng.randint(1, 3))
+        parts += rng.sample(_NOISE, rng.randint(1, 4))
+        rng.shuffle(parts)
+        corpus.append("\n".join(parts))
+    return corpus
+
+
+def load_corpus(path: str) -> list:
+    """Load one text per blank-line separated block."""
+    text = Path(path).read_text(encoding="utf-8")
+    return [block.strip() for block in text.split("\n\n") if block.strip()]
+
+
+def report(name: str, seconds: float, docs: int):
+    print(f"{name:<32} {seconds:8.3f} s {docs / seconds:10.1f} docs/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark spaCy NER throughput")
+    parser.add_argument("--docs", type=int, default=500, help="Generated documents")
+    parser.add_argument("--corpus", type=str, help="File with texts separated by blank lines")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--n-process", type=int, default=1)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else generate_corpus(args.docs)
+    print(f"{len(corpus)} documents, {sum(map(len, corpus))} characters")
+
+    full_nlp = spacy.load(SPACY_MODEL)
+    processor = NERProcessor()
+    print(f"Full pipeline:    {full_nlp.pipe_names}")
+    print(f"Trimmed pipeline: {processor.nlp.pipe_names}")
+    print("-" * 64)
+
+    start = time.perf_counter()
+    full_ents = [[ent.text for ent in full_nlp(text).ents] for text in corpus]
+    report("full pipeline, per doc", time.perf_counter() - start, len(corpus))
+
+    start = time.perf_counter()
+    trimmed_ents = [[ent.text for ent in processor.nlp(text).ents] for text in corpus]
+    report("NER only, per doc", time.perf_counter() - start, len(corpus))
+
+    start = time.perf_counter()
+    single = [processor.get_words_of_interest(text) for text in corpus]
+    report("get_words_of_interest", time.perf_counter() - start, len(corpus))
+
+    start = time.perf_counter()
+    batched = processor.get_words_of_interest_batch(
+        corpus, batch_size=args.batch_size, n_process=args.n_process
+    )
+    report("get_words_of_interest_batch", time.perf_counter() - start, len(corpus))
+
+    print("-" * 64)
+    same_ents = sum(a == b for a, b in zip(full_ents, trimmed_ents))
+    print(f"Entities identical to full pipeline: {same_ents}/{len(corpus)}")
+    same_words = sum(set(a.split()) == set(b.split()) for a, b in zip(single, batched))
+    print(f"Batched words identical to per doc:  {same_words}/{len(corpus)}")
+
+
+if __name__ == "__main__":
+    main()
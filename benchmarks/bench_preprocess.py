@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark screenshot preprocessing: the three separate scripts vs. one fused pass.
+
+The separate path reproduces crop.py, scale_hor_50.py and resize_images.py run
+one after the other (three decodes and three JPEG encodes per image); the fused
+path applies the same TransformChain with one draft decode and one encode, in a
+single process and over a process pool.
+
+Usage:
+    python benchmarks/bench_preprocess.py
+    python benchmarks/bench_preprocess.py --images 64 --width 1440 --height 3120 --workers 4
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image, ImageDraw
+
+from src.utils import CropPreset, TransformChain, transform_folder
+
+CROP = CropPreset.from_settings(
+    "Demo1", {"left": 60, "upper": 1212, "right": "width - 60", "lower": "height - 1296"}
+)
+
+
+def generate_images(directory: Path, count: int, size, seed: int):
+    """Write JPEG screenshots with text-like stripes."""
+    rng = random.Random(seed)
+    for i in range(count):
+        image = Image.new("RGB", size, (rng.randrange(256), 255, 255))
+        draw = ImageDraw.Draw(image)
+        for y in range(0, size[1], 24):
+            draw.rectangle((40, y, rng.randrange(80, size[0] - 40), y + 12), fill=(20, 20, 20))
+        image.save(directory / f"screenshot_{i:04d}.jpg", "JPEG", quality=90)
+
+
+def run_separate(source: Path, workdir: Path, chain: TransformChain):
+    """Crop, then scale horizontally, then downscale, saving a JPEG each time."""
+    steps = [
+        TransformChain(crop=chain.crop, quality=75),
+        TransformChain(scale_x=chain.scale_x, quality=75),
+        TransformChain(
+            downscale=chain.downscale,
+            downscale_min_side=chain.downscale_min_side,
+            quality=chain.quality,
+        ),
+    ]
+    for step_index, step in enumerate(steps):
+        target = workdir / f"separate_{step_index}"
+        target.mkdir()
+        for path in sorted(source.iterdir()):
+            with Image.open(path) as image:
+                box, size = step.geometry(image.size)
+                result = image.convert("RGB").crop(box).resize(size, Image.Resampling.LANCZOS)
+                result.save(target / path.name, "JPEG", quality=step.quality)
+        source = target
+
+
+def timed(label: str, count: int, func):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:7.2f} s  {count / elapsed:7.1f} images/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fused image preprocessing")
+    parser.add_argument("--images", type=int, default=32)
+    parser.add_argument("--width", type=int, default=1440)
+    parser.add_argument("--height", type=int, default=3120)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    chain = TransformChain(crop=CROP, scale_x=0.5, downscale=0.5, quality=70)
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        source = workdir / "source"
+        source.mkdir()
+        generate_images(source, args.images, (args.width, args.height), args.seed)
+        print(f"{args.images} images of {args.width}x{args.height}, chain: {chain}")
+
+        timed("separate scripts", args.images, lambda: run_separate(source, workdir, chain))
+        timed(
+            "fused, 1 process",
+            args.images,
+            lambda: transform_folder(source, workdir / "fused_1", chain, workers=1),
+        )
+        timed(
+            f"fused, {args.workers} processes",
+            args.images,
+            lambda: transform_folder(
+                source, workdir / "fused_n", chain, workers=args.workers
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark FilenameBuilder.sanitize_filename against the size of words_to_remove.
+
+Compares the previous implementation (one IGNORECASE re.sub per word to remove)
+with the single-pass word removal, and checks that both give identical output.
+
+Usage:
+    python benchmarks/bench_sanitize.py
+    python benchmarks/bench_sanitize.py --sizes 100 1000 10000 --texts 200
+"""
+import argparse
+import random
+import re
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.filename_builder import FilenameBuilder
+from src.utils import WordList, remove_duplicate_words, sanitize_filename_basic
+
+
+def legacy_sanitize_filename(filename: str, words_to_remove) -> str:
+    """sanitize_filename as it was before the single-pass word removal."""
+    filename = sanitize_filename_basic(filename)
+    filename = remove_duplicate_words(filename)
+    for word in words_to_remove:
+        regex_pattern = r"\s*\b" + re.escape(word) + r"\b\s*"
+        filename = re.sub(regex_pattern, " ", filename, flags=re.IGNORECASE)
+    filename = re.sub(r" +", " ", filename)
+    return filename.strip()
+
+
+def random_word(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 9)))
+
+
+def make_texts(rng: random.Random, vocabulary, count: int):
+    """Keyword strings like the ones passed to sanitize_filename."""
+    texts = []
+    for _ in range(count):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(5, 25))]
+        words = [
+            word.upper() if rng.random() < 0.2 else word.capitalize()
+            if rng.random() < 0.2 else word
+            for word in words
+        ]
+        if rng.random() < 0.3:
+            words.append(rng.choice(vocabulary) + "'s")
+        texts.append(" ".join(words))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark word removal scaling")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--texts", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'words':>8} {'legacy ms/text':>15} {'new ms/text':>12} {'speedup':>8} identical")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            vocabulary = list({random_word(rng) for _ in range(size * 2)})
+            stopwords = rng.sample(vocabulary, min(size, len(vocabulary)))
+            # A few phrase entries, which still go through a regex each
+            stopwords += ["new york", "o'brien"]
+            path = Path(directory) / f"words_to_remove_{size}.txt"
+            path.write_text("\n".join(stopwords), encoding="utf-8")
+
+            builder = FilenameBuilder()
+            builder._words_to_remove = WordList(path)
+            words_to_remove = builder.words_to_remove
+            texts = make_texts(rng, vocabulary + ["New York", "O'Brien"], args.texts)
+
+            start = time.perf_counter()
+            expected = [legacy_sanitize_filename(text, words_to_remove) for text in texts]
+            legacy = (time.perf_counter() - start) / len(texts)
+
+            builder.sanitize_filename(texts[0])  # compile outside the timing
+            start = time.perf_counter()
+            actual = [builder.sanitize_filename(text) for text in texts]
+            new = (time.perf_counter() - start) / len(texts)
+
+            identical = sum(a == b for a, b in zip(expected, actual))
+            print(
+                f"{len(words_to_remove):>8} {legacy * 1000:>15.3f} {new * 1000:>12.3f} "
+                f"{legacy / new:>7.1f}x {identical}/{len(texts)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Equivalence checks and benchmark for the OCR text cleanup engine.
+
+Compares the fused OCRTextCleaner / clean_ocr_text with the previous
+implementations of remove_gibberish, fix_common_ocr_mistakes and
+sanitize_filename_basic (kept below as reference), first for identical output
+on generated and adversarial texts, then for speed on long OCR dumps. Exits
+with status 1 if any output differs.
+
+Usage:
+    python benchmarks/bench_text_cleanup.py
+    python benchmarks/bench_text_cleanup.py --cases 5000 --dump-lines 20000
+"""
+import argparse
+import contextlib
+import io
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import ILLEGAL_CHARS, OCR_CORRECTIONS
+from src.utils import (
+    OCRTextCleaner,
+    clean_ocr_text,
+    fix_common_ocr_mistakes,
+    remove_gibberish,
+    sanitize_filename_basic,
+)
+
+
+# Reference implementations, as they were before the compiled engine
+
+
+def legacy_fix_common_ocr_mistakes(text: str, corrections=OCR_CORRECTIONS) -> str:
+    for mistake, correction in corrections.items():
+        text = text.replace(mistake, correction)
+    text = re.sub(r"\d+[KMh]", "", text)
+    text = re.sub(r"\b\w\b", "", text)
+    text = re.sub(r"\s{2,}", " ", text).strip()
+    text = re.sub(r"https?://\S+", "", text)
+    return text
+
+
+def legacy_remove_gibberish(text: str) -> str:
+    pattern = r"\b(?!\w*'[a-z])(([qxzj]{2,})|([bcdfghjklmnpqrstvwxyz]*[aeiouy]{3,}[bcdfghjklmnpqrstvwxyz]*)|([aeiouy]*[bcdfghjklmnpqrstvwxyz]{5,}[aeiouy]*))\b"
+    matches = re.findall(pattern, text)
+    if matches:
+        print("Potential OCR gibberish detected:", matches)
+    cleaned_text = re.sub(pattern, "", text)
+    return cleaned_text.strip()
+
+
+def legacy_sanitize_filename_basic(filename: str) -> str:
+    for char in ILLEGAL_CHARS:
+        filename = filename.replace(char, "")
+    filename = re.sub(r" +", " ", filename)
+    return filename.strip()
+
+
+def legacy_clean(text: str, corrections=OCR_CORRECTIONS) -> str:
+    return legacy_sanitize_filename_basic(
+        legacy_fix_common_ocr_mistakes(legacy_remove_gibberish(text), corrections)
+    )
+
+
+# Test inputs
+
+_WORDS = [
+    "Trurnp", "OAnon", "Bíden", "exarnple", "YouTuhe", "the", "a", "I", "news",
+    "12K", "3h", "45M", "views", "https://t.co/abc", "http://x.y/z?q=1",
+    "queue", "zzqq", "strngths", "rhythm", "don't", "it's", "aeiou", "ok",
+    "Representalives", "COVID-19", "U.S.", "(AP)", "—", "•", "$5", "#tag",
+    "@user", "x", "7", "1Kb", "Trurnpp", "5http://a.b", "_", "naïve", "Mr.Smith",
+]
+_SEPARATORS = [" ", " ", " ", "  ", "\n", "\t", " \n ", "\n\n", " ", ""]
+
+
+def random_text(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(0, 30)):
+        parts.append(rng.choice(_WORDS))
+        parts.append(rng.choice(_SEPARATORS))
+    if rng.random() < 0.5:
+        parts.insert(0, rng.choice(_SEPARATORS))
+    return "".join(parts)
+
+
+def ocr_dump(rng: random.Random, lines: int) -> str:
+    """A long OCR dump of a scrolled feed: the same UI chrome over and over."""
+    chrome = [
+        "Reply Retweet Like Share", "12:45 PM · Mar 3, 2023 · Twitter for iPhone",
+        "1.2K Retweets 45K Likes", "Show this thread", "Promoted",
+        "https://t.co/Xyz123 5h", "Follow @nypost",
+    ]
+    content = [
+        "Trurnp says the exarnple was darnage control",
+        "Representalives vote on the bill today",
+        "Bíden meets leaders in Brussels zzqq",
+        "YouTuhe removes OAnon channels strngths",
+    ]
+    return "\n".join(
+        rng.choice(chrome) if rng.random() < 0.7 else rng.choice(content)
+        for _ in range(lines)
+    )
+
+
+def quietly(func, *args):
+    """Call func and capture what it prints."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = func(*args)
+    return result, output.getvalue()
+
+
+def check_equivalence(texts) -> int:
+    # Corrections containing spaces make the engine fall back to whole-text cleaning
+    corrections = {**OCR_CORRECTIONS, "Mr.Smith": "Mr. Smith"}
+    fallback = OCRTextCleaner(corrections=corrections)
+    checks = [
+        ("remove_gibberish", legacy_remove_gibberish, remove_gibberish),
+        ("fix_common_ocr_mistakes", legacy_fix_common_ocr_mistakes, fix_common_ocr_mistakes),
+        ("sanitize_filename_basic", legacy_sanitize_filename_basic, sanitize_filename_basic),
+        ("clean_ocr_text", legacy_clean, clean_ocr_text),
+        ("clean (fallback)", lambda text: legacy_clean(text, corrections), fallback.clean),
+    ]
+
+    failures = 0
+    for name, expected_func, actual_func in checks:
+        mismatches = 0
+        for text in texts:
+            expected = quietly(expected_func, text)
+            actual = quietly(actual_func, text)
+            if expected != actual:
+                mismatches += 1
+                if mismatches <= 3:
+                    print(f"  {name} differs for {text!r}:\n    {expected}\n    {actual}")
+        print(f"{name:<26} {len(texts) - mismatches}/{len(texts)} identical")
+        failures += mismatches
+    return failures
+
+
+def timed(make_func, text, repeat: int) -> float:
+    """Best time of several runs, calling make_func() for the function to time."""
+    best = float("inf")
+    for _ in range(repeat):
+        func = make_func()
+        start = time.perf_counter()
+        quietly(func, text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and benchmark OCR text cleanup")
+    parser.add_argument("--cases", type=int, default=2000, help="Generated test texts")
+    parser.add_argument("--dump-lines", type=int, default=5000, help="Lines per OCR dump")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = [random_text(rng) for _ in range(args.cases)]
+    texts += ["", " ", "\n", "a", "  Trurnp  ", "x y z", "https://a.b c", "1K\n\n2M"]
+    texts.append(ocr_dump(rng, 200))
+
+    print("Equivalence with the previous implementation:")
+    failures = check_equivalence(texts)
+
+    dump = ocr_dump(rng, args.dump_lines)
+    print(f"\nOCR dump: {args.dump_lines} lines, {len(dump)} characters (best of {args.repeat})")
+    legacy = timed(lambda: legacy_clean, dump, args.repeat)
+    engine = timed(lambda: OCRTextCleaner().clean, dump, args.repeat)
+    cached = timed(lambda: clean_ocr_text, dump, args.repeat)
+    print(f"{'previous functions':<26} {legacy * 1000:8.2f} ms")
+    print(f"{'clean_ocr_text (cold)':<26} {engine * 1000:8.2f} ms  {legacy / engine:5.1f}x")
+    print(f"{'clean_ocr_text (warm)':<26} {cached * 1000:8.2f} ms  {legacy / cached:5.1f}x")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
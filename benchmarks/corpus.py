@@ -0,0 +1,157 @@
+"""
+Synthetic image and OCR corpus for the benchmarks.
+
+The corpus is a folder of small PNG images with file names like the ones
+screenshots and phone photos get, plus a ``manifest.json`` holding the OCR text,
+description and keywords the fake backends return for each image.
+"""
+
+import json
+import random
+import struct
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Union
+
+MANIFEST_NAME = "manifest.json"
+
+_HEADLINES = [
+    "Joe Biden meets Emmanuel Macron in Paris to discuss NATO funding",
+    "Apple announces the iPhone 15 at its Cupertino headquarters",
+    "Hurricane Ian makes landfall in Florida, thousands without power",
+    "Elon Musk says Tesla will open a new factory in Berlin",
+    "The Supreme Court rules on the Texas immigration law",
+    "Taylor Swift's Eras Tour breaks records in Los Angeles",
+    "Microsoft and OpenAI expand partnership in Seattle",
+    "Protesters gather outside the European Parliament in Brussels",
+    "Trurnp says the exarnple was darnage control",
+    "YouTuhe removes OAnon channels after Representalives vote",
+]
+_CHROME = [
+    "Reply Retweet Like Share",
+    "1.2K Retweets 45K Likes 3h",
+    "Show this thread",
+    "Sponsored · Learn more",
+    "Follow @nypost for more",
+    "https://t.co/Xyz123",
+    "|||| ~~ »» ©",
+    "Subtotal $23.99 Tax $1.92 Total $25.91",
+]
+_DATES = ["12:45 PM · Mar 3, 2023", "2023-05-17", "5/6/2022", "31.12.2024", "20230105", ""]
+_DESCRIPTION_WORDS = [
+    "screenshot", "tweet", "news", "article", "politics", "president", "phone",
+    "text", "social", "media", "headline", "photo", "crowd", "city", "building",
+    "receipt", "store", "chart", "meme", "interview",
+]
+_FILE_NAMES = [
+    "Screenshot {date} at 14.02.{n:02d}",
+    "IMG_{date}_{n:06d}",
+    "photo_{n}",
+    "{n:08x}",
+    "Skärmbild {date} {n}",
+]
+
+
+@dataclass
+class CorpusItem:
+    """One image of the corpus and the backend output for it."""
+
+    file_name: str
+    ocr_text: str
+    description: str
+    keywords: str
+
+
+def generate_ocr_text(rng: random.Random, lines: int = 12) -> str:
+    """Generate OCR-like text: headlines mixed with UI chrome, dates and noise."""
+    parts = rng.sample(_HEADLINES, rng.randint(1, 3))
+    parts += [rng.choice(_CHROME) for _ in range(max(0, lines - len(parts)))]
+    parts.append(rng.choice(_DATES))
+    rng.shuffle(parts)
+    return "\n".join(part for part in parts if part)
+
+
+def generate_ocr_texts(count: int, seed: int = 0, lines: int = 12) -> List[str]:
+    """Generate a list of OCR-like texts."""
+    rng = random.Random(seed)
+    return [generate_ocr_text(rng, lines) for _ in range(count)]
+
+
+def generate_item(rng: random.Random, index: int) -> CorpusItem:
+    """Generate the file name and backend output for one image."""
+    date = f"2023{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}"
+    if rng.random() < 0.5:
+        date = f"{date[:4]}-{date[4:6]}-{date[6:]}"
+    file_name = rng.choice(_FILE_NAMES).format(date=date, n=index) + rng.choice(
+        [".png", ".jpg", ".jpeg"]
+    )
+    ocr_text = generate_ocr_text(rng)
+    description = " ".join(rng.sample(_DESCRIPTION_WORDS, rng.randint(4, 10)))
+    words = [word for word in ocr_text.split() if len(word) > 3]
+    keywords = " ".join(rng.sample(words, min(len(words), 8)) + description.split()[:3])
+    return CorpusItem(file_name, ocr_text, description, keywords)
+
+
+def _png_bytes(width: int, height: int, color) -> bytes:
+    """Encode a solid-color RGB image as PNG, without any imaging library."""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        payload = kind + data
+        return struct.pack(">I", len(data)) + payload + struct.pack(
+            ">I", zlib.crc32(payload) & 0xFFFFFFFF
+        )
+
+    row = b"\x00" + bytes(color) * width
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(row * height))
+        + chunk(b"IEND", b"")
+    )
+
+
+def generate_corpus(
+    directory: Union[str, Path], images: int = 50, seed: int = 0, size=(320, 240)
+) -> List[CorpusItem]:
+    """
+    Write a synthetic corpus of images and its manifest to a folder.
+
+    Args:
+        directory: Folder to write to (created if missing)
+        images: Number of images
+        seed: Random seed, the same seed gives the same corpus
+        size: Width and height of the images
+
+    Returns:
+        The corpus items
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+
+    items = [generate_item(rng, index) for index in range(images)]
+    for item in items:
+        color = [rng.randrange(256) for _ in range(3)]
+        # The extension says JPEG for some files; only the name matters to the fakes
+        (directory / item.file_name).write_bytes(_png_bytes(*size, color))
+
+    manifest = {item.file_name: asdict(item) for item in items}
+    (directory / MANIFEST_NAME).write_text(
+        json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8"
+    )
+    return items
+
+
+def load_corpus(directory: Union[str, Path]) -> Dict[str, CorpusItem]:
+    """
+    Load the manifest of a generated corpus.
+
+    Returns:
+        Corpus items by file name
+    """
+    manifest = json.loads(
+        (Path(directory) / MANIFEST_NAME).read_text(encoding="utf-8")
+    )
+    return {name: CorpusItem(**item) for name, item in manifest.items()}
@@ -0,0 +1,124 @@
+"""
+Fake OCR, LLM and NER backends for offline benchmarks.
+
+The fakes replay the canned text of a generated corpus (see corpus.py) and sleep
+for a configurable latency, so the rest of the pipeline (caching, rate limiting,
+journaling, filename building) runs for real without Docling models or an
+Ollama server.
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+from .corpus import CorpusItem
+from .stats import StageRecorder
+
+
+@dataclass
+class Latency:
+    """Simulated backend latency: a mean in seconds plus uniform jitter."""
+
+    mean: float = 0.0
+    jitter: float = 0.0
+
+    def sleep(self, rng: random.Random):
+        delay = self.mean + rng.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class _FakeBackend:
+    def __init__(self, corpus: Dict[str, CorpusItem], seed: int = 0):
+        self.corpus = corpus
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _item(self, image_path) -> CorpusItem:
+        return self.corpus[Path(image_path).name]
+
+    def _sleep(self, latency: Latency):
+        with self._lock:
+            rng = random.Random(self._rng.random())
+        latency.sleep(rng)
+
+
+class FakeDocConverter(_FakeBackend):
+    """Stands in for Docling's DocumentConverter."""
+
+    def __init__(
+        self,
+        corpus: Dict[str, CorpusItem],
+        latency: Latency = Latency(),
+        recorder: Optional[StageRecorder] = None,
+        seed: int = 0,
+    ):
+        super().__init__(corpus, seed)
+        self.latency = latency
+        self.recorder = recorder
+
+    def convert(self, image_path):
+        with StageRecorder.span(self.recorder, "ocr"):
+            self._sleep(self.latency)
+            markdown = self._item(image_path).ocr_text
+        document = SimpleNamespace(export_to_markdown=lambda: markdown)
+        return SimpleNamespace(document=document)
+
+
+class FakeChat(_FakeBackend):
+    """
+    Stands in for ollama.chat.
+
+    Description requests (messages with images) are answered with the corpus
+    description of the image, keyword requests with the keywords of the corpus
+    item whose OCR text is part of the prompt.
+    """
+
+    def __init__(
+        self,
+        corpus: Dict[str, CorpusItem],
+        description_latency: Latency = Latency(),
+        keywords_latency: Latency = Latency(),
+        recorder: Optional[StageRecorder] = None,
+        seed: int = 0,
+    ):
+        super().__init__(corpus, seed)
+        self.description_latency = description_latency
+        self.keywords_latency = keywords_latency
+        self.recorder = recorder
+
+    def __call__(self, model: str, messages, **kwargs) -> Dict:
+        message = messages[-1]
+        if message.get("images"):
+            with StageRecorder.span(self.recorder, "description"):
+                self._sleep(self.description_latency)
+                content = self._item(message["images"][0]).description
+        else:
+            with StageRecorder.span(self.recorder, "keywords"):
+                self._sleep(self.keywords_latency)
+                content = self._keywords_for(message["content"])
+        return {"model": model, "message": {"role": "assistant", "content": content}}
+
+    def _keywords_for(self, prompt: str) -> str:
+        for item in self.corpus.values():
+            if item.ocr_text and item.ocr_text in prompt:
+                return item.keywords
+        return "unknown image"
+
+
+class FakeNERProcessor:
+    """
+    Stands in for NERProcessor when no spaCy model is installed: capitalized
+    words count as entities.
+    """
+
+    def get_words_of_interest(self, text: str) -> str:
+        words = {word for word in text.split() if word[:1].isupper() and word.isalpha()}
+        return " ".join(sorted(words)) + (" " if words else "")
+
+    def get_words_of_interest_batch(self, texts, batch_size=None, n_process=None):
+        return [self.get_words_of_interest(text) for text in texts]
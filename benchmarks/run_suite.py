@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite.
+
+Runs every scenario against fake Docling/Ollama backends (see fakes.py) on a
+synthetic corpus (see corpus.py) and writes images/sec and per-stage p50/p95
+timings to a JSON file, so results can be compared between commits.
+
+Usage:
+    python benchmarks/run_suite.py
+    python benchmarks/run_suite.py --images 200 --ocr-ms 400 --description-ms 900
+    python benchmarks/run_suite.py --scenarios text_utils dates --output after.json
+    python benchmarks/run_suite.py --output after.json --compare before.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.corpus import generate_corpus, generate_ocr_texts, load_corpus
+from benchmarks.fakes import FakeChat, FakeDocConverter, FakeNERProcessor, Latency
+from benchmarks.stats import StageRecorder
+
+
+@contextlib.contextmanager
+def quiet(verbose: bool):
+    """Hide what the code under test prints, unless verbose."""
+    if verbose:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def measure(items, func, stage: str, verbose: bool):
+    """Call func for every item, timing each call as the stage."""
+    recorder = StageRecorder()
+    timed = recorder.wrap(stage, func)
+    with quiet(verbose):
+        start = time.perf_counter()
+        for item in items:
+            timed(item)
+        elapsed = time.perf_counter() - start
+    return result(len(items), elapsed, recorder)
+
+
+def result(items: int, seconds: float, recorder: StageRecorder, **extra):
+    return {
+        "items": items,
+        "seconds": round(seconds, 6),
+        "items_per_sec": round(items / seconds, 3) if seconds else None,
+        "stages": recorder.summary(),
+        **extra,
+    }
+
+
+_ner = None
+
+
+def load_ner():
+    """The real NERProcessor if a spaCy model is installed, else the fake one."""
+    global _ner
+    if _ner is None:
+        try:
+            from src.processors import NERProcessor
+
+            processor = NERProcessor()
+            # The spaCy model is loaded lazily, so load it here to know it works
+            processor.nlp
+            _ner = ("spacy", processor)
+        except (ImportError, OSError):
+            _ner = ("fake", FakeNERProcessor())
+    return _ner
+
+
+# Scenarios
+
+
+def scenario_filename_builder(args, workdir: Path):
+    from src.core import FilenameBuilder
+
+    corpus = generate_corpus(workdir / "corpus_filename_builder", args.images, args.seed)
+    builder = FilenameBuilder()
+    texts = [f"{item.keywords} {item.description}" for item in corpus]
+
+    def build(text):
+        sanitized = builder.sanitize_filename(text)
+        return builder.build_optimized_filename(sanitized, date_prefix="20230517")
+
+    return measure(texts * args.repeat, build, "build", args.verbose)
+
+
+def scenario_text_utils(args, workdir: Path):
+    from src.utils import clean_ocr_text
+
+    texts = generate_ocr_texts(args.texts, args.seed, lines=args.ocr_lines)
+    return measure(texts, clean_ocr_text, "clean_ocr_text", args.verbose)
+
+
+def scenario_dates(args, workdir: Path):
+    from src.utils import extract_date_from_filename_or_timestamp, extract_date_from_ocr_text
+
+    texts = generate_ocr_texts(args.texts, args.seed, lines=args.ocr_lines)
+    corpus = generate_corpus(workdir / "corpus_dates", args.images, args.seed)
+    paths = [str(workdir / "corpus_dates" / item.file_name) for item in corpus]
+
+    recorder = StageRecorder()
+    ocr_dates = recorder.wrap("ocr_text", extract_date_from_ocr_text)
+    file_dates = recorder.wrap("filename", extract_date_from_filename_or_timestamp)
+    start = time.perf_counter()
+    for text in texts:
+        ocr_dates(text)
+    for path in paths * args.repeat:
+        file_dates(path)
+    elapsed = time.perf_counter() - start
+    return result(len(texts) + len(paths) * args.repeat, elapsed, recorder)
+
+
+def scenario_ner(args, workdir: Path):
+    backend, ner = load_ner()
+    texts = generate_ocr_texts(args.texts, args.seed, lines=args.ocr_lines)
+
+    recorder = StageRecorder()
+    single = recorder.wrap("per_doc", ner.get_words_of_interest)
+    with quiet(args.verbose):
+        start = time.perf_counter()
+        for text in texts:
+            single(text)
+        with StageRecorder.span(recorder, "batch"):
+            ner.get_words_of_interest_batch(texts)
+        elapsed = time.perf_counter() - start
+    return result(2 * len(texts), elapsed, recorder, ner_backend=backend)
+
+
+def run_batch(args, workdir: Path, name: str, pipelined: bool):
+    from src.core import BatchProcessor, ImageFileNamer
+    from src.processors import ContentProcessor
+
+    source = workdir / f"corpus_{name}"
+    generate_corpus(source, args.images, args.seed)
+    corpus = load_corpus(source)
+
+    recorder = StageRecorder()
+    jitter = args.jitter
+    content_processor = ContentProcessor(
+        doc_converter=FakeDocConverter(
+            corpus, Latency(args.ocr_ms / 1000, jitter * args.ocr_ms / 1000), recorder, args.seed
+        ),
+        chat=FakeChat(
+            corpus,
+            Latency(args.description_ms / 1000, jitter * args.description_ms / 1000),
+            Latency(args.keywords_ms / 1000, jitter * args.keywords_ms / 1000),
+            recorder,
+            args.seed,
+        ),
+        # The fake backends look up their canned answers by image file name,
+        # so they need the paths rather than preprocessed image bytes
+        preprocess=False,
+    )
+    backend, ner = load_ner()
+    timed_ner = SimpleNamespace(
+        get_words_of_interest=recorder.wrap("ner", ner.get_words_of_interest)
+    )
+    namer = ImageFileNamer(content_processor=content_processor, ner_processor=timed_ner)
+    namer.build_filename = recorder.wrap("name", namer.build_filename)
+
+    processor = BatchProcessor(rate_limit_per_minute=0, pipelined=pipelined, use_cache=False)
+    processor.image_namer = namer
+
+    target = workdir / f"target_{name}"
+    with quiet(args.verbose):
+        start = time.perf_counter()
+        processor.process_images(source, target)
+        elapsed = time.perf_counter() - start
+
+    renamed = sum(1 for path in target.iterdir() if not path.name.startswith("."))
+    return result(renamed, elapsed, recorder, ner_backend=backend)
+
+
+def scenario_batch_sequential(args, workdir: Path):
+    return run_batch(args, workdir, "batch_sequential", pipelined=False)
+
+
+def scenario_batch_pipelined(args, workdir: Path):
+    return run_batch(args, workdir, "batch_pipelined", pipelined=True)
+
+
+SCENARIOS = {
+    "filename_builder": scenario_filename_builder,
+    "text_utils": scenario_text_utils,
+    "dates": scenario_dates,
+    "ner": scenario_ner,
+    "batch_sequential": scenario_batch_sequential,
+    "batch_pipelined": scenario_batch_pipelined,
+}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(report: dict, baseline: dict):
+    """Print throughput and p95 changes against an earlier report."""
+    print(f"\nCompared with {baseline.get('commit')} ({baseline.get('timestamp')}):")
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous or not previous.get("items_per_sec") or "error" in current:
+            continue
+        ratio = current["items_per_sec"] / previous["items_per_sec"]
+        print(f"  {name:<18} {ratio:6.2f}x items/sec")
+        for stage, stats in current["stages"].items():
+            old = previous.get("stages", {}).get(stage)
+            if old and old["p95_ms"]:
+                change = 100 * (stats["p95_ms"] / old["p95_ms"] - 1)
+                print(f"    {stage:<16} p95 {old['p95_ms']:9.3f} -> {stats['p95_ms']:9.3f} ms ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--images", type=int, default=40, help="Images per corpus")
+    parser.add_argument("--texts", type=int, default=500, help="OCR texts for text scenarios")
+    parser.add_argument("--ocr-lines", type=int, default=40, help="Lines per OCR text")
+    parser.add_argument("--repeat", type=int, default=10, help="Repetitions of small scenarios")
+    parser.add_argument("--ocr-ms", type=float, default=50, help="Fake OCR latency")
+    parser.add_argument("--description-ms", type=float, default=100, help="Fake description latency")
+    parser.add_argument("--keywords-ms", type=float, default=60, help="Fake keywords latency")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency jitter as a fraction")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default="benchmark_results.json")
+    parser.add_argument("--compare", type=str, help="Earlier report to compare with")
+    parser.add_argument("--verbose", action="store_true", help="Show output of the code under test")
+    args = parser.parse_args()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("scenarios", "output", "compare", "verbose")
+        },
+        "scenarios": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="image-file-namer-bench-") as directory:
+        for name in args.scenarios:
+            workdir = Path(directory) / name
+            workdir.mkdir()
+            print(f"Running {name}...", flush=True)
+            try:
+                outcome = SCENARIOS[name](args, workdir)
+            except Exception as e:
+                outcome = {"error": f"{type(e).__name__}: {e}"}
+                print(f"  failed: {outcome['error']}")
+            else:
+                print(f"  {outcome['items']} items, {outcome['items_per_sec']} items/sec")
+                for stage, stats in outcome["stages"].items():
+                    print(f"    {stage:<16} p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms")
+            report["scenarios"][name] = outcome
+
+    Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        compare(report, json.loads(Path(args.compare).read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
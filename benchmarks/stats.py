@@ -0,0 +1,65 @@
+"""
+Timing collection and summaries for the benchmark suite.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+class StageRecorder:
+    """Collects durations per stage, safe to use from several threads."""
+
+    def __init__(self):
+        self._durations: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self._durations.setdefault(stage, []).append(seconds)
+
+    @staticmethod
+    @contextmanager
+    def span(recorder: Optional["StageRecorder"], stage: str):
+        """Time a block into a recorder (no-op without one)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if recorder is not None:
+                recorder.record(stage, time.perf_counter() - start)
+
+    def wrap(self, stage: str, func):
+        """Wrap a function so every call is recorded as the stage."""
+
+        def timed(*args, **kwargs):
+            with self.span(self, stage):
+                return func(*args, **kwargs)
+
+        return timed
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, mean, p50 and p95 in milliseconds per stage."""
+        with self._lock:
+            durations = {stage: list(values) for stage, values in self._durations.items()}
+        return {
+            stage: {
+                "count": len(values),
+                "mean_ms": round(1000 * sum(values) / len(values), 4),
+                "p50_ms": round(1000 * percentile(values, 0.50), 4),
+                "p95_ms": round(1000 * percentile(values, 0.95), 4),
+            }
+            for stage, values in sorted(durations.items())
+            if values
+        }
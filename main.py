@@ -7,13 +7,15 @@ This script provides a clean interface to the modularized image file naming syst
 import argparse
 from pathlib import Path
 
-from src import BatchProcessor
 from src.config import (
     DEFAULT_SOURCE_FOLDER,
     DEFAULT_TARGET_FOLDER,
     DEFAULT_RATE_LIMIT_PER_MINUTE,
+    DUPLICATE_POLICY,
+    OCR_CROP_MODE,
+    NEAR_DUPLICATES_ENABLED,
+    OCR_GRAYSCALE,
 )
-from src.utils import clean_up_gpu_memory, setup_dependencies
 
 
 def main():
@@ -40,7 +42,99 @@ def main():
         "-r",
         type=int,
         default=DEFAULT_RATE_LIMIT_PER_MINUTE,
-        help=f"Maximum images to process per minute (default: {DEFAULT_RATE_LIMIT_PER_MINUTE})",
+        help=f"Maximum calls per minute to each model backend (default: {DEFAULT_RATE_LIMIT_PER_MINUTE})",
+    )
+    parser.add_argument(
+        "--pipeline",
+        "-p",
+        action="store_true",
+        help="Overlap OCR, description, keyword and NER stages across images",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=1,
+        help="Number of worker processes, each loading its own models (default: 1)",
+    )
+    parser.add_argument(
+        "--recursive",
+        "-R",
+        action="store_true",
+        help="Also process images in subfolders of the source folder",
+    )
+    parser.add_argument(
+        "--order",
+        choices=["name", "mtime", "size", "smallest-first"],
+        default=None,
+        help="Sort images before processing (default: directory order, "
+        "which starts without waiting for a full listing)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep the models loaded and process new images as they arrive "
+        "in the source folder, until interrupted",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write the persistent OCR/description/keyword cache",
+    )
+    parser.add_argument(
+        "--no-journal",
+        action="store_true",
+        help="Don't keep a resumable journal of the run in the target folder",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Write per-stage timings and counters as a Prometheus textfile (.prom)",
+    )
+    parser.add_argument(
+        "--trace-file",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Append every timed stage call to a JSONL trace",
+    )
+    parser.add_argument(
+        "--ocr-crop",
+        choices=("presets", "bands"),
+        default=OCR_CROP_MODE,
+        help="Crop images in memory before OCR to cut OCR time: 'presets' uses the "
+        "cropping_modes.json preset matching the image size, 'bands' trims uniform "
+        "edge bands (files are renamed untouched)",
+    )
+    parser.add_argument(
+        "--ocr-grayscale",
+        action="store_true",
+        default=OCR_GRAYSCALE,
+        help="Convert images to grayscale before OCR",
+    )
+    parser.add_argument(
+        "--reuse-near-duplicates",
+        action="store_true",
+        default=NEAR_DUPLICATES_ENABLED,
+        help="Reuse the cached OCR text and description of an already processed "
+        "near-duplicate (same screenshot at another resolution or JPEG quality)",
+    )
+    parser.add_argument(
+        "--duplicates",
+        choices=("name", "hardlink", "skip"),
+        default=DUPLICATE_POLICY,
+        help="Don't analyze byte-identical copies of an image in the source or "
+        "target folder: 'name' moves them under that image's name, 'hardlink' "
+        "does the same with a hard link to it, 'skip' leaves them in place",
+    )
+    parser.add_argument(
+        "--undo",
+        nargs="?",
+        const="last",
+        metavar="RUN_ID",
+        help="Move the files renamed in a run (default: the last one) back and exit",
     )
     parser.add_argument(
         "--skip-setup",
@@ -50,9 +144,19 @@ def main():
 
     args = parser.parse_args()
 
+    # Imported after parsing, so --help and argument errors stay instant
+    from src import BatchProcessor
+    from src.utils import clean_up_gpu_memory, setup_dependencies
+
     print("🖼️  Image File Namer - Intelligent Image Renaming System")
     print("=" * 60)
 
+    if args.undo:
+        run_id = None if args.undo == "last" else args.undo
+        restored, failed = BatchProcessor().undo(args.target, run_id)
+        print(f"↩️  Restored {restored} files, {failed} could not be restored.")
+        return 0 if failed == 0 else 1
+
     # Setup dependencies unless skipped
     if not args.skip_setup:
         if not setup_dependencies():
@@ -69,25 +173,70 @@ def main():
 
     print(f"📁 Source folder: {source_path}")
     print(f"📁 Target folder: {target_path}")
-    print(f"⚡ Rate limit: {args.rate_limit} images/minute")
+    print(f"⚡ Rate limit: {args.rate_limit} calls/minute per backend")
+    if args.workers > 1:
+        print(f"🧵 Worker processes: {args.workers}")
+        if args.pipeline:
+            print("⚠️  --pipeline is ignored when --workers is greater than 1")
+    elif args.pipeline:
+        print("🔀 Pipelined processing enabled")
+    if args.watch:
+        print("👀 Watch mode enabled")
+    if args.recursive:
+        print("📂 Including subfolders")
+    if args.order:
+        print(f"🔃 Processing order: {args.order}")
+    if args.ocr_crop or args.ocr_grayscale:
+        steps = [f"crop ({args.ocr_crop})"] if args.ocr_crop else []
+        steps += ["grayscale"] if args.ocr_grayscale else []
+        print(f"✂️  Before OCR: {', '.join(steps)}")
+    if args.reuse_near_duplicates:
+        if args.no_cache:
+            print("⚠️  --reuse-near-duplicates is ignored with --no-cache")
+        else:
+            print("🔁 Reusing results of near-duplicate images")
+    if args.duplicates:
+        print(f"👯 Exact duplicates: {args.duplicates}")
     print("-" * 60)
 
     # Clean up GPU memory before starting
     clean_up_gpu_memory()
 
     # Create batch processor and run
-    processor = BatchProcessor(rate_limit_per_minute=args.rate_limit)
+    processor = BatchProcessor(
+        rate_limit_per_minute=args.rate_limit,
+        pipelined=args.pipeline,
+        workers=args.workers,
+        use_cache=not args.no_cache,
+        use_journal=not args.no_journal,
+        recursive=args.recursive,
+        order=args.order,
+        metrics_file=args.metrics_file,
+        trace_file=args.trace_file,
+        ocr_crop=args.ocr_crop,
+        ocr_grayscale=args.ocr_grayscale,
+        reuse_near_duplicates=args.reuse_near_duplicates,
+        duplicate_policy=args.duplicates,
+    )
 
     try:
+        if args.watch:
+            processor.watch(source_path, target_path)
+            return 0
         processor.process_images(source_path, target_path)
         print("✅ Processing completed successfully!")
         return 0
     except KeyboardInterrupt:
+        if args.watch:
+            print("\n👋 Stopped watching.")
+            return 0
         print("\n⚠️  Processing interrupted by user.")
         return 1
     except Exception as e:
         print(f"❌ Processing failed with error: {e}")
         return 1
+    finally:
+        processor.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Inspect and maintain the persistent OCR/description/keyword result cache.
+
+The near-duplicate index points at cached results, so it is pruned and cleared
+together with the cache.
+
+Usage:
+    python manage_cache.py stats
+    python manage_cache.py prune --max-mb 256
+    python manage_cache.py clear
+"""
+import argparse
+from pathlib import Path
+
+from src.config import CACHE_FILE, CACHE_MAX_BYTES, NEAR_DUPLICATE_INDEX_FILE
+from src.utils import NearDuplicateIndex, ResultCache
+
+
+def format_bytes(size: int) -> str:
+    """Format a byte count for display."""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def main():
+    """Main entry point for the cache tool."""
+    parser = argparse.ArgumentParser(description="Manage the result cache")
+    parser.add_argument(
+        "--cache-file",
+        type=str,
+        default=str(CACHE_FILE),
+        help=f"Path to the cache database (default: {CACHE_FILE})",
+    )
+    parser.add_argument(
+        "--index-file",
+        type=str,
+        default=str(NEAR_DUPLICATE_INDEX_FILE),
+        help=f"Path to the near-duplicate index (default: {NEAR_DUPLICATE_INDEX_FILE})",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("stats", help="Show cache size and entries per stage")
+
+    prune_parser = subparsers.add_parser(
+        "prune", help="Evict least recently used entries down to a size limit"
+    )
+    prune_parser.add_argument(
+        "--max-mb",
+        type=float,
+        default=CACHE_MAX_BYTES / (1024 * 1024),
+        help=f"Size limit in MB (default: {CACHE_MAX_BYTES // (1024 * 1024)})",
+    )
+
+    subparsers.add_parser("clear", help="Remove all cached results")
+
+    args = parser.parse_args()
+    cache = ResultCache(args.cache_file)
+    index = None
+    if Path(args.index_file).exists():
+        index = NearDuplicateIndex(args.index_file)
+
+    if args.command == "stats":
+        stats = cache.stats()
+        print(f"📦 Cache file: {stats['path']}")
+        print(f"   Entries: {stats['entries']}")
+        print(f"   Stored values: {format_bytes(stats['bytes'])}")
+        print(f"   On disk: {format_bytes(stats['file_bytes'])}")
+        print(f"   Size limit: {format_bytes(stats['max_bytes'])}")
+        for stage, stage_stats in sorted(stats["stages"].items()):
+            print(
+                f"   - {stage}: {stage_stats['entries']} entries, "
+                f"{format_bytes(stage_stats['bytes'])}"
+            )
+        if index is not None:
+            print(f"   Near-duplicate index: {index.count()} images")
+    elif args.command == "prune":
+        evicted = cache.prune(int(args.max_mb * 1024 * 1024))
+        print(f"🧹 Evicted {evicted} entries.")
+        if index is not None:
+            print(f"🧹 Removed {index.prune(cache)} images from the near-duplicate index.")
+    elif args.command == "clear":
+        removed = cache.clear()
+        print(f"🗑️  Removed {removed} entries.")
+        if index is not None:
+            print(f"🗑️  Removed {index.clear()} images from the near-duplicate index.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Crop, scale and recompress screenshots in one pass.
+
+Replaces running crop.py, scale_hor_50.py and resize_images.py one after the
+other: the chosen transforms are applied with a single decode and a single JPEG
+encode per image, spread over a process pool.
+
+Usage:
+    python preprocess_images.py ./images/to_crop ./images/resized --crop Demo1 --downscale 0.5
+    python preprocess_images.py SOURCE TARGET --scale-x 0.5 --quality 80 --workers 4
+    python preprocess_images.py SOURCE TARGET --crop auto  # preset picked by image size
+"""
+import argparse
+import sys
+
+from src.config import (
+    CROP_MODES_FILE,
+    PREPROCESS_DOWNSCALE_MIN_SIDE,
+    PREPROCESS_JPEG_QUALITY,
+)
+from src.utils import CropPresets, TransformChain, load_crop_presets, transform_folder
+
+
+def main():
+    """Main entry point for preprocessing images."""
+    parser = argparse.ArgumentParser(
+        description="Crop, scale and recompress images with a single decode/encode"
+    )
+    parser.add_argument("source", help="Folder with the images to process")
+    parser.add_argument("target", help="Folder for the processed JPEG files")
+    parser.add_argument(
+        "--crop",
+        metavar="PRESET",
+        help="Crop preset to apply, or 'auto' to pick the preset matching each "
+        "image's size (images matching no preset are not cropped)",
+    )
+    parser.add_argument(
+        "--crop-modes",
+        default=str(CROP_MODES_FILE),
+        help=f"Crop presets file (default: {CROP_MODES_FILE})",
+    )
+    parser.add_argument(
+        "--scale-x",
+        type=float,
+        default=1.0,
+        help="Horizontal scale factor, e.g. 0.5 (default: 1.0)",
+    )
+    parser.add_argument(
+        "--downscale",
+        type=float,
+        default=None,
+        help="Scale factor for images larger than --min-side on both sides",
+    )
+    parser.add_argument(
+        "--min-side",
+        type=int,
+        default=PREPROCESS_DOWNSCALE_MIN_SIDE,
+        help=f"Only downscale images larger than this on both sides (default: {PREPROCESS_DOWNSCALE_MIN_SIDE})",
+    )
+    parser.add_argument(
+        "--quality",
+        type=int,
+        default=PREPROCESS_JPEG_QUALITY,
+        help=f"JPEG quality (default: {PREPROCESS_JPEG_QUALITY})",
+    )
+    parser.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help="Don't write images that would not be cropped or resized",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--list-crops", action="store_true", help="List the crop presets and exit"
+    )
+    args = parser.parse_args()
+
+    presets = CropPresets([])
+    if args.crop or args.list_crops:
+        try:
+            presets = load_crop_presets(args.crop_modes)
+        except FileNotFoundError:
+            print(
+                f"Error: The file {args.crop_modes} was not found. Did you rename "
+                "sample_cropping_modes.json to cropping_modes.json?"
+            )
+            return 1
+    if args.list_crops:
+        for name, preset in presets.items():
+            print(f"{name} (auto: {preset.signature})" if preset.specificity else name)
+        return 0
+    if args.crop == "auto":
+        if not any(preset.specificity for preset in presets.values()):
+            print(f"Error: No preset in {args.crop_modes} has a 'match' size signature")
+            return 1
+        crop = presets
+    elif args.crop and args.crop not in presets:
+        print(f"Error: Unknown crop preset '{args.crop}', expected one of: {', '.join(presets)}")
+        return 1
+    else:
+        crop = presets.get(args.crop) if args.crop else None
+
+    chain = TransformChain(
+        crop=crop,
+        scale_x=args.scale_x,
+        downscale=args.downscale,
+        downscale_min_side=args.min_side,
+        quality=args.quality,
+        skip_unchanged=args.skip_unchanged,
+    )
+    counts = transform_folder(args.source, args.target, chain, workers=args.workers)
+    print(
+        f"Done: {counts['processed']} processed, {counts['skipped']} skipped, "
+        f"{counts['failed']} failed."
+    )
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,40 +1,12 @@
-import os
-from PIL import Image
+# Scales images to 50% of their width, keeping the height.
+# Same as: python preprocess_images.py ./images/scale_horizontally/ ./images/scaled_horizontally/ --scale-x 0.5 --quality 75
 
-def scale_image_horizontally(input_path, output_path):
-    try:
-        with Image.open(input_path) as img:
-            # Get original dimensions
-            original_width, original_height = img.size
-
-            # Calculate new dimensions
-            new_width = int(original_width * 0.5)
-            new_height = original_height  # Unchanged
-
-            # Resize the image
-            resized_img = img.resize((new_width, new_height), Image.LANCZOS)
-
-            # Save the resized image as a JPEG
-            resized_img.save(output_path, 'JPEG')
-    except Exception as e:
-        print(f"Failed to process {input_path}: {e}")
-
-def process_directory(directory_path, output_directory):
-    # Check if the output directory exists, if not, create it
-    if not os.path.exists(output_directory):
-        os.makedirs(output_directory)
-
-    # Process all files in the given directory
-    for filename in os.listdir(directory_path):
-        if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.webp')):
-            input_path = os.path.join(directory_path, filename)
-            output_path = os.path.join(output_directory, f"{os.path.splitext(filename)[0]}.jpg")
-            scale_image_horizontally(input_path, output_path)
-            print(f"Processed {filename} into {output_path}")
+from src.utils import TransformChain, transform_folder
 
 # Specify the directory containing images and where to save them
 source_directory = './images/scale_horizontally/'
 target_directory = './images/scaled_horizontally/'
 
-# Process all images in the directory
-process_directory(source_directory, target_directory)
+if __name__ == "__main__":
+    # Process all images in the directory
+    transform_folder(source_directory, target_directory, TransformChain(scale_x=0.5, quality=75))
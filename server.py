@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Local HTTP naming service.
+
+Keeps the OCR and NER models loaded and names images on request, so callers
+don't pay the startup and model loading time of ``main.py`` for every batch.
+Images are named by a fixed number of worker threads; requests beyond the queue
+limit are refused with 503 instead of piling up.
+
+Usage:
+    python server.py
+    python server.py --port 9000 --concurrency 8
+
+Endpoints:
+    GET  /health    Service status, loaded models and queue length
+    POST /name      Name images, answering with the new names and stage outputs:
+                    - JSON {"path": "/abs/image.png"} or {"paths": [...]}
+                    - JSON {"images": [{"filename": "a.png", "data": "<base64>"}]}
+                    - the image bytes themselves, with ?filename=a.png
+
+Example:
+    curl -s localhost:8765/name -d '{"path": "/home/me/shot.png"}'
+    curl -s "localhost:8765/name?filename=shot.png" --data-binary @shot.png
+"""
+import argparse
+import base64
+import binascii
+import json
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from src.config import (
+    IMAGE_EXTENSIONS,
+    SERVER_HOST,
+    SERVER_MAX_CONCURRENT_IMAGES,
+    SERVER_MAX_QUEUED_IMAGES,
+    SERVER_MAX_REQUEST_BYTES,
+    SERVER_PORT,
+)
+
+
+class ServiceBusy(Exception):
+    """Raised when accepting a request would exceed the queue limit."""
+
+
+class RequestError(Exception):
+    """Invalid request, answered with the given HTTP status."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class NamingService:
+    """
+    Names images on a bounded pool of worker threads.
+
+    At most ``concurrency`` images are analyzed at once, and at most
+    ``max_queue`` images may be waiting or in progress; a request that does not
+    fit is refused as a whole.
+    """
+
+    def __init__(
+        self,
+        api,
+        concurrency: int = SERVER_MAX_CONCURRENT_IMAGES,
+        max_queue: int = SERVER_MAX_QUEUED_IMAGES,
+        allowed_roots: Sequence[Path] = (),
+    ):
+        """
+        Args:
+            api: ImageFileNamerAPI doing the naming
+            concurrency: Number of images named at the same time
+            max_queue: Maximum number of images waiting or in progress
+            allowed_roots: Only name images by path below these folders (any
+                path if empty)
+        """
+        self.api = api
+        self.concurrency = max(1, concurrency)
+        self.max_queue = max(self.concurrency, max_queue)
+        self.allowed_roots = [Path(root).resolve() for root in allowed_roots]
+        self.started = time.time()
+        self.named = 0
+        self.failed = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="naming"
+        )
+
+    def status(self) -> Dict:
+        """Describe the service state."""
+        with self._lock:
+            return {
+                "status": "ok",
+                "uptime_seconds": round(time.time() - self.started, 1),
+                "models": self.api.loaded_models(),
+                "concurrency": self.concurrency,
+                "queued": self._pending,
+                "max_queue": self.max_queue,
+                "named": self.named,
+                "failed": self.failed,
+            }
+
+    def _submit(self, jobs: List[Callable[[], Dict]]) -> List[Future]:
+        """Queue jobs, all or none of them."""
+        with self._lock:
+            if self._pending + len(jobs) > self.max_queue:
+                raise ServiceBusy(
+                    f"{self._pending} images queued, limit is {self.max_queue}"
+                )
+            self._pending += len(jobs)
+
+        futures = []
+        for job in jobs:
+            future = self._executor.submit(job)
+            future.add_done_callback(self._job_done)
+            futures.append(future)
+        return futures
+
+    def _job_done(self, future: Future):
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled():
+                return
+            if future.result().get("error") is None:
+                self.named += 1
+            else:
+                self.failed += 1
+
+    def _name(self, image_path: Path, label: Dict[str, str]) -> Dict:
+        """Name one image, turning errors into an error entry."""
+        start = time.perf_counter()
+        try:
+            result = {**label, **self.api.name_image(image_path), "error": None}
+        except Exception as e:
+            print(f"Error naming {image_path}: {e}")
+            result = {**label, "error": str(e)}
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        return result
+
+    def _check_path(self, path: str) -> Path:
+        image_path = Path(path).expanduser()
+        if not image_path.is_absolute():
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Path must be absolute: {path}")
+        resolved = image_path.resolve()
+        if self.allowed_roots and not any(
+            resolved.is_relative_to(root) for root in self.allowed_roots
+        ):
+            raise RequestError(HTTPStatus.FORBIDDEN, f"Path not allowed: {path}")
+        if not resolved.is_file():
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No such file: {path}")
+        return resolved
+
+    def name_paths(self, paths: Sequence[str]) -> List[Dict]:
+        """
+        Name images on disk.
+
+        Args:
+            paths: Absolute paths of the images
+
+        Returns:
+            One result per path, in order
+        """
+        image_paths = [self._check_path(path) for path in paths]
+        futures = self._submit(
+            [
+                lambda image_path=image_path, path=path: self._name(
+                    image_path, {"path": path}
+                )
+                for image_path, path in zip(image_paths, paths)
+            ]
+        )
+        return [future.result() for future in futures]
+
+    def name_uploads(self, uploads: Sequence[Tuple[str, bytes]]) -> List[Dict]:
+        """
+        Name uploaded images.
+
+        The images are written to a temporary folder under their own filename,
+        so dates in the filename are still found. (The file timestamp fallback
+        gives the upload date.)
+
+        Args:
+            uploads: Pairs of original filename and image bytes
+
+        Returns:
+            One result per upload, in order
+        """
+        names = []
+        for filename, _ in uploads:
+            name = Path(filename or "").name
+            if Path(name).suffix.lower() not in IMAGE_EXTENSIONS:
+                raise RequestError(
+                    HTTPStatus.BAD_REQUEST,
+                    f"Filename must end in one of {', '.join(IMAGE_EXTENSIONS)}: {filename}",
+                )
+            names.append(name)
+
+        with tempfile.TemporaryDirectory(prefix="image-file-namer-") as directory:
+            jobs = []
+            for index, (name, (filename, data)) in enumerate(zip(names, uploads)):
+                # One subfolder per upload, so equal filenames don't collide
+                image_path = Path(directory) / str(index) / name
+                image_path.parent.mkdir()
+                image_path.write_bytes(data)
+                jobs.append(
+                    lambda image_path=image_path, filename=filename: self._name(
+                        image_path, {"upload": filename}
+                    )
+                )
+            futures = self._submit(jobs)
+            return [future.result() for future in futures]
+
+    def shutdown(self):
+        """Cancel the queued requests and wait for the running ones to finish."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+class NamingRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end of a NamingService (set as ``server.service``)."""
+
+    server_version = "ImageFileNamer/1.0"
+
+    @property
+    def service(self) -> NamingService:
+        return self.server.service
+
+    def do_GET(self):
+        if urlsplit(self.path).path == "/health":
+            self._send_json(HTTPStatus.OK, self.service.status())
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, "Unknown endpoint")
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != "/name":
+            self._send_error(HTTPStatus.NOT_FOUND, "Unknown endpoint")
+            return
+        try:
+            body = self._read_body()
+            content_type = self.headers.get("Content-Type", "")
+            if content_type.startswith("image/") or content_type.startswith(
+                "application/octet-stream"
+            ):
+                filename = parse_qs(url.query).get("filename", [""])[0]
+                response = self.service.name_uploads([(filename, body)])[0]
+            else:
+                response = self._handle_json(body)
+        except RequestError as e:
+            self._send_error(e.status, str(e))
+        except ServiceBusy as e:
+            self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, str(e), retry_after=1)
+        except Exception as e:
+            print(f"Error handling request: {e}")
+            self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, str(e))
+        else:
+            self._send_json(HTTPStatus.OK, response)
+
+    def _handle_json(self, body: bytes):
+        """Dispatch a JSON naming request."""
+        try:
+            request = json.loads(body)
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {e}")
+        if not isinstance(request, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Expected a JSON object")
+
+        if "path" in request:
+            return self.service.name_paths([str(request["path"])])[0]
+        if "paths" in request and isinstance(request["paths"], list):
+            return {"results": self.service.name_paths([str(p) for p in request["paths"]])}
+        if "images" in request and isinstance(request["images"], list):
+            uploads = []
+            for image in request["images"]:
+                try:
+                    data = base64.b64decode(image["data"], validate=True)
+                    if not data:
+                        raise binascii.Error("empty image data")
+                    uploads.append((image.get("filename", ""), data))
+                except (AttributeError, KeyError, TypeError, ValueError) as e:
+                    # binascii.Error (invalid base64) is a ValueError, as is
+                    # the error for non-ASCII strings
+                    raise RequestError(
+                        HTTPStatus.BAD_REQUEST, f"Invalid image entry: {e}"
+                    )
+            return {"results": self.service.name_uploads(uploads)}
+        raise RequestError(
+            HTTPStatus.BAD_REQUEST, "Expected 'path', 'paths' or 'images'"
+        )
+
+    def _read_body(self) -> bytes:
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            raise RequestError(HTTPStatus.LENGTH_REQUIRED, "Content-Length required")
+        if length > self.server.max_request_bytes:
+            raise RequestError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Request larger than {self.server.max_request_bytes} bytes",
+            )
+        return self.rfile.read(length)
+
+    def _send_json(self, status: HTTPStatus, payload, retry_after: Optional[int] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if retry_after is not None:
+            self.send_header("Retry-After", str(retry_after))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: HTTPStatus, message: str, retry_after: Optional[int] = None):
+        self._send_json(status, {"error": message}, retry_after)
+
+    def log_message(self, format, *args):
+        print(f"{self.address_string()} - {format % args}")
+
+
+def create_server(
+    service: NamingService,
+    host: str = SERVER_HOST,
+    port: int = SERVER_PORT,
+    max_request_bytes: int = SERVER_MAX_REQUEST_BYTES,
+) -> ThreadingHTTPServer:
+    """
+    Create the HTTP server for a naming service (call ``serve_forever`` to run it).
+
+    Args:
+        service: Service handling the naming requests
+        host: Address to listen on
+        port: Port to listen on (0 picks a free port)
+        max_request_bytes: Maximum request body size
+
+    Returns:
+        The HTTP server
+    """
+    server = ThreadingHTTPServer((host, port), NamingRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.max_request_bytes = max_request_bytes
+    return server
+
+
+def main():
+    """Main entry point for the naming service."""
+    parser = argparse.ArgumentParser(description="Run the image naming service")
+    parser.add_argument("--host", type=str, default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=SERVER_MAX_CONCURRENT_IMAGES,
+        help="Images named at the same time",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=SERVER_MAX_QUEUED_IMAGES,
+        help="Images waiting or in progress before requests are refused",
+    )
+    parser.add_argument(
+        "--allow",
+        action="append",
+        default=[],
+        metavar="FOLDER",
+        help="Only name images by path below this folder (repeatable)",
+    )
+    parser.add_argument(
+        "--no-warm-up",
+        action="store_true",
+        help="Load the models on the first request instead of at startup",
+    )
+    parser.add_argument(
+        "--skip-setup",
+        action="store_true",
+        help="Skip dependency setup (use if already configured)",
+    )
+    args = parser.parse_args()
+
+    from api import ImageFileNamerAPI
+
+    api = ImageFileNamerAPI(auto_setup=not args.skip_setup)
+    if not args.no_warm_up:
+        print("Loading models...")
+        api.warm_up()
+
+    service = NamingService(api, args.concurrency, args.max_queue, args.allow)
+    server = create_server(service, args.host, args.port)
+    print(f"🖼️  Naming service listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopping naming service.")
+    finally:
+        server.server_close()
+        service.shutdown()
+        api.close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -7,26 +7,49 @@ This package provides intelligent image file renaming capabilities using:
 - Named Entity Recognition via spaCy
 - Smart date detection from multiple sources
 - Optimized filename generation with deduplication and filtering
+
+The exported names are imported on first access (PEP 562), so importing the
+package, e.g. for ``main.py --help``, does not load the processing modules.
 """
 
-from .core import ImageFileNamer, BatchProcessor, FilenameBuilder
-from .processors import ContentProcessor, NERProcessor
-from .utils import (
-    clean_up_gpu_memory,
-    extract_date_from_ocr_text,
-    extract_date_from_filename_or_timestamp,
-)
+import importlib
+from typing import TYPE_CHECKING
 
 __version__ = "1.0.0"
 __author__ = "Mikael Folkesson"
 
-__all__ = [
-    "ImageFileNamer",
-    "BatchProcessor",
-    "FilenameBuilder",
-    "ContentProcessor",
-    "NERProcessor",
-    "clean_up_gpu_memory",
-    "extract_date_from_ocr_text",
-    "extract_date_from_filename_or_timestamp",
-]
+# Exported name -> submodule defining it
+_EXPORTS = {
+    "ImageFileNamer": ".core",
+    "BatchProcessor": ".core",
+    "FilenameBuilder": ".core",
+    "ContentProcessor": ".processors",
+    "NERProcessor": ".processors",
+    "clean_up_gpu_memory": ".utils",
+    "extract_date_from_ocr_text": ".utils",
+    "extract_date_from_filename_or_timestamp": ".utils",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .core import ImageFileNamer, BatchProcessor, FilenameBuilder
+    from .processors import ContentProcessor, NERProcessor
+    from .utils import (
+        clean_up_gpu_memory,
+        extract_date_from_ocr_text,
+        extract_date_from_filename_or_timestamp,
+    )
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
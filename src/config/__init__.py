@@ -10,16 +10,70 @@ __all__ = [
     "NON_PERSONAL_NAMES_TO_INCLUDE",
     "WORDS_TO_INCLUDE_FILE",
     "WORDS_TO_REMOVE_FILE",
+    "WORDLIST_RELOAD_CHECK_SECONDS",
+    "IMAGE_EXTENSIONS",
+    "CACHE_DIR",
+    "CACHE_FILE",
+    "CACHE_ENABLED",
+    "CACHE_MAX_BYTES",
+    "CACHE_VERSION",
+    "IMAGE_PREPROCESSING_ENABLED",
+    "VISION_IMAGE_MAX_SIDE",
+    "VISION_IMAGE_JPEG_QUALITY",
+    "OCR_IMAGE_MAX_SIDE",
+    "THUMBNAIL_CACHE_DIR",
+    "THUMBNAIL_CACHE_MAX_BYTES",
+    "PREPARED_IMAGE_MEMORY_ITEMS",
+    "OCR_CROP_MODE",
+    "OCR_GRAYSCALE",
+    "OCR_BAND_TOLERANCE",
+    "NEAR_DUPLICATES_ENABLED",
+    "NEAR_DUPLICATE_INDEX_FILE",
+    "NEAR_DUPLICATE_MAX_DISTANCE",
+    "NEAR_DUPLICATE_MAX_ASPECT_DIFFERENCE",
+    "DUPLICATE_POLICY",
+    "DUPLICATE_PARTIAL_HASH_BYTES",
+    "CROP_MODES_FILE",
+    "PREPROCESS_JPEG_QUALITY",
+    "PREPROCESS_DOWNSCALE_MIN_SIDE",
+    "JOURNAL_FILENAME",
+    "JOURNAL_MAX_ATTEMPTS",
+    "JOURNAL_KEEP_RUNS",
+    "WATCH_POLL_SECONDS",
+    "WATCH_SETTLE_SECONDS",
+    "SERVER_HOST",
+    "SERVER_PORT",
+    "SERVER_MAX_CONCURRENT_IMAGES",
+    "SERVER_MAX_QUEUED_IMAGES",
+    "SERVER_MAX_REQUEST_BYTES",
+    "METRICS_HISTOGRAM_BUCKETS",
+    "METRICS_PREFIX",
     "DEFAULT_SOURCE_FOLDER",
     "DEFAULT_TARGET_FOLDER",
     "DEFAULT_MAX_FILENAME_LENGTH",
     "DEFAULT_RATE_LIMIT_PER_MINUTE",
+    "BACKEND_RATE_LIMITS_PER_MINUTE",
+    "RATE_LIMIT_MAX_RETRIES",
+    "RATE_LIMIT_BACKOFF_SECONDS",
+    "PIPELINE_STAGE_WORKERS",
+    "PIPELINE_QUEUE_SIZE",
     "SPACY_MODEL",
+    "SPACY_NER_COMPONENTS",
+    "SPACY_EXCLUDED_COMPONENTS",
+    "SPACY_BATCH_SIZE",
+    "SPACY_N_PROCESS",
     "NER_CATEGORIES",
     "OLLAMA_MODEL_DESCRIPTION",
     "OLLAMA_MODEL_KEYWORDS",
+    "OLLAMA_DESCRIPTION_PROMPT",
+    "OLLAMA_KEYWORDS_PROMPT",
+    "OLLAMA_MAX_CONCURRENT_REQUESTS",
     "DATE_PATTERNS",
+    "DATE_ANCHOR_PATTERN",
+    "DATE_ANCHOR_MAX_OFFSET",
+    "DATE_SCAN_WINDOW",
     "ILLEGAL_CHARS",
     "WORD_VARIANTS",
     "OCR_CORRECTIONS",
+    "TEXT_CLEANER_CACHE_SIZE",
 ]
@@ -2,6 +2,7 @@
 Configuration settings for the Image File Namer application.
 """
 
+import os
 from pathlib import Path
 
 # File paths and directories
@@ -10,17 +11,145 @@ NAMES_TO_INCLUDE_FILE = WORDLISTS_DIR / "names_to_include.txt"
 NON_PERSONAL_NAMES_TO_INCLUDE = WORDLISTS_DIR / "non_personal_names_to_include.txt"
 WORDS_TO_INCLUDE_FILE = WORDLISTS_DIR / "words_to_include.txt"
 WORDS_TO_REMOVE_FILE = WORDLISTS_DIR / "words_to_remove.txt"
+# Check word list files for edits at most this often (seconds)
+WORDLIST_RELOAD_CHECK_SECONDS = 1.0
+
+# Supported image file extensions
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tiff", ".webp")
 
 # Default directories
 DEFAULT_SOURCE_FOLDER = "./images/to_name"
 DEFAULT_TARGET_FOLDER = "./images/named_images"
 
+# Persistent cache of OCR, description and keyword results
+CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "image-file-namer"
+)
+CACHE_FILE = CACHE_DIR / "results.sqlite3"
+CACHE_ENABLED = True
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Bump to invalidate cached results after changing how they are produced
+CACHE_VERSION = 1
+
+# Images are decoded once and downscaled before OCR and the vision model
+IMAGE_PREPROCESSING_ENABLED = True
+# The vision model works at a few hundred pixels, so larger inputs only add
+# transfer and prefill time
+VISION_IMAGE_MAX_SIDE = 896
+VISION_IMAGE_JPEG_QUALITY = 85
+# Large enough for small screenshot text to stay legible to OCR
+OCR_IMAGE_MAX_SIDE = 2560
+# Downscaled images are cached by the hash of the image bytes
+THUMBNAIL_CACHE_DIR = CACHE_DIR / "thumbnails"
+THUMBNAIL_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Prepared images kept in memory, shared by the OCR and description stages
+PREPARED_IMAGE_MEMORY_ITEMS = 8
+# Crop the image in memory before OCR: None, "presets" (the cropping_modes.json
+# preset matching the image size, see CROP_MODES_FILE) or "bands" (trim uniform
+# bands such as letterboxing and blank margins)
+OCR_CROP_MODE = None
+# Hand OCR a grayscale image
+OCR_GRAYSCALE = False
+# Largest pixel value range of a row or column still counted as a uniform band
+OCR_BAND_TOLERANCE = 12
+
+# Preprocessing of screenshots for storage (preprocess_images.py)
+CROP_MODES_FILE = Path("cropping_modes.json")
+PREPROCESS_JPEG_QUALITY = 70
+# Images are only downscaled if both sides are larger than this
+PREPROCESS_DOWNSCALE_MIN_SIDE = 600
+
+# Reuse the cached results of near-duplicate images (same screenshot at another
+# resolution or JPEG quality), found by perceptual hash. Off by default: text
+# screenshots with the same layout can hash alike.
+NEAR_DUPLICATES_ENABLED = False
+NEAR_DUPLICATE_INDEX_FILE = CACHE_DIR / "near_duplicates.sqlite3"
+# Largest Hamming distance between the 64-bit hashes of near-duplicates. Up to 3,
+# lookups only match exact 16-bit bands (well under a millisecond with a million
+# images); 4 to 7 also probe all band values one bit away, about 30x slower.
+NEAR_DUPLICATE_MAX_DISTANCE = 3
+# Largest relative difference of the aspect ratios of near-duplicates
+NEAR_DUPLICATE_MAX_ASPECT_DIFFERENCE = 0.02
+
+# Byte-identical copies of an image in the source folder, or of an image already
+# in the target folder: None (analyze them like any other image), "name" (move
+# them to the target folder under the name of the image they duplicate),
+# "hardlink" (the same, as a hard link to that image) or "skip" (leave them in
+# the source folder)
+DUPLICATE_POLICY = None
+# Files of equal size are first compared by a hash of this many bytes from each end
+DUPLICATE_PARTIAL_HASH_BYTES = 8192
+
+# Write-ahead journal kept in the target folder for resuming and undoing runs
+JOURNAL_FILENAME = ".image_file_namer_journal.jsonl"
+# Skip images that failed this many times in earlier runs
+JOURNAL_MAX_ATTEMPTS = 3
+# Runs whose renames stay in the journal (and can be undone) when it is compacted
+JOURNAL_KEEP_RUNS = 20
+
+# Watch mode: seconds between scans of the source folder, and how long a new
+# file's size and modification time must stay unchanged before it is processed
+WATCH_POLL_SECONDS = 2.0
+WATCH_SETTLE_SECONDS = 2.0
+
+# Naming service (server.py): address, images named concurrently (match
+# OLLAMA_NUM_PARALLEL on the Ollama server), images waiting or in progress
+# before new requests are refused, and maximum request body size
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_MAX_CONCURRENT_IMAGES = 4
+SERVER_MAX_QUEUED_IMAGES = 64
+SERVER_MAX_REQUEST_BYTES = 100 * 1024 * 1024
+
+# Metrics: upper bounds (seconds) of the stage duration histogram buckets, and
+# the prefix of the metric names in the Prometheus textfile
+METRICS_HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+METRICS_PREFIX = "image_file_namer"
+
 # Processing settings
 DEFAULT_MAX_FILENAME_LENGTH = 135
 DEFAULT_RATE_LIMIT_PER_MINUTE = 100  # Since we're using local LLM
 
+# Calls per minute per model backend. None uses DEFAULT_RATE_LIMIT_PER_MINUTE (or
+# the --rate-limit value), 0 disables limiting for that backend.
+BACKEND_RATE_LIMITS_PER_MINUTE = {
+    "ocr": 0,
+    "description": None,
+    "keywords": None,
+}
+# Retries of throttled backend calls, and the initial backoff when the server
+# gives no "retry after N seconds" hint (doubled on every retry)
+RATE_LIMIT_MAX_RETRIES = 3
+RATE_LIMIT_BACKOFF_SECONDS = 2
+
+# Pipelined batch processing: worker threads per stage and size of the bounded
+# queue in front of each stage. Docling and spaCy models are not shared safely
+# between threads, so keep "ocr" and "ner" at a single worker.
+PIPELINE_STAGE_WORKERS = {
+    "ocr": 1,
+    "describe": 1,
+    "keywords": 1,
+    "ner": 1,
+}
+PIPELINE_QUEUE_SIZE = 4
+
 # SpaCy model settings
 SPACY_MODEL = "en_core_web_sm"
+# Only entity recognition is used, so the other components are not loaded.
+# Components these ones listen to (e.g. a shared tok2vec) stay enabled.
+SPACY_NER_COMPONENTS = ("ner", "entity_ruler")
+SPACY_EXCLUDED_COMPONENTS = (
+    "tagger",
+    "parser",
+    "attribute_ruler",
+    "lemmatizer",
+    "senter",
+    "morphologizer",
+)
+# Batch settings for NERProcessor.get_words_of_interest_batch (nlp.pipe), also
+# the largest batch the pipeline's NER stage takes from its queue
+SPACY_BATCH_SIZE = 64
+SPACY_N_PROCESS = 1
 
 # Named Entity Recognition categories
 NER_CATEGORIES = [
@@ -39,14 +168,29 @@ NER_CATEGORIES = [
 OLLAMA_MODEL_DESCRIPTION = "gemma3:4b-it-qat"
 OLLAMA_MODEL_KEYWORDS = "gemma3:4b-it-qat"
 
+# Prompts sent to the LLM
+OLLAMA_DESCRIPTION_PROMPT = "Output keywords for this image in one line for the purpose of giving the image file a name for easy search. Just a single space between keywords. No emojis."
+OLLAMA_KEYWORDS_PROMPT = "Out of the following words, pick 15 keywords that you think are most relevant for naming an image file. If you can't find 15, just pick the ones you think are most relevant. No other text in the reply, no motivations, just the keywords one after another in a single line with a single space between: "
+
+# Maximum number of concurrent requests from the async Ollama client.
+# Match this to OLLAMA_NUM_PARALLEL on the Ollama server.
+OLLAMA_MAX_CONCURRENT_REQUESTS = 4
+
 # Date extraction patterns
+# Each pattern names its year, month and day groups; they are combined into a
+# single scanner, so at the same position earlier patterns take precedence
 DATE_PATTERNS = [
-    r"(?<!\d)(20\d{2}-\d{2}-\d{2})(?!\d)",  # YYYY-MM-DD
-    r"(?<!\d)(20\d{6})(?!\d)",  # YYYYMMDD
-    r"(?<!\d)(20\d{2}-\d{1,2}-\d{1,2})(?!\d)",  # YYYY-M-D or YYYY-MM-D
-    r"(?<!\d)(\d{1,2}/\d{1,2}/20\d{2})(?!\d)",  # M/D/YYYY or MM/DD/YYYY
-    r"(?<!\d)(\d{1,2}\.\d{1,2}\.20\d{2})(?!\d)",  # D.M.YYYY or DD.MM.YYYY
+    r"(?<!\d)(?P<year>20\d{2})-(?P<month>\d{1,2})-(?P<day>\d{1,2})(?!\d)",  # YYYY-MM-DD or YYYY-M-D
+    r"(?<!\d)(?P<year>20\d{2})(?P<month>\d{2})(?P<day>\d{2})(?!\d)",  # YYYYMMDD
+    r"(?<!\d)(?P<month>\d{1,2})/(?P<day>\d{1,2})/(?P<year>20\d{2})(?!\d)",  # M/D/YYYY or MM/DD/YYYY
+    r"(?<!\d)(?P<day>\d{1,2})\.(?P<month>\d{1,2})\.(?P<year>20\d{2})(?!\d)",  # D.M.YYYY or DD.MM.YYYY
 ]
+# Every date contains the anchor (the year) starting at most this many characters
+# after the date itself, so the scanner only tries the patterns around anchors
+DATE_ANCHOR_PATTERN = r"20\d{2}"
+DATE_ANCHOR_MAX_OFFSET = 6
+# Characters searched per step when looking for the last date in a text
+DATE_SCAN_WINDOW = 4096
 
 # Illegal filename characters
 ILLEGAL_CHARS = r"<>:,.•=-\"/\\|?*βß<>%&\{\}[]()$!#@;^`~''" "„‚'´¨»«€£¥—_§±"
@@ -66,6 +210,9 @@ WORD_VARIANTS = {
     "pandemi": "pandemic",
 }
 
+# Number of distinct tokens whose cleanup result OCRTextCleaner keeps
+TEXT_CLEANER_CACHE_SIZE = 65536
+
 # OCR text replacements
 OCR_CORRECTIONS = {
     "OAnon": "QAnon",
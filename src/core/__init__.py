@@ -1,13 +1,41 @@
 """
 Core package containing the main business logic classes.
+
+Classes are imported on first access (PEP 562).
 """
 
-from .filename_builder import FilenameBuilder
-from .image_file_namer import ImageFileNamer
-from .batch_processor import BatchProcessor
+import importlib
+from typing import TYPE_CHECKING
+
+# Exported name -> module defining it
+_EXPORTS = {
+    "FilenameBuilder": ".filename_builder",
+    "ImageFileNamer": ".image_file_namer",
+    "BatchProcessor": ".batch_processor",
+    "JobJournal": ".journal",
+    "ImagePipeline": ".pipeline",
+    "PipelineItem": ".pipeline",
+    "PipelineStage": ".pipeline",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .filename_builder import FilenameBuilder
+    from .image_file_namer import ImageFileNamer
+    from .batch_processor import BatchProcessor
+    from .journal import JobJournal
+    from .pipeline import ImagePipeline, PipelineItem, PipelineStage
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = [
-    "FilenameBuilder",
-    "ImageFileNamer",
-    "BatchProcessor",
-]
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -2,15 +2,56 @@
 Batch processor for handling multiple images.
 """
 
+import multiprocessing
 import os
-import time
-from pathlib import Path
+import threading
 from collections import deque
-from typing import Union
-from tqdm import tqdm
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Union
 
-from ..utils import count_image_files
+from ..config import (
+    BACKEND_RATE_LIMITS_PER_MINUTE,
+    CACHE_ENABLED,
+    DEFAULT_MAX_FILENAME_LENGTH,
+    DUPLICATE_POLICY,
+    JOURNAL_FILENAME,
+    JOURNAL_MAX_ATTEMPTS,
+    NEAR_DUPLICATES_ENABLED,
+    OCR_CROP_MODE,
+    OCR_GRAYSCALE,
+    PIPELINE_QUEUE_SIZE,
+    PIPELINE_STAGE_WORKERS,
+    RATE_LIMIT_BACKOFF_SECONDS,
+    RATE_LIMIT_MAX_RETRIES,
+    SPACY_BATCH_SIZE,
+    WATCH_POLL_SECONDS,
+    WATCH_SETTLE_SECONDS,
+)
+from ..utils import (
+    DUPLICATE_POLICIES,
+    DuplicateFinder,
+    FolderWatcher,
+    RateLimiter,
+    get_metrics,
+    iter_image_files,
+)
 from .image_file_namer import ImageFileNamer
+from .journal import STAGE_NAMED, JobJournal
+from .pipeline import ImagePipeline, PipelineItem, PipelineStage
+from .worker_pool import init_worker, name_image, thread_budget, threads_per_worker
+
+if TYPE_CHECKING:
+    from tqdm import tqdm
+
+# Mapping between pipeline stage names and the keys of ImageFileNamer.analyze_image
+_ANALYSIS_STAGES = {
+    "ocr": "ocr_text",
+    "describe": "description",
+    "keywords": "keywords",
+    "ner": "ner_words",
+}
 
 
 class BatchProcessor:
@@ -21,9 +62,126 @@ class BatchProcessor:
     and error handling during the renaming process.
     """
 
-    def __init__(self, rate_limit_per_minute: int = 100):
+    def __init__(
+        self,
+        rate_limit_per_minute: int = 100,
+        pipelined: bool = False,
+        stage_workers: Optional[Dict[str, int]] = None,
+        workers: int = 1,
+        use_cache: bool = CACHE_ENABLED,
+        use_journal: bool = True,
+        recursive: bool = False,
+        order: Optional[str] = None,
+        metrics_file: Optional[Union[str, Path]] = None,
+        trace_file: Optional[Union[str, Path]] = None,
+        ocr_crop: Optional[str] = OCR_CROP_MODE,
+        ocr_grayscale: bool = OCR_GRAYSCALE,
+        reuse_near_duplicates: bool = NEAR_DUPLICATES_ENABLED,
+        duplicate_policy: Optional[str] = DUPLICATE_POLICY,
+    ):
+        """
+        Args:
+            rate_limit_per_minute: Maximum calls per minute to each model backend
+                without an explicit limit in BACKEND_RATE_LIMITS_PER_MINUTE
+            pipelined: Overlap OCR, description, keyword and NER stages of different
+                images instead of processing one image at a time
+            stage_workers: Worker threads per pipeline stage, overriding
+                PIPELINE_STAGE_WORKERS for the stages given
+            workers: Number of worker processes; with more than one, images are
+                sharded over processes that each load their own models
+            use_cache: Cache OCR, description and keyword results on disk
+            use_journal: Keep a write-ahead journal in the target folder so an
+                interrupted run resumes where it stopped and can be undone
+            recursive: Also process images in subfolders of the source folder
+            order: Processing order: None (directory order, starts immediately),
+                "name", "mtime", "size" (largest first) or "smallest-first"
+            metrics_file: Prometheus textfile the stage timings and counters are
+                written to after a run (and after every batch in watch mode)
+            trace_file: JSONL file every timed stage call is appended to
+            ocr_crop: Crop images in memory before OCR: None, "presets" or "bands"
+            ocr_grayscale: Convert images to grayscale before OCR
+            reuse_near_duplicates: Reuse the cached results of near-duplicate
+                images (same screenshot at another resolution or quality)
+            duplicate_policy: What to do with byte-identical copies of an image
+                found earlier in the source folder or already in the target
+                folder, instead of analyzing them: None (analyze them anyway),
+                "name" (move them under the name of that image), "hardlink" (the
+                same, as a hard link to the named image) or "skip" (leave them
+                in the source folder)
+        """
+        if duplicate_policy is not None and duplicate_policy not in DUPLICATE_POLICIES:
+            raise ValueError(
+                f"Unknown duplicate policy '{duplicate_policy}', "
+                f"expected one of {', '.join(DUPLICATE_POLICIES)}"
+            )
         self.rate_limit_per_minute = rate_limit_per_minute
-        self.image_namer = ImageFileNamer()
+        self.pipelined = pipelined
+        self.stage_workers = dict(PIPELINE_STAGE_WORKERS)
+        if stage_workers:
+            self.stage_workers.update(stage_workers)
+        self.workers = max(1, workers)
+        self.use_cache = use_cache
+        self.use_journal = use_journal
+        self.recursive = recursive
+        self.order = order
+        self.metrics_file = metrics_file
+        self.trace_file = trace_file
+        self.ocr_crop = ocr_crop
+        self.ocr_grayscale = ocr_grayscale
+        self.reuse_near_duplicates = reuse_near_duplicates
+        self.duplicate_policy = duplicate_policy
+        if metrics_file is not None or trace_file is not None:
+            get_metrics().enable(trace_file)
+        self.journal: Optional[JobJournal] = None
+        self._image_namer = None
+        # Images that failed since the last watch batch, to be retried
+        self._failed_paths: List[Path] = []
+
+        # Exact duplicate detection: the finder is shared by the thread reading
+        # the source folder and the thread moving files, so both hold the lock.
+        # Duplicates wait (by the path of their original) until the original has
+        # been moved, then are ready to be placed next to it.
+        self._duplicates: Optional[DuplicateFinder] = None
+        self._duplicate_lock = threading.Lock()
+        self._waiting_duplicates: Dict[str, list] = {}
+        self._ready_duplicates: deque = deque()
+
+        rates = {
+            backend: rate_limit_per_minute if rate is None else rate
+            for backend, rate in BACKEND_RATE_LIMITS_PER_MINUTE.items()
+        }
+        # With worker processes the limiter's shared state is allocated from
+        # the spawn context, so it can be handed to the workers
+        self.rate_limiter = RateLimiter(
+            rates,
+            max_retries=RATE_LIMIT_MAX_RETRIES,
+            backoff_seconds=RATE_LIMIT_BACKOFF_SECONDS,
+            context=multiprocessing.get_context("spawn") if self.workers > 1 else None,
+        )
+
+    @property
+    def image_namer(self) -> ImageFileNamer:
+        """Get or create the ImageFileNamer used in this process."""
+        if self._image_namer is None:
+            self._image_namer = ImageFileNamer(
+                use_cache=self.use_cache,
+                rate_limiter=self.rate_limiter,
+                ocr_crop=self.ocr_crop,
+                ocr_grayscale=self.ocr_grayscale,
+                reuse_near_duplicates=self.reuse_near_duplicates,
+            )
+        return self._image_namer
+
+    @image_namer.setter
+    def image_namer(self, image_namer: ImageFileNamer):
+        image_namer.content_processor.rate_limiter = self.rate_limiter
+        self._image_namer = image_namer
+
+    def close(self):
+        """Stop the threads of the ImageFileNamer used in this process, if created."""
+        if self._image_namer is not None:
+            self._image_namer.close()
+            self._image_namer = None
 
     def process_images(
         self, source_folder: Union[str, Path], target_folder: Union[str, Path]
@@ -38,77 +196,681 @@ class BatchProcessor:
         source_folder = Path(source_folder)
         target_folder = Path(target_folder)
 
+        self._start_run(source_folder, target_folder)
+        try:
+            if self.workers > 1:
+                self._process_parallel(source_folder, target_folder)
+            elif self.pipelined:
+                self._process_pipelined(source_folder, target_folder)
+            else:
+                self._process_sequential(source_folder, target_folder)
+            self._finish_duplicates(target_folder)
+        finally:
+            if self.journal is not None:
+                self.journal.close()
+            self._export_metrics()
+
+    def watch(
+        self,
+        source_folder: Union[str, Path],
+        target_folder: Union[str, Path],
+        poll_interval: float = WATCH_POLL_SECONDS,
+        settle_seconds: float = WATCH_SETTLE_SECONDS,
+    ):
+        """
+        Keep the models loaded and process new images as they land in the source folder.
+
+        The source folder is rescanned every ``poll_interval`` seconds; a new file
+        is processed once its size and modification time have not changed for
+        ``settle_seconds``. Runs until interrupted. Images are processed in this
+        process (pipelined if enabled), so the models are loaded only once.
+        With the journal enabled, an image that fails is retried on the next
+        scan until it has failed ``JOURNAL_MAX_ATTEMPTS`` times.
+
+        Args:
+            source_folder: Path to the folder to watch
+            target_folder: Path to the target folder for processed images
+            poll_interval: Seconds between two scans of the source folder
+            settle_seconds: How long a file must stay unchanged before it is processed
+        """
+        source_folder = Path(source_folder)
+        target_folder = Path(target_folder)
+
+        if self.workers > 1:
+            print("Watch mode processes images in this process, ignoring workers.")
+
+        self._start_run(source_folder, target_folder)
+        try:
+            # Load the models before the first file arrives
+            image_namer = self.image_namer
+            image_namer.load_models()
+            watcher = FolderWatcher(
+                source_folder,
+                settle_seconds=settle_seconds,
+                recursive=self.recursive,
+                exclude=[target_folder],
+            )
+            print(f"Watching {source_folder} for new images (Ctrl+C to stop)...")
+            for ready in watcher.watch(poll_interval):
+                bar = self._progress_bar(len(ready))
+                image_paths = self._skip_duplicates(
+                    (path for path in ready if not self._failed_too_often(path)),
+                    bar,
+                    target_folder,
+                )
+                with bar:
+                    if self.pipelined:
+                        self._run_pipeline(image_paths, bar, target_folder)
+                    else:
+                        self._process_each(image_paths, bar, target_folder, image_namer)
+                self._finish_duplicates(target_folder)
+                self._export_metrics(summary=False)
+                # Without the journal nothing limits the attempts, so failed
+                # images are only picked up again once they change
+                failed, self._failed_paths = self._failed_paths, []
+                if self.journal is not None:
+                    for image_path in failed:
+                        watcher.retry(image_path)
+        finally:
+            if self.journal is not None:
+                self.journal.close()
+            self._export_metrics()
+
+    def _start_run(self, source_folder: Path, target_folder: Path):
+        """Create the target folder and open the journal for a new run."""
         # Ensure target folder exists
         target_folder.mkdir(parents=True, exist_ok=True)
+        self._failed_paths = []
 
-        # Use a deque to track the timestamps of processed images
-        timestamps = deque()
+        if self.use_journal:
+            self.journal = JobJournal(target_folder / JOURNAL_FILENAME)
+            reconciled = self.journal.reconcile()
+            if reconciled:
+                print(f"Journal: recorded {reconciled} renames from an earlier run.")
+            dropped = self.journal.compact()
+            if dropped:
+                print(f"Journal: dropped {dropped} old runs, they can no longer be undone.")
+            run_id = self.journal.start_run(source_folder, target_folder)
+            print(f"Journal run: {run_id}")
 
-        # Calculate total number of files once
-        total_files = count_image_files(str(source_folder))
-        processed_files = 0
+        if self.duplicate_policy is not None:
+            # Images already in the target folder are registered first, so they
+            # are the originals of their copies in the source folder
+            self._duplicates = DuplicateFinder()
+            for entry in iter_image_files(target_folder):
+                self._duplicates.find_original(entry.path, entry.stat().st_size)
+            print(
+                f"Checking for exact duplicates ({self.duplicate_policy}) against "
+                f"{len(self._duplicates)} images in {target_folder}"
+            )
 
-        # Define supported image extensions
-        image_extensions = [".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tiff", ".webp"]
-
-        for image_path in tqdm(
-            source_folder.glob("*"),
-            total=total_files,
-            desc="Processing images",
-            unit="image",
-        ):
-            # Process only image files
-            if image_path.is_file() and image_path.suffix.lower() in image_extensions:
-                current_time = time.time()
-                print(
-                    f"Processing {image_path} ({processed_files + 1} of {total_files})"
-                )
+    def undo(self, target_folder: Union[str, Path], run_id: Optional[str] = None):
+        """
+        Move the files renamed in a journaled run back to their original paths.
+
+        Args:
+            target_folder: Target folder of the run (where the journal is kept)
+            run_id: Run to undo (defaults to the most recent run with renames)
+
+        Returns:
+            Tuple of (restored files, files that could not be restored)
+        """
+        journal = JobJournal(Path(target_folder) / JOURNAL_FILENAME)
+        try:
+            return journal.undo(run_id)
+        finally:
+            journal.close()
 
-                # Remove timestamps older than 61 seconds from the deque (+1 to be on the safe side)
-                while timestamps and current_time - timestamps[0] > 61:
-                    timestamps.popleft()
+    def _process_sequential(self, source_folder: Path, target_folder: Path):
+        """Process images one at a time."""
+        image_paths, bar = self._discover(source_folder, target_folder)
+        with bar:
+            processed_files = self._process_each(
+                image_paths, bar, target_folder, self.image_namer
+            )
+        print(f"Finished processing {processed_files} images.")
+
+    def _process_each(
+        self,
+        image_paths: Iterator[Path],
+        bar: "tqdm",
+        target_folder: Path,
+        image_namer: ImageFileNamer,
+    ) -> int:
+        """
+        Analyze, name and move images one after the other.
 
-                # Check if processing limit has been reached
-                if len(timestamps) >= self.rate_limit_per_minute:
-                    sleep_time = 61 - (current_time - timestamps[0])
-                    print(f"Rate limit reached, sleeping for {sleep_time:.2f} seconds.")
-                    time.sleep(sleep_time)
-                    # After sleeping, update current time
-                    current_time = time.time()
+        Returns:
+            Number of images moved to the target folder
+        """
+        processed_files = 0
+        for image_path in image_paths:
+            bar.update(1)
+            print(f"Processing {image_path} ({bar.n} of {bar.total or '?'})")
 
+            state = self._resume_state(image_path)
+            if state is not None and state["stage"] == STAGE_NAMED:
+                new_filename = state["filename"]
+            else:
                 # Proceed with processing
+                stage = "analyze"
                 try:
-                    new_filename = self.image_namer.generate_new_filename(
-                        str(image_path)
+                    if state is not None:
+                        analysis = state["analysis"]
+                    else:
+                        analysis = image_namer.analyze_image(str(image_path))
+                        self._record_analyzed(image_path, analysis)
+                    stage = "name"
+                    new_filename = image_namer.build_filename(
+                        str(image_path), **analysis
                     ).strip()
-                    new_filename += image_path.suffix
-                    new_path = target_folder / new_filename
-
-                    # Rename (move) file to new location with a new name
-                    try:
-                        os.rename(image_path, new_path)
-                        print(f"Processed: {new_path}")
-                    except FileExistsError:
-                        # Try with a suffix if file exists
-                        name_stem = new_filename.rsplit(".", 1)[0]
-                        extension = new_filename.rsplit(".", 1)[1]
-                        new_filename_alt = f"{name_stem}_{image_path.suffix}"
-                        new_path_alt = target_folder / new_filename_alt
-                        try:
-                            os.rename(image_path, new_path_alt)
-                            print(
-                                f"Processed (renamed due to conflict): {new_path_alt}"
-                            )
-                        except Exception as e:
-                            print(f"Failed to process {image_path}: {e}")
-                            continue
-
                 except Exception as e:
                     print(f"Error processing {image_path}: {e}")
+                    self._record_failed(image_path, stage, e)
                     continue
 
-                # Log the timestamp of this processing
-                timestamps.append(time.time())
+            if self._move_to_target(image_path, new_filename, target_folder) is None:
+                continue
+
+            processed_files += 1
+        return processed_files
+
+    def _process_pipelined(self, source_folder: Path, target_folder: Path):
+        """
+        Process images through the multi-stage pipeline.
+
+        Each image goes OCR -> description -> keywords -> NER. The stages are
+        chained, but every stage has its own worker threads, so while one image
+        is being described the next ones are already in OCR. Renaming happens on
+        the calling thread.
+        """
+        image_paths, bar = self._discover(source_folder, target_folder)
+        with bar:
+            processed_files = self._run_pipeline(image_paths, bar, target_folder)
+        print(f"Finished processing {processed_files} images.")
+
+    def _run_pipeline(
+        self, image_paths: Iterator[Path], bar: "tqdm", target_folder: Path
+    ) -> int:
+        """
+        Run images through the stage pipeline and move the finished ones.
+
+        Returns:
+            Number of images moved to the target folder
+        """
+        processed_files = 0
+        pipeline = ImagePipeline(self._build_stages(), queue_size=PIPELINE_QUEUE_SIZE)
+
+        for item in pipeline.run(self._iter_pipeline_items(image_paths)):
+            bar.update(1)
+            resumed = item.results.pop("resumed", False)
+            if not resumed and "ner" in item.results:
+                self._record_analyzed(
+                    item.image_path,
+                    {key: item.results[stage] for stage, key in _ANALYSIS_STAGES.items()},
+                )
+
+            if item.error is not None:
+                print(
+                    f"Error processing {item.image_path} "
+                    f"in stage '{item.failed_stage}': {item.error}"
+                )
+                self._record_failed(item.image_path, item.failed_stage, item.error)
+                continue
+
+            new_filename = item.results["name"].strip()
+            if self._move_to_target(item.image_path, new_filename, target_folder):
                 processed_files += 1
+        return processed_files
+
+    def _process_parallel(self, source_folder: Path, target_folder: Path):
+        """
+        Shard the images over worker processes.
+
+        Workers only generate names; moving files happens in this process so
+        that filename conflicts are resolved in one place. At most two images
+        per worker are in flight, so discovery stays streaming. All workers share
+        this processor's rate limiter. If a worker dies (e.g. killed for running
+        out of memory), the images in flight are recorded as failed and no more
+        images are submitted; the rest stay in the source folder for the next run.
+        """
+        processed_files = 0
+        image_paths, bar = self._discover(source_folder, target_folder)
+        max_in_flight = self.workers * 2
+
+        max_filename_length = (
+            self._image_namer.filename_builder.max_length
+            if self._image_namer is not None
+            else DEFAULT_MAX_FILENAME_LENGTH
+        )
+        threads = threads_per_worker(self.workers)
+        metrics = get_metrics()
+        print(f"Starting {self.workers} worker processes, {threads} threads each.")
+
+        # Future -> image it names
+        pending: Dict = {}
+        broken = False
+
+        def handle(futures) -> int:
+            nonlocal broken
+            moved = 0
+            for future in futures:
+                image_path = pending.pop(future)
+                bar.update(1)
+                try:
+                    result = future.result()
+                except BrokenProcessPool as e:
+                    broken = True
+                    self._record_failed(image_path, "worker", e)
+                    continue
+                except Exception as e:
+                    print(f"Error processing {image_path}: {e}")
+                    self._record_failed(image_path, "worker", e)
+                    continue
+                if result["metrics"] is not None:
+                    metrics.merge(result["metrics"])
+                if result["analysis"] is not None and not result["resumed"]:
+                    self._record_analyzed(image_path, result["analysis"])
+                if result["error"] is not None:
+                    print(f"Error processing {image_path}: {result['error']}")
+                    self._record_failed(
+                        image_path, result["failed_stage"], result["error"]
+                    )
+                    continue
+                if self._move_to_target(image_path, result["filename"], target_folder):
+                    moved += 1
+            return moved
+
+        # Spawn fresh interpreters: forking after torch has started its
+        # thread pools is unsafe, and the thread budget must be in the
+        # environment before the worker imports torch.
+        context = multiprocessing.get_context("spawn")
+
+        with thread_budget(threads), bar, ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=init_worker,
+            initargs=(
+                threads,
+                max_filename_length,
+                self.use_cache,
+                self.rate_limiter,
+                metrics.enabled,
+                str(self.trace_file) if self.trace_file is not None else None,
+                self.ocr_crop,
+                self.ocr_grayscale,
+                self.reuse_near_duplicates,
+            ),
+        ) as executor:
+            for image_path in image_paths:
+                if broken:
+                    break
+                state = self._resume_state(image_path)
+                if state is not None and state["stage"] == STAGE_NAMED:
+                    # Name already chosen: just finish the rename
+                    bar.update(1)
+                    if self._move_to_target(
+                        image_path, state["filename"], target_folder
+                    ):
+                        processed_files += 1
+                    continue
 
+                analysis = state["analysis"] if state is not None else None
+                try:
+                    future = executor.submit(name_image, str(image_path), analysis)
+                except BrokenProcessPool as e:
+                    broken = True
+                    bar.update(1)
+                    self._record_failed(image_path, "worker", e)
+                    break
+                pending[future] = image_path
+                if len(pending) >= max_in_flight:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    processed_files += handle(done)
+
+            done, _ = wait(pending)
+            processed_files += handle(done)
+
+        if broken:
+            print(
+                "A worker process terminated abruptly (out of memory?); stopped "
+                "submitting images. Unprocessed images are left in the source "
+                "folder, run again to process them."
+            )
         print(f"Finished processing {processed_files} images.")
+
+    def _build_stages(self):
+        """Create the pipeline stages backed by this processor's ImageFileNamer."""
+        image_namer = self.image_namer
+        content_processor = image_namer.content_processor
+
+        def ocr(item: PipelineItem) -> str:
+            return content_processor.extract_ocr_text(str(item.image_path))
+
+        def describe(item: PipelineItem) -> str:
+            return content_processor.get_image_description(str(item.image_path))
+
+        def keywords(item: PipelineItem) -> str:
+            return content_processor.extract_keywords_from_text(
+                item.results["ocr"], item.results["describe"]
+            )
+
+        def ner(item: PipelineItem) -> str:
+            return image_namer.find_words_of_interest(item.results["ocr"])
+
+        def ner_batch(items: List[PipelineItem]) -> List[str]:
+            return image_namer.find_words_of_interest_batch(
+                [item.results["ocr"] for item in items]
+            )
+
+        def name(item: PipelineItem) -> str:
+            return image_namer.build_filename(
+                str(item.image_path),
+                ocr_text=item.results["ocr"],
+                keywords=item.results["keywords"],
+                ner_words=item.results["ner"],
+            )
+
+        stages = [
+            PipelineStage("ocr", ocr, self.stage_workers.get("ocr", 1)),
+            PipelineStage("describe", describe, self.stage_workers.get("describe", 1)),
+            PipelineStage("keywords", keywords, self.stage_workers.get("keywords", 1)),
+            # NER takes the images piled up in front of it through nlp.pipe
+            PipelineStage(
+                "ner",
+                ner,
+                self.stage_workers.get("ner", 1),
+                batch_func=ner_batch,
+                batch_size=SPACY_BATCH_SIZE,
+            ),
+            PipelineStage("name", name, 1),
+        ]
+        return stages
+
+    def _discover(
+        self, source_folder: Path, target_folder: Path
+    ) -> Tuple[Iterator[Path], "tqdm"]:
+        """
+        Start discovering the images in the source folder.
+
+        Without an ordering policy, images stream straight from os.scandir and
+        the progress bar total is filled in by a background count. With one, the
+        sorted listing gives the total directly.
+
+        Returns:
+            Tuple of (iterator of image paths, progress bar)
+        """
+
+        def discover():
+            return iter_image_files(
+                source_folder,
+                recursive=self.recursive,
+                order=self.order,
+                exclude=[target_folder],
+            )
+
+        entries = discover()
+        total = None
+        if self.order is not None:
+            entries = list(entries)
+            total = len(entries)
+
+        bar = self._progress_bar(total)
+        if total is None:
+
+            def count():
+                bar.total = sum(1 for _ in discover())
+                bar.refresh()
+
+            threading.Thread(target=count, name="image-count", daemon=True).start()
+
+        image_paths = (
+            Path(entry.path)
+            for entry in entries
+            if not self._failed_too_often(Path(entry.path))
+        )
+        return self._skip_duplicates(image_paths, bar, target_folder), bar
+
+    @staticmethod
+    def _progress_bar(total: Optional[int]) -> "tqdm":
+        """Create the progress bar of a run (tqdm is imported on first use)."""
+        from tqdm import tqdm
+
+        return tqdm(total=total, desc="Processing images", unit="image")
+
+    def _iter_pipeline_items(self, image_paths: Iterator[Path]) -> Iterator[PipelineItem]:
+        """
+        Yield pipeline items for the discovered images.
+
+        Items are pre-filled with journaled results, so resumed images skip the
+        stages they already finished.
+        """
+        for image_path in image_paths:
+            item = PipelineItem(image_path=image_path)
+            state = self._resume_state(image_path)
+            if state is not None:
+                item.results["resumed"] = True
+                for stage, key in _ANALYSIS_STAGES.items():
+                    item.results[stage] = state["analysis"][key]
+                if state["stage"] == STAGE_NAMED:
+                    item.results["name"] = state["filename"]
+            yield item
+
+    def _failed_too_often(self, image_path: Path) -> bool:
+        """Check whether the journal says an image keeps failing."""
+        if self.journal is None:
+            return False
+        if self.journal.failed_attempts(image_path) < JOURNAL_MAX_ATTEMPTS:
+            return False
+        print(f"Skipping {image_path}: failed {JOURNAL_MAX_ATTEMPTS} times before")
+        get_metrics().increment("images_total", result="skipped")
+        return True
+
+    def _resume_state(self, image_path: Path) -> Optional[dict]:
+        """Get the journaled state to resume an image from, if any."""
+        if self.journal is None:
+            return None
+        state = self.journal.entry(image_path)
+        if state is not None:
+            print(f"Resuming {image_path} from journal stage '{state['stage']}'")
+        return state
+
+    def _export_metrics(self, summary: bool = True):
+        """Print the stage timings and write the Prometheus textfile, if enabled."""
+        metrics = get_metrics()
+        if not metrics.enabled:
+            return
+        if summary:
+            metrics.print_summary()
+        if self.metrics_file is not None:
+            metrics.write_prometheus(self.metrics_file)
+            if summary:
+                print(f"Metrics written to {self.metrics_file}")
+
+    def _record_analyzed(self, image_path: Path, analysis: Dict[str, str]):
+        if self.journal is not None:
+            self.journal.record_analyzed(image_path, analysis)
+
+    def _record_failed(self, image_path: Path, stage: str, error):
+        get_metrics().increment("images_total", result="failed")
+        self._failed_paths.append(image_path)
+        if self.journal is not None:
+            self.journal.record_failed(image_path, stage, error)
+
+    def _skip_duplicates(
+        self, image_paths: Iterator[Path], bar: "tqdm", target_folder: Path
+    ) -> Iterator[Path]:
+        """
+        Filter the exact duplicates out of the images to analyze.
+
+        Duplicates are left in place (policy "skip") or queued to be placed in
+        the target folder once the image they duplicate has been moved there.
+        Runs on whichever thread consumes the images, e.g. the pipeline feeder.
+
+        Args:
+            image_paths: Images to process
+            bar: Progress bar of the run, advanced for every duplicate
+            target_folder: Target folder of the run
+
+        Yields:
+            The images that are not duplicates
+        """
+        if self._duplicates is None:
+            yield from image_paths
+            return
+
+        metrics = get_metrics()
+        for image_path in image_paths:
+            with self._duplicate_lock:
+                original = self._duplicates.find_original(image_path)
+                if original is not None and self.duplicate_policy != "skip":
+                    original = Path(original)
+                    if original.parent == target_folder:
+                        self._ready_duplicates.append((image_path, original))
+                    else:
+                        self._waiting_duplicates.setdefault(str(original), []).append(
+                            image_path
+                        )
+            if original is None:
+                yield image_path
+                continue
+
+            bar.update(1)
+            metrics.increment("duplicates_total", policy=self.duplicate_policy)
+            print(f"{image_path} is a duplicate of {original}")
+            if self.duplicate_policy == "skip":
+                metrics.increment("images_total", result="skipped")
+
+    def _place_duplicates(self, target_folder: Path):
+        """Move the duplicates whose original is in the target folder next to it."""
+        while True:
+            with self._duplicate_lock:
+                if not self._ready_duplicates:
+                    return
+                image_path, original = self._ready_duplicates.popleft()
+
+            new_filename = self._free_filename(
+                original.stem, image_path.suffix, target_folder
+            )
+            link_to = original if self.duplicate_policy == "hardlink" else None
+            self._place(image_path, new_filename, target_folder, link_to=link_to)
+
+    def _finish_duplicates(self, target_folder: Path):
+        """Place the remaining duplicates and report those whose original failed."""
+        if self._duplicates is None:
+            return
+        self._place_duplicates(target_folder)
+        with self._duplicate_lock:
+            left = sum(len(paths) for paths in self._waiting_duplicates.values())
+            self._waiting_duplicates.clear()
+        if left:
+            print(
+                f"Left {left} duplicates in the source folder: "
+                "the images they duplicate could not be renamed."
+            )
+
+    @staticmethod
+    def _free_filename(stem: str, suffix: str, target_folder: Path) -> str:
+        """First of stem, stem_2, stem_3, ... not taken in the target folder."""
+        new_filename = stem
+        number = 1
+        while (target_folder / (new_filename + suffix)).exists():
+            number += 1
+            new_filename = f"{stem}_{number}"
+        return new_filename
+
+    def _move_to_target(
+        self, image_path: Path, new_filename: str, target_folder: Path
+    ) -> Optional[Path]:
+        """
+        Move an image into the target folder under its new name.
+
+        Duplicates of the image that were waiting for its name are placed
+        right after it.
+
+        Args:
+            image_path: Current path of the image
+            new_filename: New filename without extension
+            target_folder: Folder to move the image into
+
+        Returns:
+            The new path of the image, or None if it could not be moved
+        """
+        new_path = self._place(image_path, new_filename, target_folder)
+        if new_path is not None and self._duplicates is not None:
+            with self._duplicate_lock:
+                self._duplicates.moved(image_path, new_path)
+                for duplicate in self._waiting_duplicates.pop(str(image_path), ()):
+                    self._ready_duplicates.append((duplicate, new_path))
+            self._place_duplicates(target_folder)
+        return new_path
+
+    def _place(
+        self,
+        image_path: Path,
+        new_filename: str,
+        target_folder: Path,
+        link_to: Optional[Path] = None,
+    ) -> Optional[Path]:
+        """
+        Move an image (or hard link its duplicate) into the target folder.
+
+        The chosen path is journaled before the rename, so a crash in between is
+        detected on the next run.
+
+        Args:
+            image_path: Current path of the image
+            new_filename: New filename without extension
+            target_folder: Folder to move the image into
+            link_to: File with the same bytes to hard link instead of moving the
+                image; the image is removed once the link exists
+
+        Returns:
+            The new path of the image, or None if it could not be moved
+        """
+        new_path = target_folder / (new_filename + image_path.suffix)
+        conflict = new_path.exists()
+        if conflict:
+            # Try with a suffix if file exists
+            new_path = target_folder / f"{new_filename}_{image_path.suffix}"
+            if new_path.exists():
+                print(f"Failed to process {image_path}: {new_path} already exists")
+                self._record_failed(image_path, "rename", "target exists")
+                return None
+
+        with get_metrics().span("rename", image=image_path):
+            if self.journal is not None:
+                self.journal.record_named(image_path, new_filename, new_path)
+
+            # Rename (move) file to new location with a new name
+            try:
+                if link_to is not None:
+                    self._link_duplicate(image_path, link_to, new_path)
+                else:
+                    os.rename(image_path, new_path)
+            except Exception as e:
+                print(f"Failed to process {image_path}: {e}")
+                self._record_failed(image_path, "rename", e)
+                return None
+
+            if self.journal is not None:
+                self.journal.record_renamed(image_path, new_path)
+        get_metrics().increment("images_total", result="renamed")
+
+        if conflict:
+            print(f"Processed (renamed due to conflict): {new_path}")
+        else:
+            print(f"Processed: {new_path}")
+        return new_path
+
+    @staticmethod
+    def _link_duplicate(image_path: Path, original: Path, new_path: Path):
+        """Hard link a duplicate's original to its new path and remove the duplicate."""
+        try:
+            os.link(original, new_path)
+        except OSError as e:
+            # E.g. the folders are on different filesystems
+            print(f"Could not hard link {original}, moving {image_path} instead: {e}")
+            os.rename(image_path, new_path)
+            return
+        os.remove(image_path)
@@ -4,11 +4,11 @@ Filename builder and optimizer.
 
 import re
 import random
-from typing import Set
+from typing import FrozenSet, List, Optional, Pattern, Set, Tuple
 
 from ..config import DEFAULT_MAX_FILENAME_LENGTH, WORD_VARIANTS
 from ..utils import (
-    load_words_from_file,
+    get_wordlist,
     sanitize_filename_basic,
     remove_duplicate_words,
 )
@@ -20,41 +20,47 @@ from ..config import (
 )
 
 
+# Maximal runs of word characters, i.e. the spans a \b<word>\b pattern can match
+_WORD_RUN = re.compile(r"\w+")
+_SINGLE_WORD = re.compile(r"\w+\Z")
+_MULTIPLE_SPACES = re.compile(r" +")
+
+
 class FilenameBuilder:
     """Handles filename generation and optimization."""
 
     def __init__(self, max_length: int = DEFAULT_MAX_FILENAME_LENGTH):
         self.max_length = max_length
         self._load_wordlists()
+        # Word removal compiled for one version of words_to_remove:
+        # (that version, its single words, patterns for its other entries)
+        self._removal: Optional[
+            Tuple[FrozenSet[str], FrozenSet[str], List[Pattern]]
+        ] = None
 
     def _load_wordlists(self):
-        """Load all wordlists for filtering."""
-        self.words_to_remove = set()
-        self.words_to_include = set()
-        self.names_to_include = set()
-        self.non_personal_names = set()
-
-        # Load words to remove
-        words_list = load_words_from_file(str(WORDS_TO_REMOVE_FILE))
-        if words_list:
-            self.words_to_remove = {word.lower() for word in words_list if word}
-
-        # Load words to include
-        words_list = load_words_from_file(str(WORDS_TO_INCLUDE_FILE))
-        if words_list:
-            self.words_to_include = {word.lower() for word in words_list if word}
-
-        # Load names to include
-        names_list = load_words_from_file(str(NAMES_TO_INCLUDE_FILE))
-        if names_list:
-            self.names_to_include = {word.lower() for word in names_list if word}
-
-        # Load non-personal names
-        non_personal_list = load_words_from_file(str(NON_PERSONAL_NAMES_TO_INCLUDE))
-        if non_personal_list:
-            self.non_personal_names = {
-                word.lower() for word in non_personal_list if word
-            }
+        """Get the shared compiled wordlists used for filtering."""
+        self._words_to_remove = get_wordlist(WORDS_TO_REMOVE_FILE)
+        self._words_to_include = get_wordlist(WORDS_TO_INCLUDE_FILE)
+        self._names_to_include = get_wordlist(NAMES_TO_INCLUDE_FILE)
+        self._non_personal_names = get_wordlist(NON_PERSONAL_NAMES_TO_INCLUDE)
+
+    # Lowercased wordlist contents, reloaded when a file is edited
+    @property
+    def words_to_remove(self) -> Set[str]:
+        return self._words_to_remove.lowered
+
+    @property
+    def words_to_include(self) -> Set[str]:
+        return self._words_to_include.lowered
+
+    @property
+    def names_to_include(self) -> Set[str]:
+        return self._names_to_include.lowered
+
+    @property
+    def non_personal_names(self) -> Set[str]:
+        return self._non_personal_names.lowered
 
     def build_optimized_filename(
         self, words_text: str, date_prefix: str = "", max_length: int = None
@@ -87,6 +93,15 @@ class FilenameBuilder:
         available_words = words_text.split()
         seen_words = set()
 
+        # Take the wordlists once, not per word
+        words_to_remove = self.words_to_remove
+        words_to_include = self.words_to_include
+        names_to_include = self.names_to_include
+        non_personal_names = self.non_personal_names
+        has_include_lists = bool(
+            words_to_include or names_to_include or non_personal_names
+        )
+
         # If we have a date prefix, add its words to seen_words to avoid duplication
         if date_prefix:
             for word in date_prefix.split():
@@ -120,26 +135,21 @@ class FilenameBuilder:
                 continue
 
             # Check wordlists - skip if word should be removed
-            if cleaned_word in self.words_to_remove:
+            if cleaned_word in words_to_remove:
                 continue
 
             # Check if word is in include lists (if they exist and are not empty)
             # Words are kept if: they are in include lists OR no include lists exist OR word is not commonly filtered
             should_include = True
-            has_include_lists = bool(
-                self.words_to_include
-                or self.names_to_include
-                or self.non_personal_names
-            )
 
             if has_include_lists:
                 # Include if the word is specifically in one of the include lists
                 # OR if the word is longer than 3 characters (likely meaningful content)
                 # This allows both curated important words and substantial content words
                 should_include = (
-                    cleaned_word in self.words_to_include
-                    or cleaned_word in self.names_to_include
-                    or cleaned_word in self.non_personal_names
+                    cleaned_word in words_to_include
+                    or cleaned_word in names_to_include
+                    or cleaned_word in non_personal_names
                     or len(cleaned_word) > 3
                 )
 
@@ -180,15 +190,57 @@ class FilenameBuilder:
         filename = remove_duplicate_words(filename)
 
         # Remove specified words using word boundaries
-        for word in self.words_to_remove:
-            regex_pattern = r"\s*\b" + re.escape(word) + r"\b\s*"
-            filename = re.sub(regex_pattern, " ", filename, flags=re.IGNORECASE)
+        filename = self.remove_words(filename)
 
         # Clean up multiple spaces
-        filename = re.sub(r" +", " ", filename)
+        filename = _MULTIPLE_SPACES.sub(" ", filename)
 
         return filename.strip()
 
+    def remove_words(self, text: str) -> str:
+        """
+        Remove the words of words_to_remove from a text, case-insensitively.
+
+        Gives the same result as replacing ``\\s*\\b<word>\\b\\s*`` with a space for
+        every word, but single words (the common case) are removed in one pass:
+        such a pattern can only match a whole run of word characters, so each run
+        is looked up in a set instead of scanning the text once per word. Entries
+        containing other characters, such as phrases, still use a regex each.
+        Leftover spaces are not collapsed.
+
+        Args:
+            text: Text to filter
+
+        Returns:
+            The text with the words replaced by spaces
+        """
+        _, single_words, patterns = self._compile_removal()
+
+        for pattern in patterns:
+            text = pattern.sub(" ", text)
+
+        def replace(match):
+            word = match.group()
+            return " " if word.lower() in single_words else word
+
+        if single_words:
+            text = _WORD_RUN.sub(replace, text)
+        return text
+
+    def _compile_removal(self):
+        """Compile words_to_remove, again only after the wordlist was reloaded."""
+        words_to_remove = self.words_to_remove
+        if self._removal is None or self._removal[0] is not words_to_remove:
+            single_words = frozenset(
+                word for word in words_to_remove if _SINGLE_WORD.match(word)
+            )
+            patterns = [
+                re.compile(r"\s*\b" + re.escape(word) + r"\b\s*", re.IGNORECASE)
+                for word in sorted(words_to_remove - single_words)
+            ]
+            self._removal = (words_to_remove, single_words, patterns)
+        return self._removal
+
     def create_fallback_filename(self, date_prefix: str = "") -> str:
         """
         Create a fallback filename when no meaningful content is found.
@@ -3,15 +3,25 @@ Main image file namer class that orchestrates the entire process.
 """
 
 import random
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
+from ..config import (
+    CACHE_ENABLED,
+    NEAR_DUPLICATES_ENABLED,
+    OCR_CROP_MODE,
+    OCR_GRAYSCALE,
+)
 from ..processors import ContentProcessor, NERProcessor
 from ..utils import (
+    NearDuplicateIndex,
+    RateLimiter,
+    ResultCache,
     extract_date_from_ocr_text,
     extract_date_from_filename_or_timestamp,
-    fix_common_ocr_mistakes,
-    remove_gibberish,
+    clean_ocr_text,
+    get_metrics,
 )
 from .filename_builder import FilenameBuilder
 
@@ -24,10 +34,72 @@ class ImageFileNamer:
     and filename generation into a single cohesive workflow.
     """
 
-    def __init__(self, max_filename_length: int = 135):
-        self.content_processor = ContentProcessor()
-        self.ner_processor = NERProcessor()
+    def __init__(
+        self,
+        max_filename_length: int = 135,
+        use_cache: bool = CACHE_ENABLED,
+        rate_limiter: Optional[RateLimiter] = None,
+        content_processor: Optional[ContentProcessor] = None,
+        ner_processor: Optional[NERProcessor] = None,
+        ocr_crop: Optional[str] = OCR_CROP_MODE,
+        ocr_grayscale: bool = OCR_GRAYSCALE,
+        reuse_near_duplicates: bool = NEAR_DUPLICATES_ENABLED,
+    ):
+        """
+        Args:
+            max_filename_length: Maximum length of generated filenames
+            use_cache: Cache OCR, description and keyword results on disk
+            rate_limiter: Rate limiter for the OCR and LLM backend calls
+            content_processor: ContentProcessor to use instead of creating one
+                (the other content processing arguments are then ignored)
+            ner_processor: NERProcessor to use instead of creating one
+            ocr_crop: Crop the image in memory before OCR to cut the OCR work:
+                None, "presets" (crop preset matching the image size) or
+                "bands" (trim uniform edge bands); the file itself is untouched
+            ocr_grayscale: Convert the image to grayscale before OCR
+            reuse_near_duplicates: Reuse the cached OCR text and description of
+                a near-duplicate image (found by perceptual hash) instead of
+                running the models; requires use_cache
+        """
+        if content_processor is None:
+            cache = ResultCache() if use_cache else None
+            content_processor = ContentProcessor(
+                cache=cache,
+                rate_limiter=rate_limiter,
+                ocr_crop=ocr_crop,
+                ocr_grayscale=ocr_grayscale,
+                near_duplicates=(
+                    NearDuplicateIndex() if use_cache and reuse_near_duplicates else None
+                ),
+            )
+        self.content_processor = content_processor
+        self.ner_processor = ner_processor or NERProcessor()
         self.filename_builder = FilenameBuilder(max_filename_length)
+        # OCR runs on its own thread while the description is requested from the
+        # LLM. One thread, so each namer runs one OCR at a time; the Docling
+        # converter itself is shared and serialized by the model registry's
+        # "docling" lock. Shut down by close().
+        self._ocr_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="ocr"
+        )
+
+    def load_models(self):
+        """
+        Load the OCR and NER models now.
+
+        Models are otherwise loaded when the first image needs them; long-running
+        callers (watch mode, worker processes) load them up front instead.
+        """
+        self.content_processor.load_models()
+        self.ner_processor.nlp
+
+    def close(self):
+        """
+        Stop the OCR thread, waiting for a running OCR to finish.
+
+        The namer cannot analyze images afterwards; the shared models stay loaded.
+        """
+        self._ocr_executor.shutdown(wait=True)
 
     def generate_new_filename(self, image_path: str) -> str:
         """
@@ -50,12 +122,113 @@ class ImageFileNamer:
             The filename is optimized to maximize unique words within a 135 character limit for
             compatibility with various file systems and platforms.
         """
-        # Extract OCR text from image
-        ocr_text = self.content_processor.extract_ocr_text(image_path)
+        analysis = self.analyze_image(image_path)
+        return self.build_filename(image_path, **analysis)
+
+    def analyze_image(self, image_path: str) -> Dict[str, str]:
+        """
+        Run all model stages (OCR, description, keywords and NER) for an image.
+
+        OCR and the image description only need the image, so they run
+        concurrently and take about as long as the slower of the two.
+
+        Args:
+            image_path: The path to the image file to be analyzed.
+
+        Returns:
+            Dictionary with the keys ``ocr_text``, ``description``, ``keywords``
+            and ``ner_words`` holding the output of each stage.
+        """
+        with get_metrics().span("analyze", image=image_path):
+            # Extract OCR text from image in the background
+            ocr_future = self._ocr_executor.submit(
+                self.content_processor.extract_ocr_text, image_path
+            )
+
+            # Get descriptive keywords for the image meanwhile
+            try:
+                description_text = self.content_processor.get_image_description(
+                    image_path
+                )
+            except Exception:
+                # Don't leave the OCR running behind a failed image
+                wait([ocr_future])
+                raise
+            ocr_text = ocr_future.result()
+
+            # Extract keywords using LLM
+            keywords = self.content_processor.extract_keywords_from_text(
+                ocr_text, description_text
+            )
+
+            ner_words = self.find_words_of_interest(ocr_text)
+
+        return {
+            "ocr_text": ocr_text,
+            "description": description_text,
+            "keywords": keywords,
+            "ner_words": ner_words,
+        }
+
+    def find_words_of_interest(self, ocr_text: str) -> str:
+        """
+        Find the names of people, places, organizations etc. in the OCR text.
+
+        Args:
+            ocr_text: Text extracted from the image by OCR
+
+        Returns:
+            Space-separated words of interest found by NER and the word lists
+        """
+        # Add back any words of people, places, organizations etc using NER
+        ner_words = self.ner_processor.get_words_of_interest(ocr_text)
+        print(f"Words of interest: {ner_words}")
+        return ner_words
+
+    def find_words_of_interest_batch(self, ocr_texts: List[str]) -> List[str]:
+        """
+        Find the words of interest in the OCR text of several images at once.
 
-        # Get descriptive keywords for the image
-        description_text = self.content_processor.get_image_description(image_path)
+        Args:
+            ocr_texts: Texts extracted from the images by OCR
 
+        Returns:
+            Words of interest of each text, in order (see ``find_words_of_interest``)
+        """
+        batch = self.ner_processor.get_words_of_interest_batch(ocr_texts)
+        for ner_words in batch:
+            print(f"Words of interest: {ner_words}")
+        return batch
+
+    def build_filename(
+        self,
+        image_path: str,
+        ocr_text: str,
+        keywords: str,
+        ner_words: str,
+        description: str = "",
+    ) -> str:
+        """
+        Build the final filename from the output of the model stages.
+
+        Args:
+            image_path: The path to the image file (used for the date fallback)
+            ocr_text: Text extracted from the image by OCR
+            keywords: Keywords selected by the LLM
+            ner_words: Words of interest found by NER and the word lists
+            description: Descriptive text for the image (unused, accepted so the
+                result of ``analyze_image`` can be passed straight through)
+
+        Returns:
+            A new, sanitized filename without extension.
+        """
+        with get_metrics().span("name", image=image_path):
+            return self._build_filename(image_path, ocr_text, keywords, ner_words)
+
+    def _build_filename(
+        self, image_path: str, ocr_text: str, keywords: str, ner_words: str
+    ) -> str:
+        """Pick the date and build the filename (see ``build_filename``)."""
         # Extract date with priority: 1) OCR text, 2) filename, 3) file timestamp
         print("Extracting date with priority: OCR text -> filename -> timestamp")
         found_dates = extract_date_from_ocr_text(ocr_text)
@@ -69,18 +242,10 @@ class ImageFileNamer:
             else:
                 print("No date found in filename or timestamp")
 
-        # Extract keywords using LLM
-        keywords = self.content_processor.extract_keywords_from_text(
-            ocr_text, description_text
-        )
-
-        # Add back any words of people, places, organizations etc using NER
-        ner_words = self.ner_processor.get_words_of_interest(ocr_text)
-        print(f"Words of interest: {ner_words}")
         combined_keywords = ner_words + keywords
 
         # Clean up the text first (only character cleaning, not wordlist filtering)
-        processed_text = fix_common_ocr_mistakes(remove_gibberish(combined_keywords))
+        processed_text = clean_ocr_text(combined_keywords)
         processed_text = self.filename_builder.sanitize_filename(processed_text)
 
         # Build optimized filename with incremental duplicate checking, wordlist filtering, and length management
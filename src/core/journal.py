@@ -0,0 +1,391 @@
+"""
+Crash-safe write-ahead journal of batch runs.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from ..config import JOURNAL_KEEP_RUNS
+
+# Stages recorded per file, in the order they are reached
+STAGE_ANALYZED = "analyzed"
+STAGE_NAMED = "named"
+STAGE_RENAMED = "renamed"
+STAGE_FAILED = "failed"
+STAGE_UNDONE = "undone"
+
+
+class JobJournal:
+    """
+    Append-only JSON lines journal recording per-file progress of batch runs.
+
+    Every event is flushed and fsynced before the corresponding action, so after a
+    crash the journal tells which images were already analyzed (and with what
+    result), which name was chosen for them and whether the rename happened. A
+    torn last line from a crash is ignored when the journal is read back.
+
+    Events:
+        run:      a new run started
+        analyzed: model stages finished; the analysis is stored for resuming
+        named:    a target path was chosen, written before the rename
+        renamed:  the file was moved to its target path
+        failed:   a stage raised an error
+        undone:   a rename was reverted by undo()
+        file:     the state of an unfinished file, written by compact()
+
+    Only unfinished files are kept in memory: once a file is renamed, just the
+    rename is remembered for undo. ``compact`` rewrites the journal with the
+    unfinished files and the renames of the most recent runs, so the journal
+    does not grow with every run.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.run_id = None
+        self._lock = threading.Lock()
+        self._file = None
+        # Latest state per source file, and the runs in order of appearance
+        self._files: Dict[str, dict] = {}
+        self._runs: List[str] = []
+        self._renames: Dict[str, List[Tuple[str, str]]] = {}
+        self._load()
+
+    @staticmethod
+    def _key(image_path: Union[str, Path]) -> str:
+        return str(Path(image_path).resolve())
+
+    def _load(self):
+        """Replay the journal into the in-memory state."""
+        if not self.path.exists():
+            return
+
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn write from a crash
+                    continue
+                self._apply(event)
+
+    def _apply(self, event: dict):
+        """Update the in-memory state with a single event."""
+        kind = event.get("event")
+        run_id = event.get("run")
+
+        if kind == "run":
+            self._runs.append(run_id)
+            self._renames.setdefault(run_id, [])
+            return
+
+        key = event.get("file")
+        if key is None:
+            return
+        state = self._files.setdefault(key, {"attempts": 0})
+
+        if kind == STAGE_ANALYZED:
+            state.update(
+                stage=STAGE_ANALYZED,
+                size=event["size"],
+                mtime=event["mtime"],
+                analysis=event["analysis"],
+            )
+        elif kind == STAGE_NAMED:
+            state.update(
+                stage=STAGE_NAMED,
+                filename=event["filename"],
+                target=event["target"],
+                run=run_id,
+            )
+        elif kind == STAGE_RENAMED:
+            # Done: only undo needs to know about the file now
+            self._files.pop(key, None)
+            self._renames.setdefault(run_id, []).append((key, event["target"]))
+        elif kind == STAGE_FAILED:
+            signature = (event.get("size"), event.get("mtime"))
+            if signature != (state.get("size"), state.get("mtime")):
+                # A different file at the same path: earlier failures don't count
+                self._files[key] = state = {
+                    "attempts": 0,
+                    "size": signature[0],
+                    "mtime": signature[1],
+                }
+            state["attempts"] = state.get("attempts", 0) + 1
+            state["error"] = event.get("error")
+        elif kind == "file":
+            self._files[key] = dict(event["state"])
+        elif kind == STAGE_UNDONE:
+            self._files.pop(key, None)
+            renames = self._renames.get(run_id, [])
+            self._renames[run_id] = [
+                (source, target) for source, target in renames if source != key
+            ]
+
+    def _append(self, event: dict):
+        """Write an event durably and apply it to the in-memory state."""
+        event.setdefault("run", self.run_id)
+        event["time"] = time.time()
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._apply(event)
+
+    def _open(self):
+        """Open the journal for appending, terminating a torn last line first."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        needs_newline = False
+        if self.path.exists() and self.path.stat().st_size > 0:
+            with open(self.path, "rb") as file:
+                file.seek(-1, os.SEEK_END)
+                needs_newline = file.read(1) != b"\n"
+        self._file = open(self.path, "a", encoding="utf-8")
+        if needs_newline:
+            self._file.write("\n")
+
+    def compact(self, keep_runs: int = JOURNAL_KEEP_RUNS) -> int:
+        """
+        Rewrite the journal with only what later runs still need.
+
+        Kept are the state of every unfinished file (analyzed, named or failed)
+        and the runs and renames of the last ``keep_runs`` runs; older runs can
+        no longer be undone. The new journal replaces the old one atomically.
+
+        Args:
+            keep_runs: Number of most recent runs to keep
+
+        Returns:
+            Number of runs dropped
+        """
+        kept_runs = self._runs[-keep_runs:] if keep_runs > 0 else []
+        events = [{"event": "run", "run": run} for run in kept_runs]
+        for run in kept_runs:
+            events.extend(
+                {"event": STAGE_RENAMED, "run": run, "file": source, "target": target}
+                for source, target in self._renames.get(run, [])
+            )
+        events.extend(
+            {"event": "file", "run": state.get("run"), "file": key, "state": state}
+            for key, state in self._files.items()
+        )
+
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            with open(temp_path, "w", encoding="utf-8") as file:
+                for event in events:
+                    file.write(json.dumps(event, ensure_ascii=False) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+
+        dropped = len(self._runs) - len(kept_runs)
+        for run in self._runs[: len(self._runs) - len(kept_runs)]:
+            self._renames.pop(run, None)
+        self._runs = list(kept_runs)
+        return dropped
+
+    def start_run(
+        self, source_folder: Union[str, Path], target_folder: Union[str, Path]
+    ) -> str:
+        """
+        Record the start of a new run.
+
+        Args:
+            source_folder: Folder the images are read from
+            target_folder: Folder the images are moved to
+
+        Returns:
+            Identifier of the new run
+        """
+        self.run_id = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        self._append(
+            {
+                "event": "run",
+                "run": self.run_id,
+                "source": str(source_folder),
+                "target": str(target_folder),
+            }
+        )
+        return self.run_id
+
+    def entry(self, image_path: Union[str, Path]) -> Optional[dict]:
+        """
+        Get the resumable state of a source file.
+
+        Analysis results are only returned while the file still has the size and
+        modification time it had when it was analyzed.
+
+        Args:
+            image_path: Path to the source image
+
+        Returns:
+            Dictionary with ``stage`` and, depending on the stage, ``analysis``,
+            ``filename`` and ``target``; or None if there is nothing to resume
+        """
+        state = self._files.get(self._key(image_path))
+        if not state or state.get("stage") not in (STAGE_ANALYZED, STAGE_NAMED):
+            return None
+
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return None
+        if stat.st_size != state.get("size") or stat.st_mtime != state.get("mtime"):
+            return None
+        return state
+
+    def failed_attempts(self, image_path: Union[str, Path]) -> int:
+        """
+        Number of failures recorded for a source file since it last succeeded.
+
+        Failures only count while the file still has the size and modification
+        time it had when they were recorded, so a new file saved under the path
+        of a failing one is processed again.
+        """
+        state = self._files.get(self._key(image_path))
+        if not state or not state.get("attempts"):
+            return 0
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return 0
+        if stat.st_size != state.get("size") or stat.st_mtime != state.get("mtime"):
+            return 0
+        return state["attempts"]
+
+    def record_analyzed(self, image_path: Union[str, Path], analysis: Dict[str, str]):
+        """Record the finished model stages of an image."""
+        stat = os.stat(image_path)
+        self._append(
+            {
+                "event": STAGE_ANALYZED,
+                "file": self._key(image_path),
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "analysis": analysis,
+            }
+        )
+
+    def record_named(
+        self, image_path: Union[str, Path], filename: str, target: Union[str, Path]
+    ):
+        """Record the chosen name and target path, before renaming."""
+        self._append(
+            {
+                "event": STAGE_NAMED,
+                "file": self._key(image_path),
+                "filename": filename,
+                "target": str(Path(target).resolve()),
+            }
+        )
+
+    def record_renamed(self, image_path: Union[str, Path], target: Union[str, Path]):
+        """Record that an image was moved to its target path."""
+        self._append(
+            {
+                "event": STAGE_RENAMED,
+                "file": self._key(image_path),
+                "target": str(Path(target).resolve()),
+            }
+        )
+
+    def record_failed(self, image_path: Union[str, Path], stage: str, error):
+        """Record that processing an image failed in a stage."""
+        try:
+            stat = os.stat(image_path)
+            size, mtime = stat.st_size, stat.st_mtime
+        except OSError:
+            size = mtime = None
+        self._append(
+            {
+                "event": STAGE_FAILED,
+                "file": self._key(image_path),
+                "size": size,
+                "mtime": mtime,
+                "stage": stage,
+                "error": str(error),
+            }
+        )
+
+    def reconcile(self) -> int:
+        """
+        Complete renames that happened but were not journaled before a crash.
+
+        A file whose name was chosen, whose source is gone and whose target exists
+        was renamed, so record it as such instead of processing it again.
+
+        Returns:
+            Number of renames recorded
+        """
+        reconciled = 0
+        for key, state in list(self._files.items()):
+            if state.get("stage") != STAGE_NAMED:
+                continue
+            if not os.path.exists(key) and os.path.exists(state["target"]):
+                # Attribute the rename to the run that chose the name, so undo finds it
+                self._append(
+                    {
+                        "event": STAGE_RENAMED,
+                        "run": state.get("run"),
+                        "file": key,
+                        "target": state["target"],
+                    }
+                )
+                reconciled += 1
+        return reconciled
+
+    def runs(self) -> List[str]:
+        """Identifiers of all journaled runs, oldest first."""
+        return list(self._runs)
+
+    def undo(self, run_id: Optional[str] = None) -> Tuple[int, int]:
+        """
+        Move the files renamed in a run back to their original paths.
+
+        Args:
+            run_id: Run to undo (defaults to the most recent run with renames)
+
+        Returns:
+            Tuple of (restored files, files that could not be restored)
+        """
+        if run_id is None:
+            candidates = [run for run in self._runs if self._renames.get(run)]
+            if not candidates:
+                return 0, 0
+            run_id = candidates[-1]
+
+        restored = failed = 0
+        for source, target in reversed(self._renames.get(run_id, [])):
+            if os.path.exists(source) or not os.path.exists(target):
+                print(f"Cannot undo {target} -> {source}")
+                failed += 1
+                continue
+            try:
+                os.makedirs(os.path.dirname(source), exist_ok=True)
+                os.rename(target, source)
+            except OSError as e:
+                print(f"Cannot undo {target} -> {source}: {e}")
+                failed += 1
+                continue
+            self._append({"event": STAGE_UNDONE, "run": run_id, "file": source})
+            restored += 1
+        return restored, failed
+
+    def close(self):
+        """Close the journal file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,254 @@
+"""
+Pipelined multi-stage processing of images.
+
+Each stage runs in its own pool of worker threads and is fed by a bounded queue,
+so one image can be in OCR while another waits on the LLM.
+"""
+
+import queue
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+# Marks the end of the stream on a queue
+_END = object()
+
+# How often blocked workers wake up to check whether the pipeline was stopped
+_POLL_INTERVAL = 0.2
+
+
+@dataclass
+class PipelineItem:
+    """An image travelling through the pipeline together with its stage results."""
+
+    image_path: Path
+    results: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[Exception] = None
+    failed_stage: Optional[str] = None
+
+
+@dataclass
+class PipelineStage:
+    """
+    A single pipeline stage.
+
+    Args:
+        name: Name of the stage, used as key in ``PipelineItem.results``
+        func: Callable taking a ``PipelineItem`` and returning the stage result
+        workers: Number of worker threads running this stage
+        batch_func: Optional callable taking a list of items and returning their
+            results in order; a worker then takes the items already waiting in
+            its queue along with the one it was handed and processes them in a
+            single call. If the call raises, the items are processed one by one
+            with ``func`` so only the failing ones fail.
+        batch_size: Maximum number of items per ``batch_func`` call
+    """
+
+    name: str
+    func: Callable[[PipelineItem], Any]
+    workers: int = 1
+    batch_func: Optional[Callable[[List[PipelineItem]], List[Any]]] = None
+    batch_size: int = 1
+
+
+class ImagePipeline:
+    """
+    Runs images through a chain of stages with a bounded queue and worker pool per stage.
+
+    Items that fail in a stage skip the remaining stages and are handed to the
+    consumer with ``error`` and ``failed_stage`` set. Stages whose result is
+    already present in ``PipelineItem.results`` are skipped, which lets callers
+    resume partially processed images. Items are yielded in completion order,
+    which may differ from input order. If iterating the input raises, the items
+    already fed are finished and yielded, then ``run`` raises the exception.
+    """
+
+    def __init__(self, stages: List[PipelineStage], queue_size: int = 4):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self._stop = threading.Event()
+        # Exception raised by the input iterable, re-raised by run()
+        self._feed_error: Optional[BaseException] = None
+
+    def run(
+        self, image_paths: Iterable[Union[Path, PipelineItem]]
+    ) -> Iterator[PipelineItem]:
+        """
+        Feed images through all stages.
+
+        Args:
+            image_paths: Iterable of image paths or pre-filled pipeline items;
+                consumed lazily by a feeder thread
+
+        Yields:
+            Finished (or failed) pipeline items
+
+        Raises:
+            Exception: Whatever iterating ``image_paths`` raised, once the items
+                fed before it have been yielded
+        """
+        self._stop.clear()
+        self._feed_error = None
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        output = queue.Queue(maxsize=self.queue_size)
+        threads = []
+
+        feeder = threading.Thread(
+            target=self._feed,
+            args=(image_paths, queues[0], self.stages[0].workers),
+            name="pipeline-feeder",
+            daemon=True,
+        )
+        threads.append(feeder)
+
+        for index, stage in enumerate(self.stages):
+            is_last = index == len(self.stages) - 1
+            next_queue = output if is_last else queues[index + 1]
+            next_workers = 1 if is_last else self.stages[index + 1].workers
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for worker_index in range(stage.workers):
+                threads.append(
+                    threading.Thread(
+                        target=self._work,
+                        args=(
+                            stage,
+                            queues[index],
+                            next_queue,
+                            next_workers,
+                            remaining,
+                            lock,
+                        ),
+                        name=f"pipeline-{stage.name}-{worker_index}",
+                        daemon=True,
+                    )
+                )
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = output.get()
+                if item is _END:
+                    break
+                yield item
+        finally:
+            self._stop.set()
+        if self._feed_error is not None:
+            raise self._feed_error
+
+    def stop(self):
+        """Ask all pipeline threads to stop after their current item."""
+        self._stop.set()
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        """Put an item on a queue, giving up if the pipeline is stopped."""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue):
+        """Get an item from a queue, returning _END if the pipeline is stopped."""
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _feed(
+        self,
+        image_paths: Iterable[Union[Path, PipelineItem]],
+        first_queue: queue.Queue,
+        workers: int,
+    ):
+        """Push images onto the first queue, followed by one end marker per worker."""
+        try:
+            for image_path in image_paths:
+                if isinstance(image_path, PipelineItem):
+                    item = image_path
+                else:
+                    item = PipelineItem(image_path=image_path)
+                if not self._put(first_queue, item):
+                    return
+        except BaseException as e:
+            self._feed_error = e
+        finally:
+            for _ in range(workers):
+                self._put(first_queue, _END)
+
+    def _work(
+        self,
+        stage: PipelineStage,
+        source: queue.Queue,
+        target: queue.Queue,
+        target_workers: int,
+        remaining: List[int],
+        lock: threading.Lock,
+    ):
+        """Worker loop for one stage."""
+        batch_size = max(1, stage.batch_size) if stage.batch_func is not None else 1
+        finished = False
+        while not finished:
+            item = self._get(source)
+            if item is _END:
+                break
+
+            # Take whatever else is already waiting, without blocking for more
+            batch = [item]
+            while len(batch) < batch_size:
+                try:
+                    item = source.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _END:
+                    finished = True
+                    break
+                batch.append(item)
+
+            self._run_stage(stage, batch)
+            for item in batch:
+                if not self._put(target, item):
+                    return
+
+        # The last worker of a stage to finish passes the end markers downstream
+        with lock:
+            remaining[0] -= 1
+            is_last_worker = remaining[0] == 0
+        if is_last_worker:
+            for _ in range(target_workers):
+                self._put(target, _END)
+
+    @staticmethod
+    def _run_stage(stage: PipelineStage, batch: List[PipelineItem]):
+        """Run a stage on the items of a batch that still need it."""
+        todo = [
+            item
+            for item in batch
+            if item.error is None and stage.name not in item.results
+        ]
+        if stage.batch_func is not None and len(todo) > 1:
+            try:
+                results = stage.batch_func(todo)
+            except Exception:
+                # Retry one by one to find out which items fail
+                pass
+            else:
+                for item, result in zip(todo, results):
+                    item.results[stage.name] = result
+                return
+
+        for item in todo:
+            try:
+                item.results[stage.name] = stage.func(item)
+            except Exception as e:
+                item.error = e
+                item.failed_stage = stage.name
@@ -0,0 +1,172 @@
+"""
+Process pool helpers for sharding a batch over several worker processes.
+
+Each worker process builds its own ImageFileNamer (and with it its own Docling
+converter and spaCy model), so model inference is not serialized by the GIL.
+"""
+
+import os
+from contextlib import contextmanager
+from multiprocessing.util import Finalize
+from typing import Any, Dict, Optional
+
+from ..utils import get_metrics
+
+# Environment variables read by the thread pools of torch, OpenMP and BLAS libraries
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+# ImageFileNamer owned by the current worker process
+_worker_namer = None
+
+
+def threads_per_worker(workers: int, cpu_count: Optional[int] = None) -> int:
+    """
+    Split the available cores evenly between worker processes.
+
+    Args:
+        workers: Number of worker processes
+        cpu_count: Number of cores to split (defaults to os.cpu_count())
+
+    Returns:
+        Number of compute threads each worker may use (at least 1)
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return max(1, cpu_count // max(1, workers))
+
+
+@contextmanager
+def thread_budget(threads: int):
+    """
+    Temporarily limit library thread pools through the environment.
+
+    Worker processes inherit the environment when they are started, so the pool
+    has to be created inside this context for the limit to apply before torch
+    and friends are imported in the worker.
+
+    Args:
+        threads: Number of threads each library may use
+    """
+    previous = {name: os.environ.get(name) for name in THREAD_ENV_VARS}
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def init_worker(
+    threads: int,
+    max_filename_length: int,
+    use_cache: bool,
+    rate_limiter=None,
+    metrics: bool = False,
+    trace_file: Optional[str] = None,
+    ocr_crop: Optional[str] = None,
+    ocr_grayscale: bool = False,
+    reuse_near_duplicates: bool = False,
+):
+    """
+    Initialize a worker process: apply the thread budget and load the models.
+
+    Args:
+        threads: Number of compute threads this worker may use
+        max_filename_length: Maximum filename length for the worker's ImageFileNamer
+        use_cache: Whether the worker uses the persistent result cache
+        rate_limiter: RateLimiter shared by all workers
+        metrics: Collect stage metrics and send them back with every result
+        trace_file: JSONL trace file the worker appends its spans to
+        ocr_crop: In-memory crop applied before OCR (see ImageFileNamer)
+        ocr_grayscale: Convert images to grayscale before OCR
+        reuse_near_duplicates: Reuse the cached results of near-duplicate images
+    """
+    global _worker_namer
+
+    if metrics:
+        get_metrics().enable(trace_file)
+
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    from .image_file_namer import ImageFileNamer
+
+    _worker_namer = ImageFileNamer(
+        max_filename_length,
+        use_cache=use_cache,
+        rate_limiter=rate_limiter,
+        ocr_crop=ocr_crop,
+        ocr_grayscale=ocr_grayscale,
+        reuse_near_duplicates=reuse_near_duplicates,
+    )
+    _worker_namer.load_models()
+    # Worker processes exit with os._exit, which skips atexit handlers but
+    # runs multiprocessing finalizers
+    Finalize(None, _close_worker, exitpriority=10)
+
+
+def _close_worker():
+    """Stop the threads of the worker's ImageFileNamer when the worker exits."""
+    global _worker_namer
+    if _worker_namer is not None:
+        _worker_namer.close()
+        _worker_namer = None
+
+
+def name_image(
+    image_path: str, analysis: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Generate a new filename for an image inside a worker process.
+
+    Args:
+        image_path: Path to the image file
+        analysis: Result of a previous ImageFileNamer.analyze_image call, to skip
+            the model stages when resuming
+
+    Returns:
+        Dictionary with the image path, the analysis, whether it was resumed,
+        the new filename, the metrics collected for it (if enabled) and, if a
+        stage failed, the error message and the name of the failed stage
+    """
+    result = {
+        "image_path": image_path,
+        "analysis": analysis,
+        "resumed": analysis is not None,
+        "filename": None,
+        "error": None,
+        "failed_stage": None,
+        "metrics": None,
+    }
+    stage = "analyze"
+    try:
+        if analysis is None:
+            result["analysis"] = _worker_namer.analyze_image(image_path)
+        stage = "name"
+        result["filename"] = _worker_namer.build_filename(
+            image_path, **result["analysis"]
+        ).strip()
+    except Exception as e:
+        result["error"] = str(e)
+        result["failed_stage"] = stage
+
+    metrics = get_metrics()
+    if metrics.enabled:
+        result["metrics"] = metrics.drain()
+    return result
@@ -1,11 +1,35 @@
 """
 Processors package for handling different aspects of image analysis.
+
+Classes are imported on first access (PEP 562).
 """
 
-from .content_processor import ContentProcessor
-from .ner_processor import NERProcessor
+import importlib
+from typing import TYPE_CHECKING
+
+# Exported name -> module defining it
+_EXPORTS = {
+    "ContentProcessor": ".content_processor",
+    "NERProcessor": ".ner_processor",
+    "AsyncContentProcessor": ".async_content_processor",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .content_processor import ContentProcessor
+    from .ner_processor import NERProcessor
+    from .async_content_processor import AsyncContentProcessor
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = [
-    "ContentProcessor",
-    "NERProcessor",
-]
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
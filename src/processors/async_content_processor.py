@@ -0,0 +1,268 @@
+"""
+Asynchronous content analysis processor.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+from ..config import (
+    CACHE_ENABLED,
+    NEAR_DUPLICATES_ENABLED,
+    OLLAMA_MODEL_DESCRIPTION,
+    OLLAMA_MODEL_KEYWORDS,
+    OLLAMA_MAX_CONCURRENT_REQUESTS,
+)
+from ..utils import NearDuplicateIndex, RateLimiter, ResultCache
+from .content_processor import (
+    ContentProcessor,
+    build_description_messages,
+    build_keyword_messages,
+)
+
+if TYPE_CHECKING:
+    import ollama
+
+
+class AsyncContentProcessor:
+    """
+    Handles OCR and content analysis for images with an asyncio-based Ollama client.
+
+    A single pooled ``ollama.AsyncClient`` is kept for the lifetime of the processor,
+    and a semaphore caps the number of in-flight LLM requests, so many images can
+    be analyzed concurrently without flooding the Ollama server. Docling OCR is
+    blocking and runs on a single dedicated worker thread. ``analyze_images``
+    keeps a bounded number of images in flight, so a large folder is not read
+    into memory while its requests wait for a slot.
+
+    Results are cached, rate limited and reused from near-duplicates exactly as
+    by the synchronous ContentProcessor, whose cache and rate limiter are used.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_requests: int = OLLAMA_MAX_CONCURRENT_REQUESTS,
+        host: Optional[str] = None,
+        content_processor: Optional[ContentProcessor] = None,
+        use_cache: bool = CACHE_ENABLED,
+        rate_limiter: Optional[RateLimiter] = None,
+        reuse_near_duplicates: bool = NEAR_DUPLICATES_ENABLED,
+    ):
+        """
+        Args:
+            max_concurrent_requests: Maximum number of in-flight Ollama requests
+            host: Ollama server URL (defaults to OLLAMA_HOST or localhost)
+            content_processor: Processor used for OCR and whose cache and rate
+                limiter apply to all calls (created on first use if None)
+            use_cache: Cache results on disk (when creating the processor)
+            rate_limiter: Rate limiter for the backend calls (when creating the
+                processor)
+            reuse_near_duplicates: Reuse the cached results of near-duplicate
+                images (when creating the processor)
+        """
+        self.max_concurrent_requests = max(1, max_concurrent_requests)
+        self.host = host
+        self.use_cache = use_cache
+        self.rate_limiter = rate_limiter
+        self.reuse_near_duplicates = reuse_near_duplicates
+        self._content_processor = content_processor
+        self._client = None
+        self._transport = None
+        self._semaphore = None
+        # The Docling converter is not shared safely between threads
+        self._ocr_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="ocr"
+        )
+
+    async def __aenter__(self) -> "AsyncContentProcessor":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    @property
+    def content_processor(self) -> ContentProcessor:
+        """Get or create the synchronous processor used for OCR and caching."""
+        if self._content_processor is None:
+            self._content_processor = ContentProcessor(
+                cache=ResultCache() if self.use_cache else None,
+                rate_limiter=self.rate_limiter,
+                near_duplicates=(
+                    NearDuplicateIndex()
+                    if self.use_cache and self.reuse_near_duplicates
+                    else None
+                ),
+            )
+        return self._content_processor
+
+    def _get_client(self) -> "ollama.AsyncClient":
+        """Create the pooled client and semaphore inside the running event loop."""
+        if self._client is None:
+            import httpx
+            import ollama
+
+            limits = httpx.Limits(
+                max_connections=self.max_concurrent_requests,
+                max_keepalive_connections=self.max_concurrent_requests,
+            )
+            # The transport owns the connection pool; keeping it lets aclose
+            # release the connections through httpx's public API
+            self._transport = httpx.AsyncHTTPTransport(limits=limits)
+            self._client = ollama.AsyncClient(host=self.host, transport=self._transport)
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        return self._client
+
+    async def _chat(self, backend: str, model: str, messages: List[dict]) -> str:
+        """Send a chat request, waiting for a free request slot and the rate limit."""
+        client = self._get_client()
+        rate_limiter = self.content_processor.rate_limiter
+        async with self._semaphore:
+            if rate_limiter is None:
+                response = await client.chat(model=model, messages=messages)
+            else:
+                response = await rate_limiter.acall(
+                    backend, client.chat, model=model, messages=messages
+                )
+        return response["message"]["content"]
+
+    async def extract_ocr_text(self, image_path: str) -> str:
+        """
+        Extract text from image using Docling OCR on the OCR thread.
+
+        Args:
+            image_path: Path to the image file
+
+        Returns:
+            Extracted text from the image
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._ocr_executor, self.content_processor.extract_ocr_text, image_path
+        )
+
+    async def get_image_description(self, image_path: str) -> str:
+        """
+        Get descriptive keywords for an image using local LLM.
+
+        Args:
+            image_path: Path to the image file
+
+        Returns:
+            Descriptive text for the image
+        """
+        processor = self.content_processor
+
+        def lookup():
+            image = processor.prepare_image(image_path)
+            return image, processor.lookup_image_result("description", image_path, image)
+
+        # Hashing, downscaling and SQLite are blocking, so they run off the event loop
+        loop = asyncio.get_running_loop()
+        image, (cached, key, content_hash) = await loop.run_in_executor(None, lookup)
+        if cached is not None:
+            print(f"Description of Image (cached): {cached}\n")
+            return cached
+
+        vision_image = await loop.run_in_executor(
+            None, processor.vision_image, image_path, image
+        )
+        description = await self._chat(
+            "description", OLLAMA_MODEL_DESCRIPTION, build_description_messages(vision_image)
+        )
+        print(f"Description of Image: {description}\n")
+        await loop.run_in_executor(
+            None,
+            processor.store_image_result,
+            "description",
+            key,
+            content_hash,
+            description,
+            image_path,
+            image,
+        )
+        return description
+
+    async def extract_keywords_from_text(
+        self, ocr_text: str, description_text: str
+    ) -> str:
+        """
+        Extract relevant keywords from OCR and description text using LLM.
+
+        Args:
+            ocr_text: Text extracted from OCR
+            description_text: Descriptive text about the image
+
+        Returns:
+            Selected keywords for filename
+        """
+        processor = self.content_processor
+        loop = asyncio.get_running_loop()
+        cached, key = await loop.run_in_executor(
+            None, processor.lookup_keywords, ocr_text, description_text
+        )
+        if cached is not None:
+            print(f"OCR and description keywords (cached): {cached}\n")
+            return cached
+
+        keywords = await self._chat(
+            "keywords",
+            OLLAMA_MODEL_KEYWORDS,
+            build_keyword_messages(ocr_text, description_text),
+        )
+        print(f"OCR and description keywords: {keywords}\n")
+        await loop.run_in_executor(None, processor.store_keywords, key, keywords)
+        return keywords
+
+    async def analyze_image(self, image_path: str) -> Tuple[str, str, str]:
+        """
+        Run OCR and description concurrently, then extract keywords.
+
+        Args:
+            image_path: Path to the image file
+
+        Returns:
+            Tuple of (OCR text, description, keywords)
+        """
+        ocr_text, description = await asyncio.gather(
+            self.extract_ocr_text(image_path),
+            self.get_image_description(image_path),
+        )
+        keywords = await self.extract_keywords_from_text(ocr_text, description)
+        return ocr_text, description, keywords
+
+    async def analyze_images(
+        self, image_paths: Sequence[str]
+    ) -> List[Tuple[str, str, str]]:
+        """
+        Analyze many images concurrently.
+
+        Twice as many images as request slots are in flight, enough for OCR of
+        some images to overlap the LLM requests of others; the rest wait their
+        turn without being read.
+
+        Args:
+            image_paths: Paths to the image files
+
+        Returns:
+            List of (OCR text, description, keywords) tuples in input order
+        """
+        results: List[Optional[Tuple[str, str, str]]] = [None] * len(image_paths)
+        pending = iter(enumerate(image_paths))
+
+        async def worker():
+            # Workers share the iterator, so each takes the next image when done
+            for index, image_path in pending:
+                results[index] = await self.analyze_image(image_path)
+
+        workers = min(len(image_paths), 2 * self.max_concurrent_requests)
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        return results
+
+    async def aclose(self):
+        """Close the pooled HTTP connections and the OCR thread."""
+        if self._client is not None:
+            await self._transport.aclose()
+            self._client = None
+            self._transport = None
+            self._semaphore = None
+        self._ocr_executor.shutdown(wait=False)
@@ -2,20 +2,392 @@
 OCR and content analysis processor.
 """
 
+import io
 import re
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
-import ollama
-from docling.document_converter import DocumentConverter
+from ..config import (
+    IMAGE_PREPROCESSING_ENABLED,
+    OCR_CROP_MODE,
+    OCR_GRAYSCALE,
+    OLLAMA_MODEL_DESCRIPTION,
+    OLLAMA_MODEL_KEYWORDS,
+    OLLAMA_DESCRIPTION_PROMPT,
+    OLLAMA_KEYWORDS_PROMPT,
+)
+from ..utils import (
+    ImagePreprocessor,
+    NearDuplicateIndex,
+    PreparedImage,
+    RateLimiter,
+    ResultCache,
+    file_content_hash,
+    file_fingerprint,
+    get_metrics,
+    get_model_registry,
+    hash_text,
+)
 
-from ..config import OLLAMA_MODEL_DESCRIPTION, OLLAMA_MODEL_KEYWORDS
+# Model name used in cache keys for OCR results
+OCR_MODEL_NAME = "docling"
+
+
+def load_docling_converter():
+    """
+    Create a Docling converter with its image pipeline initialized.
+
+    Returns:
+        The DocumentConverter
+    """
+    from docling.datamodel.base_models import InputFormat
+    from docling.document_converter import DocumentConverter
+
+    converter = DocumentConverter()
+    converter.initialize_pipeline(InputFormat.IMAGE)
+    return converter
+
+
+get_model_registry().register("docling", load_docling_converter)
+
+
+def ollama_chat(**kwargs) -> Dict:
+    """
+    Call ``ollama.chat``, importing ollama on first use.
+
+    Args:
+        **kwargs: Arguments for ollama.chat
+
+    Returns:
+        The chat response
+    """
+    import ollama
+
+    return ollama.chat(**kwargs)
+
+
+def build_description_messages(image: Union[str, bytes]) -> List[Dict]:
+    """
+    Build the chat messages asking the LLM to describe an image.
+
+    Args:
+        image: Path to the image file or the encoded image
+
+    Returns:
+        List of chat messages for ollama
+    """
+    return [
+        {
+            "role": "user",
+            "content": OLLAMA_DESCRIPTION_PROMPT,
+            "images": [image],
+        }
+    ]
+
+
+def build_keyword_messages(ocr_text: str, description_text: str) -> List[Dict]:
+    """
+    Build the chat messages asking the LLM to pick keywords from OCR and description text.
+
+    Args:
+        ocr_text: Text extracted from OCR
+        description_text: Descriptive text about the image
+
+    Returns:
+        List of chat messages for ollama
+    """
+    return [
+        {
+            "role": "user",
+            "content": OLLAMA_KEYWORDS_PROMPT + ocr_text + " " + description_text,
+        }
+    ]
 
 
 class ContentProcessor:
-    """Handles OCR and content analysis for images."""
+    """
+    Handles OCR and content analysis for images.
 
-    def __init__(self):
-        self.doc_converter = DocumentConverter()
+    If a ResultCache is given, OCR text and descriptions are cached by a hash of the
+    image bytes and keywords by a hash of their input text, so each stage is
+    skipped when its result is already known. If a RateLimiter is given, calls to
+    the "ocr", "description" and "keywords" backends go through it.
+
+    The OCR converter and the chat function can be replaced, e.g. by the fake
+    backends of the benchmark suite. By default the converter comes from the
+    process-wide model registry, loaded on first use and shared by all
+    processors; ollama is only imported when it is first needed.
+
+    With preprocessing, each image is read and decoded once: the vision model
+    gets a downscaled JPEG and OCR a copy capped at a legible size, optionally
+    cropped to the content and converted to grayscale (see ImagePreprocessor).
+    Results are then cached under keys that include these settings.
+
+    With a NearDuplicateIndex, an image whose OCR text or description is not
+    cached can reuse the cached result of a near-duplicate (the same image at
+    another resolution or compression), found by perceptual hash.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[ResultCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        doc_converter=None,
+        chat: Optional[Callable[..., Dict]] = None,
+        preprocess: bool = IMAGE_PREPROCESSING_ENABLED,
+        ocr_crop: Optional[str] = OCR_CROP_MODE,
+        ocr_grayscale: bool = OCR_GRAYSCALE,
+        near_duplicates: Optional[NearDuplicateIndex] = None,
+    ):
+        """
+        Args:
+            cache: Cache for OCR, description and keyword results
+            rate_limiter: Rate limiter for the backend calls
+            doc_converter: Object with Docling's ``convert(path)`` interface
+                (defaults to the shared DocumentConverter of the model registry)
+            chat: Function with the interface of ``ollama.chat`` (the default)
+            preprocess: Downscale images for OCR and the vision model instead
+                of passing the original files
+            ocr_crop: Crop the OCR image in memory: None, "presets" or "bands"
+                (requires preprocessing)
+            ocr_grayscale: Convert the OCR image to grayscale (requires preprocessing)
+            near_duplicates: Index of image fingerprints for reusing the results
+                of near-duplicate images (requires a cache)
+        """
+        self._doc_converter = doc_converter
+        self.chat = chat or ollama_chat
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.preprocessor = (
+            ImagePreprocessor(ocr_crop=ocr_crop, ocr_grayscale=ocr_grayscale)
+            if preprocess
+            else None
+        )
+        if near_duplicates is not None and cache is None:
+            print("Near-duplicate reuse needs the result cache, disabling it.")
+            near_duplicates = None
+        if near_duplicates is not None:
+            cache.add_prune_hook(near_duplicates.prune)
+        self.near_duplicates = near_duplicates
+
+    @property
+    def doc_converter(self):
+        """The OCR converter (the shared one is loaded on first access)."""
+        if self._doc_converter is not None:
+            return self._doc_converter
+        return get_model_registry().get("docling")
+
+    def load_models(self):
+        """Load the OCR models now instead of on the first image."""
+        self.doc_converter
+
+    def _convert(self, source):
+        """Run OCR; the shared converter is used by one thread at a time."""
+        if self._doc_converter is not None:
+            return self._doc_converter.convert(source)
+        with get_model_registry().use("docling") as converter:
+            return converter.convert(source)
+
+    def prepare_image(self, image_path: str) -> Optional[PreparedImage]:
+        """Read the image once for all stages, if preprocessing is enabled."""
+        if self.preprocessor is None:
+            return None
+        return self.preprocessor.prepare(image_path)
+
+    def _model_name(self, model: str, stage: str) -> str:
+        """Name of a model in cache keys, with the image size it is given."""
+        if self.preprocessor is None:
+            return model
+        if stage == "ocr":
+            return f"{model}@{self.preprocessor.ocr_variant}"
+        return f"{model}@{self.preprocessor.vision_max_side}px"
+
+    def _ocr_key(self, content_hash: str) -> str:
+        return self.cache.make_key(
+            "ocr", content_hash, self._model_name(OCR_MODEL_NAME, "ocr")
+        )
+
+    def _description_key(self, content_hash: str) -> str:
+        return self.cache.make_key(
+            "description",
+            content_hash,
+            self._model_name(OLLAMA_MODEL_DESCRIPTION, "description"),
+            OLLAMA_DESCRIPTION_PROMPT,
+        )
+
+    def _fingerprint(self, image_path: str, image: Optional[PreparedImage]):
+        return image.fingerprint() if image is not None else file_fingerprint(image_path)
+
+    def _near_duplicate_get(
+        self, stage: str, image_path: str, image: Optional[PreparedImage], make_key
+    ) -> Optional[str]:
+        """Look up the cached stage result of a near-duplicate of the image."""
+        if self.near_duplicates is None:
+            return None
+        fingerprint = self._fingerprint(image_path, image)
+        if fingerprint is None:
+            return None
+        for distance, content_hash in self.near_duplicates.find(fingerprint):
+            cached = self.cache.get(make_key(content_hash))
+            if cached is not None:
+                get_metrics().increment("near_duplicate_hits_total", stage=stage)
+                print(f"Reusing {stage} result of a near-duplicate (distance {distance}).")
+                return cached
+            if not self.cache.has_input(content_hash):
+                # All its results were evicted
+                self.near_duplicates.remove(content_hash)
+        return None
+
+    def _index_near_duplicate(
+        self, image_path: str, image: Optional[PreparedImage], content_hash: str
+    ):
+        """Make the image's cached results findable by its near-duplicates."""
+        if self.near_duplicates is None:
+            return
+        fingerprint = self._fingerprint(image_path, image)
+        if fingerprint is not None:
+            self.near_duplicates.add(content_hash, fingerprint)
+
+    def ocr_input(self, image_path: str, image: Optional[PreparedImage] = None):
+        """
+        Get what to pass to the OCR converter for an image.
+
+        Args:
+            image_path: Path to the image file
+            image: The prepared image, if already read
+
+        Returns:
+            A Docling DocumentStream of the preprocessed image, or the path
+            if preprocessing is disabled or the image could not be decoded
+        """
+        image = image or self.prepare_image(image_path)
+        ocr_image = image.ocr_image() if image is not None else None
+        if ocr_image is None:
+            return str(image_path)
+        from docling.datamodel.base_models import DocumentStream
+
+        name, data = ocr_image
+        return DocumentStream(name=name, stream=io.BytesIO(data))
+
+    def vision_image(
+        self, image_path: str, image: Optional[PreparedImage] = None
+    ) -> Union[str, bytes]:
+        """
+        Get what to pass to the vision model for an image.
+
+        Args:
+            image_path: Path to the image file
+            image: The prepared image, if already read
+
+        Returns:
+            The downscaled, encoded image, or the path if preprocessing is
+            disabled or the image could not be decoded
+        """
+        image = image or self.prepare_image(image_path)
+        vision_image = image.vision_image() if image is not None else None
+        return vision_image if vision_image is not None else str(image_path)
+
+    def _call(self, backend: str, func, *args, **kwargs):
+        """Call a backend, through the rate limiter if there is one."""
+        if self.rate_limiter is None:
+            return func(*args, **kwargs)
+        return self.rate_limiter.call(backend, func, *args, **kwargs)
+
+    def _cache_get(self, stage: str, key: str) -> Optional[str]:
+        """Look up a stage result in the cache, counting hits and misses."""
+        cached = self.cache.get(key)
+        get_metrics().increment(
+            "cache_misses_total" if cached is None else "cache_hits_total", stage=stage
+        )
+        return cached
+
+    def lookup_image_result(
+        self, stage: str, image_path: str, image: Optional[PreparedImage] = None
+    ) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """
+        Look up the cached OCR text or description of an image.
+
+        On a miss, the result of a near-duplicate is reused (and cached for this
+        image) if there is one. Shared with AsyncContentProcessor.
+
+        Args:
+            stage: "ocr" or "description"
+            image_path: Path to the image file
+            image: The prepared image, if already read
+
+        Returns:
+            Tuple of (cached result or None, cache key, image content hash);
+            the key and hash are None without a cache
+        """
+        if self.cache is None:
+            return None, None, None
+        make_key = self._ocr_key if stage == "ocr" else self._description_key
+        content_hash = image.content_hash if image else file_content_hash(image_path)
+        key = make_key(content_hash)
+        cached = self._cache_get(stage, key)
+        if cached is None:
+            cached = self._near_duplicate_get(stage, image_path, image, make_key)
+            if cached is not None:
+                self.store_image_result(stage, key, content_hash, cached, image_path, image)
+        return cached, key, content_hash
+
+    def store_image_result(
+        self,
+        stage: str,
+        key: Optional[str],
+        content_hash: Optional[str],
+        value: str,
+        image_path: str,
+        image: Optional[PreparedImage] = None,
+    ):
+        """
+        Cache the OCR text or description of an image and index the image.
+
+        Args:
+            stage: "ocr" or "description"
+            key: Cache key from lookup_image_result (nothing is stored if None)
+            content_hash: Content hash from lookup_image_result
+            value: Result to store
+            image_path: Path to the image file
+            image: The prepared image, if already read
+        """
+        if key is None:
+            return
+        self.cache.put(key, stage, value, content_hash)
+        self._index_near_duplicate(image_path, image, content_hash)
+
+    def lookup_keywords(
+        self, ocr_text: str, description_text: str
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Look up the cached keywords for an OCR text and description.
+
+        Args:
+            ocr_text: Text extracted from OCR
+            description_text: Descriptive text about the image
+
+        Returns:
+            Tuple of (cached keywords or None, cache key or None without a cache)
+        """
+        if self.cache is None:
+            return None, None
+        key = self.cache.make_key(
+            "keywords",
+            hash_text(ocr_text + "\0" + description_text),
+            OLLAMA_MODEL_KEYWORDS,
+            OLLAMA_KEYWORDS_PROMPT,
+        )
+        return self._cache_get("keywords", key), key
+
+    def store_keywords(self, key: Optional[str], keywords: str):
+        """
+        Cache keywords under the key from lookup_keywords (if not None).
+
+        Args:
+            key: Cache key from lookup_keywords
+            keywords: Keywords to store
+        """
+        if key is not None:
+            self.cache.put(key, "keywords", keywords)
 
     def extract_ocr_text(self, image_path: str) -> str:
         """
@@ -27,12 +399,22 @@ class ContentProcessor:
         Returns:
             Extracted text from the image
         """
-        print(f"Running Docling OCR on {image_path}...")
-        result = self.doc_converter.convert(str(image_path))
-        raw_md = result.document.export_to_markdown()
-        ocr_text = re.sub(r"^#+\s*", "", raw_md, flags=re.MULTILINE).strip()
-        print(f"OCR text via Docling:\n{ocr_text}\n")
-        return ocr_text
+        with get_metrics().span("ocr", image=image_path):
+            image = self.prepare_image(image_path)
+            cached, key, content_hash = self.lookup_image_result("ocr", image_path, image)
+            if cached is not None:
+                print(f"OCR text for {image_path} found in cache.")
+                return cached
+
+            print(f"Running Docling OCR on {image_path}...")
+            source = self.ocr_input(image_path, image)
+            result = self._call("ocr", self._convert, source)
+            raw_md = result.document.export_to_markdown()
+            ocr_text = re.sub(r"^#+\s*", "", raw_md, flags=re.MULTILINE).strip()
+            print(f"OCR text via Docling:\n{ocr_text}\n")
+
+            self.store_image_result("ocr", key, content_hash, ocr_text, image_path, image)
+            return ocr_text
 
     def get_image_description(self, image_path: str) -> str:
         """
@@ -44,20 +426,31 @@ class ContentProcessor:
         Returns:
             Descriptive text for the image
         """
-        response = ollama.chat(
-            model=OLLAMA_MODEL_DESCRIPTION,
-            messages=[
-                {
-                    "role": "user",
-                    "content": "Output keywords for this image in one line for the purpose of giving the image file a name for easy search. Just a single space between keywords. No emojis.",
-                    "images": [image_path],
-                }
-            ],
-        )
+        with get_metrics().span("description", image=image_path):
+            image = self.prepare_image(image_path)
+            cached, key, content_hash = self.lookup_image_result(
+                "description", image_path, image
+            )
+            if cached is not None:
+                print(f"Description of Image (cached): {cached}\n")
+                return cached
+
+            response = self._call(
+                "description",
+                self.chat,
+                model=OLLAMA_MODEL_DESCRIPTION,
+                messages=build_description_messages(
+                    self.vision_image(image_path, image)
+                ),
+            )
+
+            description = response["message"]["content"]
+            print(f"Description of Image: {description}\n")
 
-        description = response["message"]["content"]
-        print(f"Description of Image: {description}\n")
-        return description
+            self.store_image_result(
+                "description", key, content_hash, description, image_path, image
+            )
+            return description
 
     def extract_keywords_from_text(self, ocr_text: str, description_text: str) -> str:
         """
@@ -70,19 +463,21 @@ class ContentProcessor:
         Returns:
             Selected keywords for filename
         """
-        response = ollama.chat(
-            model=OLLAMA_MODEL_KEYWORDS,
-            messages=[
-                {
-                    "role": "user",
-                    "content": "Out of the following words, pick 15 keywords that you think are most relevant for naming an image file. If you can't find 15, just pick the ones you think are most relevant. No other text in the reply, no motivations, just the keywords one after another in a single line with a single space between: "
-                    + ocr_text
-                    + " "
-                    + description_text,
-                }
-            ],
-        )
+        with get_metrics().span("keywords"):
+            cached, key = self.lookup_keywords(ocr_text, description_text)
+            if cached is not None:
+                print(f"OCR and description keywords (cached): {cached}\n")
+                return cached
+
+            response = self._call(
+                "keywords",
+                self.chat,
+                model=OLLAMA_MODEL_KEYWORDS,
+                messages=build_keyword_messages(ocr_text, description_text),
+            )
+
+            keywords = response["message"]["content"]
+            print(f"OCR and description keywords: {keywords}\n")
 
-        keywords = response["message"]["content"]
-        print(f"OCR and description keywords: {keywords}\n")
-        return keywords
+            self.store_keywords(key, keywords)
+            return keywords
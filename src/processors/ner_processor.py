@@ -2,34 +2,81 @@
 Named Entity Recognition processor using spaCy.
 """
 
-import re
-from typing import List
-
-import spacy
+from typing import Iterable, List, Sequence
 
 from ..config import NER_CATEGORIES, SPACY_MODEL
 from ..config import (
     NAMES_TO_INCLUDE_FILE,
     NON_PERSONAL_NAMES_TO_INCLUDE,
+    SPACY_BATCH_SIZE,
+    SPACY_EXCLUDED_COMPONENTS,
+    SPACY_N_PROCESS,
+    SPACY_NER_COMPONENTS,
     WORDS_TO_INCLUDE_FILE,
 )
-from ..utils import load_words_from_file
+from ..utils import get_metrics, get_model_registry, get_wordlist
+
+
+def load_spacy_pipeline(
+    model: str = SPACY_MODEL,
+    exclude: Sequence[str] = SPACY_EXCLUDED_COMPONENTS,
+    components: Sequence[str] = SPACY_NER_COMPONENTS,
+):
+    """
+    Load a spaCy model with only the components needed for NER.
+
+    Args:
+        model: Name of the spaCy model
+        exclude: Components not to load at all
+        components: Components to run; the components they listen to (e.g. a
+            shared tok2vec) stay enabled, everything else is disabled
+
+    Returns:
+        The spaCy pipeline
+    """
+    import spacy
+
+    try:
+        nlp = spacy.load(model, exclude=list(exclude))
+    except OSError:
+        print(f"spaCy model {model} not found. Please install it first.")
+        raise
+
+    # Disable whatever else the model ships with, unless an NER component
+    # listens to it (e.g. a shared tok2vec)
+    needed = set(components)
+    enabled = [
+        name
+        for name, pipe in nlp.pipeline
+        if name in needed
+        or needed.intersection(getattr(pipe, "listening_components", ()))
+    ]
+    nlp.select_pipes(enable=enabled)
+    return nlp
+
+
+get_model_registry().register("spacy", load_spacy_pipeline)
 
 
 class NERProcessor:
-    """Handles Named Entity Recognition using spaCy."""
+    """
+    Handles Named Entity Recognition using spaCy.
+
+    The spaCy pipeline comes from the process-wide model registry: it is loaded
+    on first use and shared by all processors with the same model.
+    """
 
-    def __init__(self):
-        self.nlp = None
-        self._load_model()
+    def __init__(self, model: str = SPACY_MODEL):
+        """
+        Args:
+            model: Name of the spaCy model
+        """
+        self.model = model
 
-    def _load_model(self):
-        """Load the spaCy model."""
-        try:
-            self.nlp = spacy.load(SPACY_MODEL)
-        except OSError:
-            print(f"spaCy model {SPACY_MODEL} not found. Please install it first.")
-            raise
+    @property
+    def nlp(self):
+        """The shared spaCy pipeline, loaded on first access."""
+        return get_model_registry().get("spacy", model=self.model)
 
     def get_words_of_interest(self, text: str) -> str:
         """
@@ -41,42 +88,69 @@ class NERProcessor:
         Returns:
             Space-separated string of extracted words
         """
-        if not self.nlp:
-            return ""
+        with get_metrics().span("ner"):
+            with get_model_registry().use("spacy", model=self.model) as nlp:
+                doc = nlp(text)
+            return self._words_of_interest(doc, text, self._load_word_lists())
+
+    def get_words_of_interest_batch(
+        self,
+        texts: Iterable[str],
+        batch_size: int = SPACY_BATCH_SIZE,
+        n_process: int = SPACY_N_PROCESS,
+    ) -> List[str]:
+        """
+        Extract words of interest from many texts at once.
 
-        # Process text for NER
-        doc = self.nlp(text)
+        The texts are run through ``nlp.pipe``, which is considerably faster than
+        processing them one by one, and the word lists are read only once.
 
-        # Find words of interest based on NER categories
-        words = [ent.text for ent in doc.ents if ent.label_ in NER_CATEGORIES]
+        Args:
+            texts: Texts to process, e.g. the OCR text of several images
+            batch_size: Number of texts spaCy processes per batch
+            n_process: Number of processes spaCy uses (1 runs in this process)
 
-        # Load custom word lists
-        names = []
-        names_list = load_words_from_file(str(NAMES_TO_INCLUDE_FILE))
-        if names_list:
-            names.extend(names_list)
+        Returns:
+            Space-separated strings of extracted words, in the order of the texts
+        """
+        texts = list(texts)
+        with get_metrics().span("ner_batch"):
+            word_lists = self._load_word_lists()
+            with get_model_registry().use("spacy", model=self.model) as nlp:
+                docs = list(
+                    nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+                )
+            return [
+                self._words_of_interest(doc, text, word_lists)
+                for doc, text in zip(docs, texts)
+            ]
+
+    @staticmethod
+    def _load_word_lists():
+        """
+        Get the compiled lists of names and words to include when they appear in
+        the text. They are shared with FilenameBuilder and reloaded when edited.
+        """
+        names = (
+            get_wordlist(NAMES_TO_INCLUDE_FILE),
+            get_wordlist(NON_PERSONAL_NAMES_TO_INCLUDE),
+        )
+        return names, get_wordlist(WORDS_TO_INCLUDE_FILE)
 
-        non_personal_list = load_words_from_file(str(NON_PERSONAL_NAMES_TO_INCLUDE))
-        if non_personal_list:
-            names.extend(non_personal_list)
+    @staticmethod
+    def _words_of_interest(doc, text: str, word_lists) -> str:
+        """Combine the entities of a processed text with the word list matches."""
+        names, words_to_include = word_lists
 
-        # Add names from word lists if they are present in the text
-        for name in names:
-            # Create a regex pattern for the name with word boundaries
-            pattern = r"\b" + re.escape(name) + r"\b"
+        # Find words of interest based on NER categories
+        words = [ent.text for ent in doc.ents if ent.label_ in NER_CATEGORIES]
 
-            # Use re.search() to find the pattern in the text
-            if re.search(pattern, text, re.IGNORECASE):
-                words.append(name)
+        # Add names from word lists if they are present in the text as whole words
+        for name_list in names:
+            words.extend(name_list.find_words(text))
 
         # Add words from the include file if they exist in the text
-        words_to_include = load_words_from_file(str(WORDS_TO_INCLUDE_FILE))
-        lower_case_text = text.lower()
-
-        if words_to_include:
-            for word in words_to_include:
-                if word.lower() in lower_case_text:
-                    words.append(word)
+        words.extend(words_to_include.find_substrings(text))
 
         # Remove duplicates and return
         words = list(set(words))
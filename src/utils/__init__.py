@@ -11,19 +11,86 @@ from .file_utils import (
     check_time_in_string,
 )
 
+from .discovery import (
+    ORDER_POLICIES,
+    FolderWatcher,
+    iter_image_files,
+)
+
+from .wordlists import (
+    PhraseAutomaton,
+    WordList,
+    get_wordlist,
+)
+
 from .text_utils import (
+    OCRTextCleaner,
+    clean_ocr_text,
     fix_common_ocr_mistakes,
     remove_gibberish,
 )
 
 from .date_utils import (
+    DateMatch,
+    DateScanner,
+    scan_date,
     find_dates,
     extract_date_from_ocr_text,
     extract_date_from_filename_or_timestamp,
 )
 
+from .cache import (
+    ResultCache,
+    file_content_hash,
+    hash_text,
+)
+
+from .duplicates import (
+    DUPLICATE_POLICIES,
+    DuplicateFinder,
+    partial_hash,
+)
+
+from .image_prep import (
+    ImagePreprocessor,
+    PreparedImage,
+)
+
+from .image_transforms import (
+    CropEdge,
+    CropPreset,
+    CropPresets,
+    TransformChain,
+    load_crop_presets,
+    transform_folder,
+)
+
+from .metrics import (
+    Metrics,
+    get_metrics,
+)
+
+from .model_registry import (
+    ModelRegistry,
+    get_model_registry,
+)
+
+from .near_duplicates import (
+    Fingerprint,
+    NearDuplicateIndex,
+    dhash,
+    file_fingerprint,
+    image_fingerprint,
+)
+
+from .rate_limiter import (
+    RateLimiter,
+    TokenBucket,
+)
+
 from .setup import (
     download_spacy_model,
+    is_spacy_model_installed,
     setup_dependencies,
 )
 
@@ -34,11 +101,48 @@ __all__ = [
     "remove_duplicate_words",
     "clean_up_gpu_memory",
     "check_time_in_string",
+    "ORDER_POLICIES",
+    "FolderWatcher",
+    "iter_image_files",
+    "PhraseAutomaton",
+    "WordList",
+    "get_wordlist",
+    "OCRTextCleaner",
+    "clean_ocr_text",
     "fix_common_ocr_mistakes",
     "remove_gibberish",
+    "DateMatch",
+    "DateScanner",
+    "scan_date",
     "find_dates",
     "extract_date_from_ocr_text",
     "extract_date_from_filename_or_timestamp",
+    "ResultCache",
+    "file_content_hash",
+    "hash_text",
+    "DUPLICATE_POLICIES",
+    "DuplicateFinder",
+    "partial_hash",
+    "ImagePreprocessor",
+    "PreparedImage",
+    "CropEdge",
+    "CropPreset",
+    "CropPresets",
+    "TransformChain",
+    "load_crop_presets",
+    "transform_folder",
+    "Metrics",
+    "get_metrics",
+    "ModelRegistry",
+    "get_model_registry",
+    "Fingerprint",
+    "NearDuplicateIndex",
+    "dhash",
+    "file_fingerprint",
+    "image_fingerprint",
+    "RateLimiter",
+    "TokenBucket",
     "download_spacy_model",
+    "is_spacy_model_installed",
     "setup_dependencies",
 ]
@@ -0,0 +1,339 @@
+"""
+Content-addressed persistent cache of model results.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from ..config import CACHE_FILE, CACHE_MAX_BYTES, CACHE_VERSION
+
+# Check the total cache size every this many writes
+_EVICTION_CHECK_INTERVAL = 50
+
+# Evict down to this fraction of the size limit so eviction doesn't run on every write
+_EVICTION_TARGET_RATIO = 0.9
+
+# last_access is only refreshed once it is older than this, so cache hits are
+# reads; eviction order is only needed to the hour
+_ACCESS_GRANULARITY_SECONDS = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    stage TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    input_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access);
+"""
+
+# Indexes on columns that caches created by older versions get on opening
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS results_input_hash ON results (input_hash);
+"""
+
+
+def hash_text(text: str) -> str:
+    """
+    Hash a string with SHA-256.
+
+    Args:
+        text: Text to hash
+
+    Returns:
+        Hex digest of the text
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def file_content_hash(file_path: Union[str, Path]) -> str:
+    """
+    Hash the bytes of a file with SHA-256.
+
+    Results are memoized per path, size and modification time, so the OCR and
+    description stages of the same image only read the file once.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Hex digest of the file contents
+    """
+    stat = os.stat(file_path)
+    return _file_content_hash(str(file_path), stat.st_size, stat.st_mtime_ns)
+
+
+@lru_cache(maxsize=256)
+def _file_content_hash(file_path: str, size: int, mtime_ns: int) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    SQLite-backed cache of OCR text, image descriptions and keywords.
+
+    Entries are keyed by a hash of the input (image bytes or text) together with
+    the model name, the prompt and CACHE_VERSION, so changing any of them simply
+    misses the old entries. The database runs in WAL mode with a busy timeout,
+    so several processes can read and write it at once. When the stored values
+    exceed ``max_bytes`` the least recently used entries are evicted.
+
+    Entries can record the hash of their input (e.g. the image content hash),
+    so indexes over inputs (see NearDuplicateIndex) can drop the inputs whose
+    results were all evicted; such indexes register a prune hook.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = CACHE_FILE,
+        max_bytes: int = CACHE_MAX_BYTES,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._prune_hooks: List[Callable[["ResultCache"], object]] = []
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = self._connection()
+        connection.executescript(_SCHEMA)
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(results)")}
+        if "input_hash" not in columns:
+            try:
+                connection.execute("ALTER TABLE results ADD COLUMN input_hash TEXT")
+            except sqlite3.OperationalError:
+                # Another process added it first
+                pass
+        connection.executescript(_INDEXES)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get the SQLite connection for the current thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                str(self.path), timeout=30, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def make_key(stage: str, input_hash: str, model: str = "", prompt: str = "") -> str:
+        """
+        Build the cache key for a stage result.
+
+        Args:
+            stage: Name of the stage (e.g. "ocr", "description", "keywords")
+            input_hash: Hash of the stage input (image bytes or text)
+            model: Name of the model producing the result
+            prompt: Prompt sent to the model
+
+        Returns:
+            Cache key
+        """
+        material = "\0".join(
+            [str(CACHE_VERSION), stage, input_hash, model, hash_text(prompt)]
+        )
+        return hash_text(material)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached value and mark it as recently used.
+
+        The access time is kept to the hour: a hit only writes to the database
+        if the entry was last marked more than an hour ago.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT value, last_access FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        now = time.time()
+        stale = now - _ACCESS_GRANULARITY_SECONDS
+        if row[1] < stale:
+            # Another thread or process may have marked it since the SELECT
+            connection.execute(
+                "UPDATE results SET last_access = ? WHERE key = ? AND last_access < ?",
+                (now, key, stale),
+            )
+        with self._lock:
+            self.hits += 1
+        return row[0]
+
+    def put(self, key: str, stage: str, value: str, input_hash: Optional[str] = None):
+        """
+        Store a value in the cache.
+
+        Args:
+            key: Cache key from make_key
+            stage: Name of the stage, kept for statistics
+            value: Value to store
+            input_hash: Hash of the stage input the key was made from, recorded
+                for has_input
+        """
+        now = time.time()
+        self._connection().execute(
+            "INSERT OR REPLACE INTO results "
+            "(key, stage, value, size, created, last_access, input_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, stage, value, len(value.encode("utf-8")), now, now, input_hash),
+        )
+
+        with self._lock:
+            self._writes += 1
+            check_size = self._writes % _EVICTION_CHECK_INTERVAL == 0
+        if check_size:
+            self.prune()
+
+    def has_input(self, input_hash: str) -> bool:
+        """
+        Check whether any result stored with an input hash is still cached.
+
+        Args:
+            input_hash: Input hash given to put
+
+        Returns:
+            True if at least one result for the input is cached
+        """
+        row = self._connection().execute(
+            "SELECT 1 FROM results WHERE input_hash = ? LIMIT 1", (input_hash,)
+        ).fetchone()
+        return row is not None
+
+    def add_prune_hook(self, hook: Callable[["ResultCache"], object]):
+        """
+        Call a function with this cache after entries were evicted or cleared.
+
+        Args:
+            hook: Function taking the cache, e.g. NearDuplicateIndex.prune of
+                an index over the cached inputs (added only once)
+        """
+        if hook not in self._prune_hooks:
+            self._prune_hooks.append(hook)
+
+    def _run_prune_hooks(self):
+        for hook in self._prune_hooks:
+            hook(self)
+
+    def total_bytes(self) -> int:
+        """Total size of the stored values in bytes."""
+        row = self._connection().execute("SELECT SUM(size) FROM results").fetchone()
+        return row[0] or 0
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Evict least recently used entries until the cache fits its size limit.
+
+        Args:
+            max_bytes: Size limit to enforce (defaults to the cache's max_bytes)
+
+        Returns:
+            Number of evicted entries
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+
+        total = self.total_bytes()
+        if total <= max_bytes:
+            return 0
+
+        target = int(max_bytes * _EVICTION_TARGET_RATIO)
+        connection = self._connection()
+        evicted = 0
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = connection.execute(
+                "SELECT key, size FROM results ORDER BY last_access"
+            )
+            keys = []
+            for key, size in cursor:
+                if total <= target:
+                    break
+                keys.append((key,))
+                total -= size
+            cursor.close()
+            connection.executemany("DELETE FROM results WHERE key = ?", keys)
+            evicted = len(keys)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        if evicted:
+            self._run_prune_hooks()
+        return evicted
+
+    def clear(self) -> int:
+        """
+        Remove all entries from the cache.
+
+        Returns:
+            Number of removed entries
+        """
+        removed = self._connection().execute("DELETE FROM results").rowcount
+        self._run_prune_hooks()
+        return removed
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Summarize the cache contents.
+
+        Returns:
+            Dictionary with the file path, size limit, entry counts and sizes per
+            stage, and the hit/miss counters of this instance
+        """
+        connection = self._connection()
+        stages = {
+            stage: {"entries": entries, "bytes": size or 0}
+            for stage, entries, size in connection.execute(
+                "SELECT stage, COUNT(*), SUM(size) FROM results GROUP BY stage"
+            )
+        }
+        file_bytes = sum(
+            path.stat().st_size
+            for path in self.path.parent.glob(self.path.name + "*")
+            if path.is_file()
+        )
+        return {
+            "path": str(self.path),
+            "max_bytes": self.max_bytes,
+            "entries": sum(stage["entries"] for stage in stages.values()),
+            "bytes": sum(stage["bytes"] for stage in stages.values()),
+            "file_bytes": file_bytes,
+            "stages": stages,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def close(self):
+        """Close the connection of the current thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
@@ -5,9 +5,191 @@ Date extraction utilities.
 import datetime
 import os
 import re
-from typing import Optional, List
+from typing import Iterator, List, NamedTuple, Optional, Sequence
 
-from ..config import DATE_PATTERNS
+from ..config import (
+    DATE_ANCHOR_MAX_OFFSET,
+    DATE_ANCHOR_PATTERN,
+    DATE_PATTERNS,
+    DATE_SCAN_WINDOW,
+)
+
+# Longer than any date, so anchor searches limited to a window still find the
+# anchors of all dates starting in it
+_WINDOW_SLACK = 64
+
+
+class DateMatch(NamedTuple):
+    """A valid calendar date found in a text."""
+
+    date: str  # YYYYMMDD
+    start: int
+    end: int
+    text: str
+
+
+class DateScanner:
+    """
+    Finds calendar dates in text with one precompiled regex.
+
+    All DATE_PATTERNS are combined into a single alternation, so a text is scanned
+    once instead of once per pattern. The text is first searched for the cheap
+    anchor (the year), and the combined regex is only tried at the few positions
+    before each anchor where a date can start. Matches that are not real calendar
+    dates (e.g. 2023-02-30) are skipped. ``first`` stops at the first valid date
+    and ``last`` searches backwards from the end of the text in windows, so neither
+    collects every match of a long OCR text.
+    """
+
+    def __init__(
+        self,
+        patterns: Sequence[str] = DATE_PATTERNS,
+        window: int = DATE_SCAN_WINDOW,
+        anchor: str = DATE_ANCHOR_PATTERN,
+        anchor_offset: int = DATE_ANCHOR_MAX_OFFSET,
+    ):
+        """
+        Args:
+            patterns: Regexes with named ``year``, ``month`` and ``day`` groups
+            window: Number of characters searched by the first step of ``last``
+            anchor: Regex every date contains
+            anchor_offset: Maximum distance from the start of a date to its anchor
+        """
+        self.window = max(1, window)
+        self.anchor_offset = anchor_offset
+        self._anchor = re.compile(anchor)
+        # Group names must be unique in the combined regex, so number them
+        alternatives = []
+        for index, pattern in enumerate(patterns):
+            pattern = re.sub(
+                r"\(\?P<(year|month|day)>", rf"(?P<\g<1>{index}>", pattern
+            )
+            alternatives.append(f"(?P<p{index}>{pattern})")
+        self._regex = re.compile("|".join(alternatives))
+
+    def _to_date(self, match: "re.Match") -> Optional[DateMatch]:
+        """Normalize a regex match, or None if it is not a real date."""
+        index = match.lastgroup[1:]
+        year = int(match.group("year" + index))
+        month = int(match.group("month" + index))
+        day = int(match.group("day" + index))
+        try:
+            datetime.date(year, month, day)
+        except ValueError:
+            return None
+        return DateMatch(
+            f"{year:04d}{month:02d}{day:02d}", match.start(), match.end(), match.group()
+        )
+
+    def iter_dates(
+        self, text: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[DateMatch]:
+        """
+        Yield the valid dates of a text in order of appearance.
+
+        Args:
+            text: Text to search
+            start: Position to start searching at
+            end: Only yield dates starting before this position (defaults to the
+                end of the text)
+
+        Returns:
+            Iterator of date matches
+        """
+        pos = start
+        end = len(text) if end is None else end
+        while True:
+            match = self._search(text, pos, end)
+            if match is None:
+                return
+            date = self._to_date(match)
+            if date is None:
+                # Not a calendar date; another pattern may still match here
+                pos = match.start() + 1
+                continue
+            yield date
+            pos = match.end()
+
+    def _search(self, text: str, pos: int, end: int) -> Optional["re.Match"]:
+        """
+        Find the leftmost match of the combined regex starting in [pos, end).
+
+        Same result as ``regex.search(text, pos)`` restricted to that range.
+        """
+        tried = pos
+        while tried < end:
+            anchor = self._anchor.search(text, tried, end + _WINDOW_SLACK)
+            if anchor is None:
+                return None
+            # Try every position a date containing this anchor can start at
+            first = max(tried, anchor.start() - self.anchor_offset)
+            for candidate in range(first, min(anchor.start() + 1, end)):
+                match = self._regex.match(text, candidate)
+                if match is not None:
+                    return match
+            tried = max(tried, anchor.start() + 1)
+        return None
+
+    def first(self, text: str) -> Optional[DateMatch]:
+        """Find the first valid date in a text."""
+        return next(self.iter_dates(text), None)
+
+    def last(self, text: str) -> Optional[DateMatch]:
+        """Find the last valid date in a text, searching from the end."""
+        # Each window only looks for dates starting before the previous window.
+        # Windows start after whitespace, which no date contains, so matches line
+        # up exactly as in a scan from the start of the text.
+        # The window doubles every step, so a text without dates costs about
+        # as much as a single forward scan.
+        end = len(text)
+        window = self.window
+        while True:
+            start = max(0, end - window)
+            window *= 2
+            if start:
+                start = 1 + max(text.rfind(char, 0, start) for char in " \n\t")
+            last = None
+            for date in self.iter_dates(text, start, end):
+                last = date
+            if last is not None or start == 0:
+                return last
+            end = start
+
+    def scan(self, text: str, mode: str = "last") -> Optional[DateMatch]:
+        """
+        Find a single date in a text.
+
+        Args:
+            text: Text to search
+            mode: "first" or "last" date of the text
+
+        Returns:
+            The date match, or None if the text contains no valid date
+        """
+        if mode == "first":
+            return self.first(text)
+        if mode == "last":
+            return self.last(text)
+        raise ValueError(f"Unknown mode '{mode}', expected 'first' or 'last'")
+
+
+_default_scanner = DateScanner()
+
+
+def scan_date(text: str, mode: str = "last") -> Optional[DateMatch]:
+    """
+    Find the first or last valid date in a text.
+
+    Args:
+        text: Text to search
+        mode: "first" or "last"
+
+    Returns:
+        The date match (with the date in YYYYMMDD format), or None
+    """
+    if not text:
+        return None
+    return _default_scanner.scan(text, mode)
 
 
 def find_dates(text: str) -> List[str]:
@@ -18,13 +200,9 @@ def find_dates(text: str) -> List[str]:
         text: Text to search for dates
 
     Returns:
-        List of found dates
+        List of found dates as written in the text, in order of appearance
     """
-    matches = []
-    for pattern in DATE_PATTERNS:
-        found = re.findall(pattern, text)
-        matches.extend(found)
-    return matches
+    return [date.text for date in _default_scanner.iter_dates(text)]
 
 
 def extract_date_from_ocr_text(ocr_text: str) -> Optional[str]:
@@ -37,44 +215,9 @@ def extract_date_from_ocr_text(ocr_text: str) -> Optional[str]:
     Returns:
         Date in YYYYMMDD format, or None if no date found
     """
-    if not ocr_text:
-        return None
-
-    found_dates = find_dates(ocr_text)
-
-    if found_dates:
-        # Take the last date found, as it's often the most relevant
-        last_date = found_dates[-1]
-
-        # Clean up the date format - remove separators and ensure YYYYMMDD format
-        date_str = last_date.replace("-", "").replace("/", "").replace(".", "")
-
-        # Handle different date formats found
-        if len(date_str) == 8 and date_str.isdigit():  # YYYYMMDD
-            return date_str
-        elif len(date_str) == 6 and date_str.isdigit():  # YYMMDD, add 20 prefix
-            return "20" + date_str
-        else:
-            # Try to parse other formats and convert to YYYYMMDD
-            try:
-                # Handle formats like MM/DD/YYYY or DD.MM.YYYY
-                if "/" in last_date:
-                    parts = last_date.split("/")
-                    if len(parts) == 3:
-                        month, day, year = parts
-                        return f"{year}{month.zfill(2)}{day.zfill(2)}"
-                elif "." in last_date:
-                    parts = last_date.split(".")
-                    if len(parts) == 3:
-                        day, month, year = parts
-                        return f"{year}{month.zfill(2)}{day.zfill(2)}"
-                elif "-" in last_date and len(last_date.split("-")) == 3:
-                    year, month, day = last_date.split("-")
-                    return f"{year}{month.zfill(2)}{day.zfill(2)}"
-            except:
-                pass
-
-    return None
+    # Take the last date found, as it's often the most relevant
+    date = scan_date(ocr_text, "last")
+    return date.date if date else None
 
 
 def extract_date_from_filename_or_timestamp(image_path: str) -> Optional[str]:
@@ -88,38 +231,9 @@ def extract_date_from_filename_or_timestamp(image_path: str) -> Optional[str]:
         Date in YYYYMMDD format
     """
     # First try to find dates in the filename
-    filename = str(image_path)
-    found_dates = find_dates(filename)
-
-    if found_dates:
-        # Clean up the date format - remove separators and ensure YYYYMMDD format
-        date_str = found_dates[0].replace("-", "").replace("/", "").replace(".", "")
-
-        # Handle different date formats found
-        if len(date_str) == 8 and date_str.isdigit():  # YYYYMMDD
-            return date_str
-        elif len(date_str) == 6 and date_str.isdigit():  # YYMMDD, add 20 prefix
-            return "20" + date_str
-        else:
-            # Try to parse other formats and convert to YYYYMMDD
-            try:
-                # Handle formats like MM/DD/YYYY or DD.MM.YYYY
-                original_date = found_dates[0]
-                if "/" in original_date:
-                    parts = original_date.split("/")
-                    if len(parts) == 3:
-                        month, day, year = parts
-                        return f"{year}{month.zfill(2)}{day.zfill(2)}"
-                elif "." in original_date:
-                    parts = original_date.split(".")
-                    if len(parts) == 3:
-                        day, month, year = parts
-                        return f"{year}{month.zfill(2)}{day.zfill(2)}"
-                elif "-" in original_date and len(original_date.split("-")) == 3:
-                    year, month, day = original_date.split("-")
-                    return f"{year}{month.zfill(2)}{day.zfill(2)}"
-            except:
-                pass
+    date = scan_date(str(image_path), "first")
+    if date:
+        return date.date
 
     # Fallback to file modification time
     try:
@@ -0,0 +1,183 @@
+"""
+Streaming discovery of image files.
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ..config import IMAGE_EXTENSIONS
+
+# Sort keys of the supported ordering policies
+ORDER_POLICIES: Dict[str, Callable[[os.DirEntry], object]] = {
+    "name": lambda entry: entry.path,
+    "mtime": lambda entry: entry.stat().st_mtime,
+    "size": lambda entry: -entry.stat().st_size,
+    "smallest-first": lambda entry: entry.stat().st_size,
+}
+
+
+def iter_image_files(
+    directory: Union[str, Path],
+    recursive: bool = False,
+    order: Optional[str] = None,
+    exclude: Iterable[Union[str, Path]] = (),
+) -> Iterator[os.DirEntry]:
+    """
+    Yield the image files in a directory using os.scandir.
+
+    Without an ordering policy, entries are yielded as soon as they are read, so
+    work can start immediately on very large directories. The yielded
+    ``os.DirEntry`` objects cache their stat information.
+
+    Args:
+        directory: Directory to search
+        recursive: Also search subdirectories (hidden ones and symlinks are skipped)
+        order: Ordering policy: None (directory order), "name", "mtime" (oldest
+            first), "size" (largest first) or "smallest-first"; any policy other
+            than None reads all entries before yielding the first one
+        exclude: Directories not to descend into, e.g. a target folder that lives
+            inside the source folder
+
+    Returns:
+        Iterator of directory entries for the image files
+    """
+    if order is not None and order not in ORDER_POLICIES:
+        raise ValueError(
+            f"Unknown order '{order}', expected one of {', '.join(ORDER_POLICIES)}"
+        )
+
+    excluded = {os.path.realpath(path) for path in exclude}
+    entries = _scan(str(directory), recursive, excluded)
+    if order is None:
+        return entries
+    return iter(sorted(entries, key=ORDER_POLICIES[order]))
+
+
+def _scan(directory: str, recursive: bool, excluded: set) -> Iterator[os.DirEntry]:
+    """Walk the directory tree depth-first, yielding image file entries."""
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        try:
+            iterator = os.scandir(current)
+        except OSError as e:
+            print(f"Cannot read directory {current}: {e}")
+            continue
+
+        with iterator:
+            for entry in iterator:
+                try:
+                    if entry.is_file():
+                        if entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                            yield entry
+                    elif (
+                        recursive
+                        and not entry.name.startswith(".")
+                        and entry.is_dir(follow_symlinks=False)
+                        and os.path.realpath(entry.path) not in excluded
+                    ):
+                        pending.append(entry.path)
+                except OSError:
+                    # Entry vanished or is unreadable
+                    continue
+
+
+class FolderWatcher:
+    """
+    Polls a folder for new image files that are no longer being written.
+
+    Every poll rescans the folder with os.scandir and keeps an index of each
+    file's size and modification time. A file is reported once its size and
+    modification time have stayed the same for ``settle_seconds``, so partially
+    copied or still downloading files are not picked up. A reported file is
+    reported again only if it changes afterwards or is passed to ``retry``.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        settle_seconds: float = 2.0,
+        recursive: bool = False,
+        exclude: Iterable[Union[str, Path]] = (),
+    ):
+        """
+        Args:
+            directory: Folder to watch
+            settle_seconds: How long a file must stay unchanged before it is reported
+            recursive: Also watch subfolders
+            exclude: Directories not to descend into
+        """
+        self.directory = Path(directory)
+        self.settle_seconds = settle_seconds
+        self.recursive = recursive
+        self.exclude = list(exclude)
+        # path -> (size, mtime_ns, time the signature was first seen)
+        self._index: Dict[str, Tuple[int, int, float]] = {}
+        # path -> signature at the time the file was reported
+        self._reported: Dict[str, Tuple[int, int]] = {}
+
+    def poll(self) -> List[Path]:
+        """
+        Scan the folder once.
+
+        Returns:
+            Paths of the files that became stable since the last poll, oldest first
+        """
+        now = time.monotonic()
+        seen = {}
+        for entry in iter_image_files(
+            self.directory, recursive=self.recursive, exclude=self.exclude
+        ):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            seen[entry.path] = (stat.st_size, stat.st_mtime_ns)
+
+        ready = []
+        index = {}
+        for path, signature in seen.items():
+            previous = self._index.get(path)
+            since = previous[2] if previous and previous[:2] == signature else now
+            index[path] = (*signature, since)
+            if now - since >= self.settle_seconds and self._reported.get(path) != signature:
+                self._reported[path] = signature
+                ready.append(path)
+
+        # Forget files that were moved away or deleted
+        self._index = index
+        self._reported = {
+            path: signature
+            for path, signature in self._reported.items()
+            if path in index
+        }
+        ready.sort(key=lambda path: index[path][1])
+        return [Path(path) for path in ready]
+
+    def retry(self, file_path: Union[str, Path]):
+        """
+        Report a file again on the next poll, e.g. because processing it failed.
+
+        Args:
+            file_path: Path of a reported file
+        """
+        self._reported.pop(str(file_path), None)
+
+    def watch(self, poll_interval: float = 2.0) -> Iterator[List[Path]]:
+        """
+        Poll the folder forever.
+
+        Args:
+            poll_interval: Seconds between two scans
+
+        Returns:
+            Iterator yielding the batch of newly stable files after every scan
+            that found any
+        """
+        while True:
+            ready = self.poll()
+            if ready:
+                yield ready
+            time.sleep(poll_interval)
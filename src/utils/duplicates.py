@@ -0,0 +1,199 @@
+"""
+Detection of byte-identical image files.
+
+Phone backups are full of exact copies of the same image under different names.
+Hashing every file to find them would read the whole folder, so files are
+compared in three rounds, each only among the files still colliding after the
+previous one: by size (from the directory listing), by a hash of the first and
+last few KB, and finally by a SHA-256 of the full contents. A file with a size
+no other file has is never opened.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from ..config import DUPLICATE_PARTIAL_HASH_BYTES
+from .cache import file_content_hash
+
+# Ways BatchProcessor can handle a file that duplicates an earlier one
+DUPLICATE_POLICIES = ("name", "hardlink", "skip")
+
+
+def partial_hash(
+    file_path: Union[str, Path], size: int, chunk: int = DUPLICATE_PARTIAL_HASH_BYTES
+) -> str:
+    """
+    Hash the first and last bytes of a file with SHA-256.
+
+    Args:
+        file_path: Path to the file
+        size: Size of the file in bytes
+        chunk: Number of bytes hashed from each end (files up to twice this
+            size are hashed completely)
+
+    Returns:
+        Hex digest of the start and end of the file
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        digest.update(file.read(chunk))
+        if size > 2 * chunk:
+            file.seek(-chunk, os.SEEK_END)
+        digest.update(file.read(chunk))
+    return digest.hexdigest()
+
+
+class _Entry:
+    """A registered file, updated in place when the file is moved."""
+
+    __slots__ = ("path", "size", "stale")
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        self.stale = False
+
+
+class DuplicateFinder:
+    """
+    Incremental index of files for finding exact duplicates.
+
+    Files are registered one at a time with ``find_original``, which tells
+    whether an earlier registered file has the same bytes. Hashes are computed
+    lazily: a file is only partially hashed once a second file of its size is
+    registered, and only fully hashed once a second file with the same partial
+    hash is. The first registered file of each content is its original, so
+    registering the target folder before the source folder makes already
+    named files the originals.
+
+    Not thread-safe; callers sharing a finder between threads must lock it.
+    """
+
+    def __init__(self, partial_bytes: int = DUPLICATE_PARTIAL_HASH_BYTES):
+        """
+        Args:
+            partial_bytes: Number of bytes hashed from each end of a file in the
+                partial hash round
+        """
+        self.partial_bytes = partial_bytes
+        self._entries: Dict[str, _Entry] = {}
+        # Files not hashed yet, by size; the list is emptied (but kept) once a
+        # second file of the size shows up
+        self._by_size: Dict[int, List[_Entry]] = {}
+        # Partially hashed files not fully hashed yet, by (size, partial hash)
+        self._by_partial: Dict[Tuple[int, str], List[_Entry]] = {}
+        # Original file of each full content hash
+        self._by_content: Dict[str, _Entry] = {}
+
+    def find_original(
+        self, file_path: Union[str, Path], size: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        Register a file and look up an earlier registered file with the same bytes.
+
+        Registering a path again (e.g. after the file changed) replaces its
+        earlier registration. Files that cannot be read count as unique.
+
+        Args:
+            file_path: Path to the file
+            size: Size of the file in bytes, if already known (e.g. from a
+                directory entry)
+
+        Returns:
+            Current path of the original file, or None if the file is the first
+            one with its contents
+        """
+        path = str(file_path)
+        self.forget(path)
+        try:
+            if size is None:
+                size = os.stat(path).st_size
+            entry = _Entry(path, size)
+
+            pending = self._by_size.get(size)
+            if pending is None:
+                # First file of this size: nothing to compare it with
+                self._by_size[size] = [entry]
+                self._entries[path] = entry
+                return None
+            for other in pending:
+                self._add_partial(other)
+            pending.clear()
+
+            key = (size, partial_hash(path, size, self.partial_bytes))
+            bucket = self._by_partial.get(key)
+            if bucket is None:
+                self._by_partial[key] = [entry]
+                self._entries[path] = entry
+                return None
+            for other in bucket:
+                self._add_content(other)
+            bucket.clear()
+
+            digest = file_content_hash(path)
+        except OSError as e:
+            print(f"Could not check {path} for duplicates: {e}")
+            return None
+
+        original = self._by_content.get(digest)
+        if original is None or original.stale:
+            self._by_content[digest] = entry
+            self._entries[path] = entry
+            return None
+        return original.path
+
+    def moved(self, old_path: Union[str, Path], new_path: Union[str, Path]):
+        """
+        Follow a registered file to its new path.
+
+        Args:
+            old_path: Path the file was registered under
+            new_path: Path the file was moved to
+        """
+        entry = self._entries.pop(str(old_path), None)
+        if entry is not None:
+            entry.path = str(new_path)
+            self._entries[entry.path] = entry
+
+    def forget(self, file_path: Union[str, Path]):
+        """
+        Unregister a file, e.g. because it was deleted or changed.
+
+        Args:
+            file_path: Path the file was registered under
+        """
+        entry = self._entries.pop(str(file_path), None)
+        if entry is not None:
+            entry.stale = True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _add_partial(self, entry: _Entry):
+        """Move a file from the size round to the partial hash round."""
+        if entry.stale:
+            return
+        try:
+            key = (entry.size, partial_hash(entry.path, entry.size, self.partial_bytes))
+        except OSError:
+            self.forget(entry.path)
+            return
+        self._by_partial.setdefault(key, []).append(entry)
+
+    def _add_content(self, entry: _Entry):
+        """Move a file from the partial hash round to the full hash round."""
+        if entry.stale:
+            return
+        try:
+            digest = file_content_hash(entry.path)
+        except OSError:
+            self.forget(entry.path)
+            return
+        original = self._by_content.get(digest)
+        if original is None or original.stale:
+            self._by_content[digest] = entry
+        else:
+            # A later copy of an earlier original: nothing will be its duplicate
+            self.forget(entry.path)
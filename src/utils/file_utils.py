@@ -8,6 +8,12 @@ from typing import Set, Optional, List
 from pathlib import Path
 
 from ..config import ILLEGAL_CHARS, WORD_VARIANTS, WORDS_TO_REMOVE_FILE
+from .discovery import iter_image_files
+
+# Translation table deleting ILLEGAL_CHARS in a single str.translate call
+ILLEGAL_CHARS_TABLE = str.maketrans("", "", ILLEGAL_CHARS)
+
+_MULTIPLE_SPACES = re.compile(r" +")
 
 
 def load_words_from_file(file_path: str) -> Optional[Set[str]]:
@@ -29,12 +35,13 @@ def load_words_from_file(file_path: str) -> Optional[Set[str]]:
         return None
 
 
-def count_image_files(directory: str) -> int:
+def count_image_files(directory: str, recursive: bool = False) -> int:
     """
     Count the number of image files in a directory.
 
     Args:
         directory: Path to the directory
+        recursive: Also count image files in subdirectories
 
     Returns:
         Number of image files found
@@ -42,10 +49,7 @@ def count_image_files(directory: str) -> int:
     if not os.path.exists(directory):
         return 0
 
-    files = os.listdir(directory)
-    image_extensions = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tiff", ".webp")
-    image_files = [file for file in files if file.lower().endswith(image_extensions)]
-    return len(image_files)
+    return sum(1 for _ in iter_image_files(directory, recursive=recursive))
 
 
 def sanitize_filename_basic(filename: str) -> str:
@@ -59,11 +63,10 @@ def sanitize_filename_basic(filename: str) -> str:
         Sanitized filename with illegal characters removed
     """
     # Remove illegal characters
-    for char in ILLEGAL_CHARS:
-        filename = filename.replace(char, "")
+    filename = filename.translate(ILLEGAL_CHARS_TABLE)
 
     # Replace multiple spaces with single space
-    filename = re.sub(r" +", " ", filename)
+    filename = _MULTIPLE_SPACES.sub(" ", filename)
 
     return filename.strip()
 
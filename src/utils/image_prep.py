@@ -0,0 +1,483 @@
+"""
+Decode-once image preprocessing for the OCR engine and the vision model.
+
+The vision model resizes its input to a few hundred pixels, so sending it a
+full-resolution screenshot only costs I/O, base64 payload and prefill time.
+Each image is read and decoded once; the vision model gets a size-capped JPEG
+and the OCR engine a copy capped at a size where text stays legible. Derived
+images are cached on disk by the hash of the image bytes.
+
+OCR time grows with the pixel area, so the OCR copy can also be cropped in
+memory (to a crop preset, or to the content inside uniform bands) and converted
+to grayscale. The original file is never modified.
+"""
+
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+from ..config import (
+    CROP_MODES_FILE,
+    OCR_BAND_TOLERANCE,
+    OCR_CROP_MODE,
+    OCR_GRAYSCALE,
+    OCR_IMAGE_MAX_SIDE,
+    PREPARED_IMAGE_MEMORY_ITEMS,
+    THUMBNAIL_CACHE_DIR,
+    THUMBNAIL_CACHE_MAX_BYTES,
+    VISION_IMAGE_JPEG_QUALITY,
+    VISION_IMAGE_MAX_SIDE,
+)
+from .cache import hash_text
+from .image_transforms import Box, CropPresets, load_crop_presets
+from .metrics import get_metrics
+from .near_duplicates import Fingerprint, image_fingerprint
+
+# Formats the models accept as they are, so small images are passed unchanged
+_PASSTHROUGH_FORMATS = ("JPEG", "PNG")
+
+# Check the thumbnail cache size every this many writes
+_PRUNE_INTERVAL = 50
+
+OCR_CROP_MODES = ("presets", "bands")
+
+# Longer side of the copy the band detector scans
+_BAND_SCAN_SIDE = 512
+
+
+def detect_content_box(image, tolerance: int = OCR_BAND_TOLERANCE) -> Optional[Box]:
+    """
+    Find the content inside uniform bands along the edges of an image.
+
+    Rows (and columns) at the edges whose pixels all lie within ``tolerance``
+    of each other carry no text, e.g. the black bars around a video or the blank
+    margins of a document. They are found on a small grayscale copy.
+
+    Args:
+        image: PIL image
+        tolerance: Largest pixel value range of a row or column still counted as uniform
+
+    Returns:
+        The (left, upper, right, lower) box of the content, or None if there
+        are no bands (or the whole image is uniform)
+    """
+    from PIL import Image
+
+    width, height = image.size
+    scale = min(1.0, _BAND_SCAN_SIDE / max(width, height))
+    small = image.convert("L")
+    if scale < 1.0:
+        small = small.resize(
+            (max(1, round(width * scale)), max(1, round(height * scale))),
+            Image.Resampling.BOX,
+        )
+    small_width, small_height = small.size
+
+    def uniform(box) -> bool:
+        low, high = small.crop(box).getextrema()
+        return high - low <= tolerance
+
+    upper = 0
+    while upper < small_height and uniform((0, upper, small_width, upper + 1)):
+        upper += 1
+    if upper == small_height:
+        return None
+    lower = small_height
+    while uniform((0, lower - 1, small_width, lower)):
+        lower -= 1
+    left = 0
+    while left < small_width and uniform((left, upper, left + 1, lower)):
+        left += 1
+    if left == small_width:
+        # Every column is uniform (e.g. vertical stripes): only trim rows
+        left = 0
+    right = small_width
+    while right > left + 1 and uniform((right - 1, upper, right, lower)):
+        right -= 1
+    if (left, upper, right, lower) == (0, 0, small_width, small_height):
+        return None
+
+    # Back to full size, keeping a pixel of the scan around the content
+    return (
+        max(0, int((left - 1) / scale)),
+        max(0, int((upper - 1) / scale)),
+        min(width, int((right + 1) / scale) + 1),
+        min(height, int((lower + 1) / scale) + 1),
+    )
+
+
+class PreparedImage:
+    """
+    An image read once, with the versions derived from it for each model.
+
+    The image is decoded at most once, on the first request for a derived
+    version, and only down to the OCR size (JPEG files are decoded at reduced
+    scale directly). All methods are thread-safe; they return None if the image
+    cannot be decoded, in which case the caller should pass the file path.
+    """
+
+    def __init__(
+        self, path: Path, data: bytes, content_hash: str, preprocessor: "ImagePreprocessor"
+    ):
+        self.path = path
+        self.data = data
+        self.content_hash = content_hash
+        self._preprocessor = preprocessor
+        self._lock = threading.Lock()
+        self._header = None
+        self._base = None
+        self._failed = False
+        self._vision = None
+        self._ocr = None
+        self._fingerprint = None
+
+    def _read_header(self):
+        """Get (format, size) from the image header without decoding the pixels."""
+        if self._header is None and not self._failed:
+            from PIL import Image
+
+            try:
+                with Image.open(io.BytesIO(self.data)) as image:
+                    self._header = (image.format, image.size)
+            except (OSError, ValueError, Image.DecompressionBombError) as e:
+                print(f"Could not read image {self.path} for preprocessing: {e}")
+                self._failed = True
+        return self._header
+
+    def _decode(self):
+        """Decode the image as RGB, scaled down to the OCR size."""
+        if self._base is None and not self._failed:
+            from PIL import Image, ImageOps
+
+            side = self._preprocessor.ocr_max_side
+            try:
+                image = Image.open(io.BytesIO(self.data))
+                # thumbnail() lets the JPEG decoder scale down while decoding
+                image.thumbnail((side, side), Image.Resampling.LANCZOS)
+                image = ImageOps.exif_transpose(image)
+                self._base = image.convert("RGB")
+            except (OSError, ValueError, Image.DecompressionBombError) as e:
+                print(f"Could not decode image {self.path} for preprocessing: {e}")
+                self._failed = True
+        return self._base
+
+    def fingerprint(self) -> Optional[Fingerprint]:
+        """
+        Get the perceptual fingerprint of the image (computed once).
+
+        Returns:
+            The fingerprint, or None if the image has no usable one
+        """
+        with self._lock:
+            if self._fingerprint is None:
+                self._fingerprint = image_fingerprint(self.data) or False
+            return self._fingerprint or None
+
+    def vision_image(self) -> Optional[bytes]:
+        """
+        Get the image for the vision model.
+
+        Returns:
+            JPEG (or small original) bytes with the longer side capped at the
+            vision size, or None if the image could not be decoded
+        """
+        with self._lock:
+            if self._vision is not None:
+                return self._vision
+            header = self._read_header()
+            if header is None:
+                return None
+
+            image_format, size = header
+            side = self._preprocessor.vision_max_side
+            if max(size) <= side and image_format in _PASSTHROUGH_FORMATS:
+                self._vision = self.data
+                return self._vision
+
+            name = f"vision-{side}-q{self._preprocessor.jpeg_quality}.jpg"
+            self._vision = self._preprocessor._read_cached(self.content_hash, name)
+            if self._vision is None:
+                base = self._decode()
+                if base is None:
+                    return None
+                from PIL import Image
+
+                image = base.copy()
+                image.thumbnail((side, side), Image.Resampling.LANCZOS)
+                buffer = io.BytesIO()
+                image.save(buffer, "JPEG", quality=self._preprocessor.jpeg_quality)
+                self._vision = buffer.getvalue()
+                self._preprocessor._write_cached(self.content_hash, name, self._vision)
+            return self._vision
+
+    def ocr_image(self) -> Optional[Tuple[str, bytes]]:
+        """
+        Get the image for the OCR engine.
+
+        Returns:
+            Tuple of (filename, bytes): the original file if it is within the
+            OCR size and no OCR crop or grayscale conversion is configured, else
+            a PNG of the transformed image; None if the image could not be decoded
+        """
+        with self._lock:
+            if self._ocr is not None:
+                return self._ocr
+            header = self._read_header()
+            if header is None:
+                return None
+
+            preprocessor = self._preprocessor
+            original_pixels = header[1][0] * header[1][1]
+            if max(header[1]) <= preprocessor.ocr_max_side and not preprocessor.transforms_ocr:
+                self._ocr = (self.path.name, self.data)
+                _count_ocr_pixels(original_pixels, original_pixels)
+                return self._ocr
+
+            name = f"ocr-{preprocessor.ocr_variant}.png"
+            data = preprocessor._read_cached(self.content_hash, name)
+            if data is None:
+                base = self._decode()
+                if base is None:
+                    return None
+                image = preprocessor.transform_for_ocr(base, header[1])
+                _count_ocr_pixels(original_pixels, image.size[0] * image.size[1])
+                buffer = io.BytesIO()
+                image.save(buffer, "PNG", compress_level=1)
+                data = buffer.getvalue()
+                preprocessor._write_cached(self.content_hash, name, data)
+            self._ocr = (self.path.stem + ".png", data)
+            return self._ocr
+
+
+def _count_ocr_pixels(original: int, ocr: int):
+    metrics = get_metrics()
+    metrics.increment("ocr_pixels_total", original, kind="original")
+    metrics.increment("ocr_pixels_total", ocr, kind="ocr")
+
+
+class ImagePreprocessor:
+    """
+    Prepares images for the OCR engine and the vision model.
+
+    ``prepare`` reads and hashes a file once; the result is kept for the last
+    few images, so the OCR and description stages of an image (which run
+    concurrently) share a single read and decode.
+
+    The OCR image can be cropped with ``ocr_crop``: "presets" applies the crop
+    preset whose size signature matches the image (see CropPresets), "bands"
+    trims uniform bands along the edges (see ``detect_content_box``).
+    """
+
+    def __init__(
+        self,
+        vision_max_side: int = VISION_IMAGE_MAX_SIDE,
+        ocr_max_side: int = OCR_IMAGE_MAX_SIDE,
+        jpeg_quality: int = VISION_IMAGE_JPEG_QUALITY,
+        cache_dir: Optional[Union[str, Path]] = THUMBNAIL_CACHE_DIR,
+        cache_max_bytes: int = THUMBNAIL_CACHE_MAX_BYTES,
+        memory_items: int = PREPARED_IMAGE_MEMORY_ITEMS,
+        ocr_crop: Optional[str] = OCR_CROP_MODE,
+        ocr_grayscale: bool = OCR_GRAYSCALE,
+        crop_modes_file: Union[str, Path] = CROP_MODES_FILE,
+    ):
+        """
+        Args:
+            vision_max_side: Longer side of the image sent to the vision model
+            ocr_max_side: Longer side of the image sent to the OCR engine
+            jpeg_quality: JPEG quality of the vision model image
+            cache_dir: Folder of the on-disk cache of derived images (None disables it)
+            cache_max_bytes: Size limit of the on-disk cache
+            memory_items: Number of prepared images kept in memory
+            ocr_crop: Crop the OCR image: None, "presets" or "bands"
+            ocr_grayscale: Convert the OCR image to grayscale
+            crop_modes_file: Crop presets file used with ``ocr_crop="presets"``
+
+        Raises:
+            ValueError: If ocr_crop is not a known crop mode
+        """
+        if ocr_crop is not None and ocr_crop not in OCR_CROP_MODES:
+            raise ValueError(
+                f"Unknown OCR crop mode '{ocr_crop}', expected one of {', '.join(OCR_CROP_MODES)}"
+            )
+        self.vision_max_side = vision_max_side
+        self.ocr_max_side = ocr_max_side
+        self.jpeg_quality = jpeg_quality
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.cache_max_bytes = cache_max_bytes
+        self.memory_items = max(1, memory_items)
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[Tuple[str, int, int], PreparedImage]" = OrderedDict()
+        self._writes = 0
+        self.ocr_crop = ocr_crop
+        self.ocr_grayscale = ocr_grayscale
+        self.crop_presets = self._load_crop_presets(crop_modes_file) if ocr_crop == "presets" else None
+
+    @staticmethod
+    def _load_crop_presets(path: Union[str, Path]) -> Optional[CropPresets]:
+        try:
+            presets = load_crop_presets(path)
+        except FileNotFoundError:
+            print(f"Crop presets file {path} not found, OCR images will not be cropped.")
+            return None
+        if not any(preset.specificity for preset in presets.values()):
+            print(f"No preset in {path} has a 'match' size signature, OCR images will not be cropped.")
+            return None
+        return presets
+
+    @property
+    def transforms_ocr(self) -> bool:
+        """Whether the OCR image is cropped or converted besides being downscaled."""
+        return self.ocr_grayscale or (
+            self.ocr_crop is not None
+            and (self.ocr_crop != "presets" or self.crop_presets is not None)
+        )
+
+    @property
+    def ocr_variant(self) -> str:
+        """Describes how OCR images are made, for cache keys and file names."""
+        variant = f"{self.ocr_max_side}px"
+        if self.ocr_crop == "presets" and self.crop_presets is not None:
+            presets = sorted((name, repr(preset)) for name, preset in self.crop_presets.items())
+            variant += f"-presets{hash_text(repr(presets))[:8]}"
+        elif self.ocr_crop == "bands":
+            variant += "-bands"
+        if self.ocr_grayscale:
+            variant += "-gray"
+        return variant
+
+    def transform_for_ocr(self, image, original_size: Tuple[int, int]):
+        """
+        Crop and convert a decoded image for OCR.
+
+        Args:
+            image: The decoded image (possibly downscaled)
+            original_size: Size of the image file, which crop presets refer to
+
+        Returns:
+            The image to run OCR on
+        """
+        box = None
+        if self.crop_presets is not None:
+            preset = self.crop_presets.select(original_size)
+            # Skip presets if the image was rotated by its EXIF orientation
+            same_orientation = (image.size[0] >= image.size[1]) == (
+                original_size[0] >= original_size[1]
+            )
+            if preset is not None and same_orientation:
+                scale_x = image.size[0] / original_size[0]
+                scale_y = image.size[1] / original_size[1]
+                left, upper, right, lower = preset.box(original_size)
+                box = (
+                    int(left * scale_x),
+                    int(upper * scale_y),
+                    round(right * scale_x),
+                    round(lower * scale_y),
+                )
+        elif self.ocr_crop == "bands":
+            box = detect_content_box(image)
+        if box is not None and box[2] > box[0] and box[3] > box[1]:
+            image = image.crop(box)
+        if self.ocr_grayscale:
+            image = image.convert("L")
+        return image
+
+    def prepare(self, image_path: Union[str, Path]) -> PreparedImage:
+        """
+        Read an image for preprocessing.
+
+        Args:
+            image_path: Path to the image file
+
+        Returns:
+            The prepared image (shared while the file is unchanged)
+        """
+        image_path = Path(image_path)
+        stat = os.stat(image_path)
+        key = (str(image_path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+                return item
+            data = image_path.read_bytes()
+            item = PreparedImage(
+                image_path, data, hashlib.sha256(data).hexdigest(), self
+            )
+            self._items[key] = item
+            while len(self._items) > self.memory_items:
+                self._items.popitem(last=False)
+            return item
+
+    def _cache_path(self, content_hash: str, name: str) -> Path:
+        return self.cache_dir / content_hash[:2] / f"{content_hash}-{name}"
+
+    def _read_cached(self, content_hash: str, name: str) -> Optional[bytes]:
+        """Read a derived image from the disk cache."""
+        if self.cache_dir is None:
+            return None
+        path = self._cache_path(content_hash, name)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # mark as recently used
+            return data
+        except OSError:
+            return None
+
+    def _write_cached(self, content_hash: str, name: str, data: bytes):
+        """Store a derived image in the disk cache (best effort)."""
+        if self.cache_dir is None:
+            return
+        path = self._cache_path(content_hash, name)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_bytes(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Could not cache {path.name}: {e}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % _PRUNE_INTERVAL == 0
+        if prune:
+            self.prune()
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Delete least recently used derived images until the disk cache fits its limit.
+
+        Args:
+            max_bytes: Size limit to enforce (defaults to cache_max_bytes)
+
+        Returns:
+            Number of files deleted
+        """
+        if self.cache_dir is None or not self.cache_dir.exists():
+            return 0
+        max_bytes = self.cache_max_bytes if max_bytes is None else max_bytes
+        files = []
+        total = 0
+        for path in self.cache_dir.glob("*/*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        deleted = 0
+        for _, size, path in sorted(files):
+            if total <= max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            deleted += 1
+        return deleted
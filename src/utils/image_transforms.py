@@ -0,0 +1,447 @@
+"""
+Fused image transforms for preparing screenshots for storage.
+
+Cropping to a preset, scaling horizontally, downscaling large images and
+re-encoding used to be separate scripts, each decoding and lossily re-encoding
+every image. A TransformChain computes the final geometry from the image header
+and applies the whole chain with one (reduced, for JPEG) decode, one resize and
+one encode.
+
+Crop presets are compiled once from cropping_modes.json; with size signatures,
+the preset for each image is picked from its header dimensions.
+"""
+
+import json
+import math
+import multiprocessing
+import os
+import re
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ..config import (
+    CROP_MODES_FILE,
+    PREPROCESS_DOWNSCALE_MIN_SIDE,
+    PREPROCESS_JPEG_QUALITY,
+)
+from .discovery import iter_image_files
+
+# An edge offset: "60", "width - 60", "height - 1296", "width * 0.5 + 10"
+_EDGE_PATTERN = re.compile(
+    r"^(?:(?P<dimension>width|height)(?:\s*\*\s*(?P<factor>\d+(?:\.\d+)?))?)?"
+    r"\s*(?:(?P<sign>[+-])?\s*(?P<offset>\d+))?$"
+)
+
+Box = Tuple[int, int, int, int]
+
+
+@dataclass(frozen=True)
+class CropEdge:
+    """A crop edge compiled to ``factor * dimension + offset``."""
+
+    factor: float = 0.0
+    offset: int = 0
+
+    @classmethod
+    def compile(cls, expression: Union[int, str], dimension: str) -> "CropEdge":
+        """
+        Compile an edge expression from cropping_modes.json.
+
+        Args:
+            expression: A number or ``<dimension> [* factor] [+|- number]``
+            dimension: The dimension the edge may refer to ("width" or "height")
+
+        Returns:
+            The compiled edge
+
+        Raises:
+            ValueError: If the expression is malformed or refers to the other dimension
+        """
+        if isinstance(expression, int):
+            return cls(0.0, expression)
+        match = _EDGE_PATTERN.match(str(expression).strip())
+        if match is None or not (match["dimension"] or match["offset"]):
+            raise ValueError(f"invalid crop edge {expression!r}")
+        if match["dimension"] is None:
+            if match["sign"] == "-":
+                raise ValueError(f"invalid crop edge {expression!r}")
+            return cls(0.0, int(match["offset"]))
+        if match["dimension"] != dimension:
+            raise ValueError(f"crop edge {expression!r} must refer to {dimension}")
+        if match["offset"] is not None and match["sign"] is None:
+            raise ValueError(f"invalid crop edge {expression!r}")
+        offset = int(match["offset"] or 0)
+        return cls(
+            float(match["factor"] or 1.0), -offset if match["sign"] == "-" else offset
+        )
+
+    def resolve(self, size: int) -> int:
+        """Get the edge position for an image dimension, clamped to the image."""
+        return max(0, min(size, int(self.factor * size) + self.offset))
+
+
+def _compile_range(name: str, key: str, value) -> Tuple[int, int]:
+    """Compile a size signature value: an exact size or a [min, max] range."""
+    if isinstance(value, int):
+        return value, value
+    if (
+        isinstance(value, list)
+        and len(value) == 2
+        and all(isinstance(bound, int) for bound in value)
+    ):
+        return value[0], value[1]
+    raise ValueError(
+        f"Crop preset '{name}': {key} must be a size or [min, max], got {value!r}"
+    )
+
+
+@dataclass(frozen=True)
+class CropPreset:
+    """
+    A crop preset from cropping_modes.json.
+
+    Edges are compiled once from expressions like ``60`` or ``width - 60``. A
+    preset can carry a size signature (``"match": {"width": 1440, "height":
+    [3000, 3200]}``) describing the screenshots it is meant for, so it can be
+    picked per image from the image header alone.
+    """
+
+    name: str
+    left: CropEdge
+    upper: CropEdge
+    right: CropEdge
+    lower: CropEdge
+    width_range: Optional[Tuple[int, int]] = None
+    height_range: Optional[Tuple[int, int]] = None
+
+    @classmethod
+    def from_settings(cls, name: str, settings: Dict) -> "CropPreset":
+        """
+        Parse a preset as written in cropping_modes.json.
+
+        Args:
+            name: Preset name
+            settings: Dictionary with left, upper, right and lower edges and an
+                optional ``match`` size signature
+
+        Returns:
+            The compiled preset
+
+        Raises:
+            ValueError: If an edge or the size signature is malformed
+        """
+        edges = {}
+        for edge, dimension in (
+            ("left", "width"),
+            ("upper", "height"),
+            ("right", "width"),
+            ("lower", "height"),
+        ):
+            try:
+                edges[edge] = CropEdge.compile(settings[edge], dimension)
+            except ValueError as e:
+                raise ValueError(f"Crop preset '{name}': {edge}: {e}") from None
+
+        match = settings.get("match", {})
+        unknown = set(match) - {"width", "height"}
+        if unknown:
+            raise ValueError(
+                f"Crop preset '{name}': unknown match keys {', '.join(sorted(unknown))}"
+            )
+        return cls(
+            name,
+            width_range=_compile_range(name, "width", match["width"]) if "width" in match else None,
+            height_range=_compile_range(name, "height", match["height"]) if "height" in match else None,
+            **edges,
+        )
+
+    @property
+    def specificity(self) -> int:
+        """Number of dimensions the size signature constrains (0 if it has none)."""
+        return (self.width_range is not None) + (self.height_range is not None)
+
+    @property
+    def signature(self) -> str:
+        """The size signature for display, e.g. "width 1440, height 3000-3200"."""
+        parts = []
+        for dimension, bounds in (("width", self.width_range), ("height", self.height_range)):
+            if bounds is not None:
+                value = bounds[0] if bounds[0] == bounds[1] else f"{bounds[0]}-{bounds[1]}"
+                parts.append(f"{dimension} {value}")
+        return ", ".join(parts)
+
+    def matches(self, size: Tuple[int, int]) -> bool:
+        """
+        Check an image size against the preset's size signature.
+
+        Args:
+            size: Image (width, height)
+
+        Returns:
+            True if the preset has a signature and the size fits it
+        """
+        if not self.specificity:
+            return False
+        for value, bounds in zip(size, (self.width_range, self.height_range)):
+            if bounds is not None and not bounds[0] <= value <= bounds[1]:
+                return False
+        return True
+
+    def box(self, size: Tuple[int, int]) -> Box:
+        """
+        Get the crop box for an image size.
+
+        Args:
+            size: Image (width, height)
+
+        Returns:
+            The (left, upper, right, lower) box, clamped to the image
+        """
+        width, height = size
+        left = self.left.resolve(width)
+        upper = self.upper.resolve(height)
+        return (
+            left,
+            upper,
+            max(left, self.right.resolve(width)),
+            max(upper, self.lower.resolve(height)),
+        )
+
+
+class CropPresets(Mapping):
+    """
+    The crop presets of a cropping_modes.json file, by name.
+
+    Used as the crop of a TransformChain, it picks the preset for each image
+    from its size (see ``select``), so a folder with screenshots from different
+    devices can be cropped in one unattended run.
+    """
+
+    def __init__(self, presets: Iterable[CropPreset]):
+        self._presets = {preset.name: preset for preset in presets}
+        # Most specific signature first; file order breaks ties
+        self._by_specificity = sorted(
+            (preset for preset in self._presets.values() if preset.specificity),
+            key=lambda preset: -preset.specificity,
+        )
+
+    def __getitem__(self, name: str) -> CropPreset:
+        return self._presets[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._presets)
+
+    def __len__(self) -> int:
+        return len(self._presets)
+
+    def select(self, size: Tuple[int, int]) -> Optional[CropPreset]:
+        """
+        Pick the preset whose size signature matches an image size.
+
+        Args:
+            size: Image (width, height), read from the image header
+
+        Returns:
+            The most specific matching preset, or None if no preset matches
+        """
+        for preset in self._by_specificity:
+            if preset.matches(size):
+                return preset
+        return None
+
+    def box(self, size: Tuple[int, int]) -> Optional[Box]:
+        """
+        Get the crop box of the preset matching an image size.
+
+        Args:
+            size: Image (width, height)
+
+        Returns:
+            The crop box, or None if no preset matches (the image is not cropped)
+        """
+        preset = self.select(size)
+        return preset.box(size) if preset is not None else None
+
+
+def load_crop_presets(path: Union[str, Path] = CROP_MODES_FILE) -> CropPresets:
+    """
+    Load and compile the crop presets file.
+
+    Args:
+        path: Path to cropping_modes.json
+
+    Returns:
+        The presets, by name in file order
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        modes = json.load(file)
+    return CropPresets(
+        CropPreset.from_settings(name, settings) for name, settings in modes.items()
+    )
+
+
+@dataclass(frozen=True)
+class TransformChain:
+    """
+    Crop, horizontal scale, conditional downscale and JPEG re-encode, in that order.
+
+    Attributes:
+        crop: Crop preset, CropPresets to pick the preset per image by size,
+            or None to keep the whole image
+        scale_x: Horizontal scale factor (e.g. 0.5 for squeezed screenshots)
+        downscale: Scale factor applied when both sides of the (cropped and
+            horizontally scaled) image exceed ``downscale_min_side``
+        downscale_min_side: Size both sides must exceed to be downscaled
+        quality: JPEG quality of the output
+        skip_unchanged: Write nothing for images the chain would not crop or
+            resize, instead of only re-encoding them
+    """
+
+    crop: Optional[Union[CropPreset, CropPresets]] = None
+    scale_x: float = 1.0
+    downscale: Optional[float] = None
+    downscale_min_side: int = PREPROCESS_DOWNSCALE_MIN_SIDE
+    quality: int = PREPROCESS_JPEG_QUALITY
+    skip_unchanged: bool = False
+
+    def geometry(self, size: Tuple[int, int]) -> Tuple[Box, Tuple[int, int]]:
+        """
+        Compute where the chain crops an image and the size it ends up at.
+
+        Args:
+            size: Original image (width, height)
+
+        Returns:
+            Tuple of the crop box in original pixels and the output (width, height)
+        """
+        box = self.crop.box(size) if self.crop is not None else None
+        if box is None:
+            box = (0, 0, size[0], size[1])
+        width = max(1, int((box[2] - box[0]) * self.scale_x))
+        height = max(1, box[3] - box[1])
+        if (
+            self.downscale is not None
+            and width > self.downscale_min_side
+            and height > self.downscale_min_side
+        ):
+            width = max(1, int(width * self.downscale))
+            height = max(1, int(height * self.downscale))
+        return box, (width, height)
+
+    def apply(
+        self, input_path: Union[str, Path], output_path: Union[str, Path]
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Apply the chain to an image with a single decode and encode.
+
+        Args:
+            input_path: Source image
+            output_path: Destination JPEG file
+
+        Returns:
+            The output (width, height), or None if the image was skipped as unchanged
+        """
+        from PIL import Image
+
+        with Image.open(input_path) as image:
+            original_size = image.size
+            box, size = self.geometry(original_size)
+            crop_size = (box[2] - box[0], box[3] - box[1])
+            if not all(crop_size):
+                raise ValueError(f"Crop leaves no pixels of a {original_size} image")
+            if self.skip_unchanged and box == (0, 0, *original_size) and size == crop_size:
+                return None
+
+            # Let the JPEG decoder scale down by a power of two while decoding,
+            # as long as the crop keeps at least the output resolution
+            image.draft(
+                "RGB",
+                (
+                    math.ceil(original_size[0] * size[0] / crop_size[0]),
+                    math.ceil(original_size[1] * size[1] / crop_size[1]),
+                ),
+            )
+            scale_x = image.size[0] / original_size[0]
+            scale_y = image.size[1] / original_size[1]
+            box = (box[0] * scale_x, box[1] * scale_y, box[2] * scale_x, box[3] * scale_y)
+
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            # Crop and resize in one resampling pass
+            result = image.resize(size, Image.Resampling.LANCZOS, box=box)
+            result.save(output_path, "JPEG", quality=self.quality)
+            return size
+
+
+def _transform_file(
+    chain: TransformChain, input_path: str, output_path: str
+) -> Tuple[str, Optional[Tuple[int, int]], Optional[str]]:
+    """Worker: apply a chain to one file, returning (input, size, error)."""
+    try:
+        return input_path, chain.apply(input_path, output_path), None
+    except Exception as e:
+        return input_path, None, str(e)
+
+
+def transform_folder(
+    source: Union[str, Path],
+    target: Union[str, Path],
+    chain: TransformChain,
+    workers: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Apply a transform chain to every image of a folder using a process pool.
+
+    Outputs are saved to the target folder as ``<original stem>.jpg``.
+
+    Args:
+        source: Folder with the images to transform
+        target: Folder for the transformed JPEG files (created if missing)
+        chain: Transforms to apply
+        workers: Number of worker processes (defaults to the CPU count; 1 runs
+            in this process)
+
+    Returns:
+        Dictionary with the number of ``processed``, ``skipped`` and ``failed`` images
+    """
+    target = Path(target)
+    target.mkdir(parents=True, exist_ok=True)
+    inputs: List[str] = []
+    outputs: List[str] = []
+    for entry in iter_image_files(source, order="name", exclude=[target]):
+        inputs.append(entry.path)
+        outputs.append(str(target / f"{os.path.splitext(entry.name)[0]}.jpg"))
+
+    workers = workers or os.cpu_count() or 1
+    counts = {"processed": 0, "skipped": 0, "failed": 0}
+    if workers == 1 or len(inputs) < 2:
+        results = map(_transform_file, repeat(chain), inputs, outputs)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=min(workers, len(inputs)),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        chunksize = max(1, min(16, len(inputs) // (workers * 4)))
+        results = executor.map(
+            _transform_file, repeat(chain), inputs, outputs, chunksize=chunksize
+        )
+
+    try:
+        for (input_path, size, error), output_path in zip(results, outputs):
+            if error is not None:
+                counts["failed"] += 1
+                print(f"Failed to process {input_path}: {error}")
+            elif size is None:
+                counts["skipped"] += 1
+            else:
+                counts["processed"] += 1
+                print(f"Processed {input_path} -> {output_path} ({size[0]}x{size[1]})")
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    return counts
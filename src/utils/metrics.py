@@ -0,0 +1,350 @@
+"""
+Lightweight timing spans and counters for the processing stages.
+
+Spans time a stage (OCR, description, keywords, NER, naming, renaming) and are
+aggregated into histograms; counters track cache hits, retries and processed
+images. Both can be exported as a Prometheus textfile (for node_exporter's
+textfile collector) and every span can be appended to a JSONL trace. Metrics
+are disabled by default, in which case a span is a shared no-op context manager.
+"""
+
+import bisect
+import contextlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from ..config import METRICS_HISTOGRAM_BUCKETS, METRICS_PREFIX
+
+# Description of each metric in the Prometheus export
+METRIC_HELP = {
+    "stage_seconds": "Time spent per processing stage",
+    "stage_errors_total": "Stage calls that raised an error",
+    "cache_hits_total": "Results found in the result cache",
+    "cache_misses_total": "Results not found in the result cache",
+    "retries_total": "Retried backend calls",
+    "rate_limit_wait_seconds_total": "Time spent waiting for the rate limiter",
+    "images_total": "Images by outcome",
+    "duplicates_total": "Exact duplicate images found, by policy",
+    "near_duplicate_hits_total": "Stage results reused from a near-duplicate image",
+    "ocr_pixels_total": "Image pixels before (original) and after (ocr) OCR preprocessing",
+}
+
+_NULL_SPAN = contextlib.nullcontext()
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    """Cumulative-bucket histogram of durations in seconds."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Span:
+    """Times one stage call and reports it to Metrics on exit."""
+
+    __slots__ = ("metrics", "stage", "image", "wall_start", "start")
+
+    def __init__(self, metrics: "Metrics", stage: str, image):
+        self.metrics = metrics
+        self.stage = stage
+        self.image = image
+
+    def __enter__(self):
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        duration = time.perf_counter() - self.start
+        self.metrics._finish(self, duration, exc_type is not None)
+        return False
+
+
+class Metrics:
+    """
+    Collects stage timings and counters.
+
+    One instance is shared by the whole process (see ``get_metrics``). It is
+    thread-safe, so pipeline stages and the OCR thread can report to it
+    concurrently.
+    """
+
+    def __init__(self, buckets=METRICS_HISTOGRAM_BUCKETS, prefix: str = METRICS_PREFIX):
+        """
+        Args:
+            buckets: Upper bounds (seconds) of the stage duration histogram buckets
+            prefix: Prefix of the exported metric names
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._histograms: Dict[Labels, _Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._trace = None
+
+    def enable(self, trace_file: Optional[Union[str, Path]] = None):
+        """
+        Start collecting metrics.
+
+        Args:
+            trace_file: JSONL file every finished span is appended to
+        """
+        with self._lock:
+            if trace_file is not None and self._trace is None:
+                Path(trace_file).parent.mkdir(parents=True, exist_ok=True)
+                self._trace = open(trace_file, "a", encoding="utf-8")
+            self.enabled = True
+
+    def disable(self):
+        """Stop collecting metrics and close the trace file."""
+        with self._lock:
+            self.enabled = False
+            if self._trace is not None:
+                self._trace.close()
+                self._trace = None
+
+    def reset(self):
+        """Drop all collected values."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def drain(self) -> dict:
+        """
+        Take the collected values out, e.g. to send them from a worker process.
+
+        Returns:
+            Picklable snapshot of the values for ``merge``; the values are reset
+        """
+        with self._lock:
+            snapshot = {
+                "histograms": {
+                    labels: (list(h.counts), h.sum, h.count)
+                    for labels, h in self._histograms.items()
+                },
+                "counters": dict(self._counters),
+            }
+            self._histograms.clear()
+            self._counters.clear()
+        return snapshot
+
+    def merge(self, snapshot: dict):
+        """
+        Add values taken out of another Metrics instance with ``drain``.
+
+        Args:
+            snapshot: Result of ``drain`` (with the same histogram buckets)
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            for labels, (counts, total, count) in snapshot["histograms"].items():
+                histogram = self._histograms.get(labels)
+                if histogram is None:
+                    histogram = self._histograms[labels] = _Histogram(self.buckets)
+                histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                histogram.sum += total
+                histogram.count += count
+            for key, value in snapshot["counters"].items():
+                self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def span(self, stage: str, image=None):
+        """
+        Time a stage.
+
+        Usage: ``with metrics.span("ocr", image=path): ...``
+
+        Args:
+            stage: Name of the stage
+            image: Image the stage works on, recorded in the trace
+
+        Returns:
+            Context manager timing its block (a no-op while disabled)
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage, image)
+
+    def increment(self, name: str, amount: float = 1.0, **labels):
+        """
+        Add to a counter.
+
+        Args:
+            name: Counter name, e.g. "cache_hits_total"
+            amount: Value to add
+            **labels: Labels of the counter, e.g. ``stage="ocr"``
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def _finish(self, span: _Span, duration: float, failed: bool):
+        """Record a finished span."""
+        labels = (("stage", span.stage),)
+        with self._lock:
+            histogram = self._histograms.get(labels)
+            if histogram is None:
+                histogram = self._histograms[labels] = _Histogram(self.buckets)
+            histogram.observe(duration)
+            if failed:
+                key = ("stage_errors_total", labels)
+                self._counters[key] = self._counters.get(key, 0.0) + 1
+            if self._trace is not None:
+                record = {
+                    "ts": round(span.wall_start, 6),
+                    "stage": span.stage,
+                    "duration_ms": round(duration * 1000, 3),
+                    "thread": threading.current_thread().name,
+                    "pid": os.getpid(),
+                }
+                if span.image is not None:
+                    record["image"] = str(span.image)
+                if failed:
+                    record["error"] = True
+                self._trace.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self._trace.flush()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarize the stage timings.
+
+        Returns:
+            Dictionary mapping each stage to its call count, total and mean seconds
+        """
+        with self._lock:
+            return {
+                dict(labels)["stage"]: {
+                    "count": histogram.count,
+                    "total_seconds": histogram.sum,
+                    "mean_seconds": histogram.sum / histogram.count,
+                }
+                for labels, histogram in sorted(self._histograms.items())
+            }
+
+    def counters(self) -> Dict[str, float]:
+        """
+        Get the counter values.
+
+        Returns:
+            Dictionary mapping "name{label=value}" to the counter value
+        """
+        with self._lock:
+            return {
+                name + _format_labels(labels): value
+                for (name, labels), value in sorted(self._counters.items())
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            Text of the export
+        """
+        lines = []
+
+        def header(name: str, kind: str):
+            full_name = f"{self.prefix}_{name}"
+            if name in METRIC_HELP:
+                lines.append(f"# HELP {full_name} {METRIC_HELP[name]}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            return full_name
+
+        with self._lock:
+            if self._histograms:
+                name = header("stage_seconds", "histogram")
+                for labels, histogram in sorted(self._histograms.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        bucket_labels = labels + (("le", repr(float(bound))),)
+                        lines.append(
+                            f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}"
+                        )
+                    bucket_labels = labels + (("le", "+Inf"),)
+                    lines.append(
+                        f"{name}_bucket{_format_labels(bucket_labels)} {histogram.count}"
+                    )
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum!r}")
+                    lines.append(
+                        f"{name}_count{_format_labels(labels)} {histogram.count}"
+                    )
+
+            names = sorted({name for name, _ in self._counters})
+            for counter in names:
+                name = header(counter, "counter")
+                for (other, labels), value in sorted(self._counters.items()):
+                    if other == counter:
+                        lines.append(f"{name}{_format_labels(labels)} {value!r}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Union[str, Path]):
+        """
+        Write the Prometheus textfile.
+
+        The file is replaced atomically, so a collector never reads a partial file.
+
+        Args:
+            path: Path of the textfile (conventionally ending in ``.prom``)
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(self.to_prometheus(), encoding="utf-8")
+        os.replace(temp_path, path)
+
+    def print_summary(self):
+        """Print the time spent per stage."""
+        summary = self.summary()
+        if not summary:
+            return
+        print("Stage timings:")
+        for stage, stats in summary.items():
+            print(
+                f"  {stage:<12} {stats['count']:>6} calls  "
+                f"{stats['total_seconds']:9.2f} s total  "
+                f"{stats['mean_seconds'] * 1000:9.1f} ms mean"
+            )
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """
+    Get the metrics shared by all components of this process.
+
+    Returns:
+        The process-wide Metrics instance (disabled until ``enable`` is called)
+    """
+    return _metrics
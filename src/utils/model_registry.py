@@ -0,0 +1,189 @@
+"""
+Process-wide registry of loaded models.
+
+Loading the Docling converter or a spaCy pipeline takes seconds and hundreds of
+MB, so every ImageFileNamer, BatchProcessor and API object of a process shares
+one instance per model name and configuration instead of loading its own.
+"""
+
+import gc
+import inspect
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class _Entry:
+    """A model slot: the model once loaded and the locks guarding it."""
+
+    __slots__ = ("model", "load_lock", "use_lock")
+
+    def __init__(self):
+        self.model = None
+        self.load_lock = threading.Lock()
+        self.use_lock = threading.RLock()
+
+
+class ModelRegistry:
+    """
+    Thread-safe cache of model singletons keyed by model name and configuration.
+
+    Loaders are registered by name (e.g. "docling", "spacy"); ``get`` calls the
+    loader once per distinct configuration and hands the same object to every
+    caller after that. Two threads asking for the same model wait for a single
+    load, while different models can load concurrently. Models that are not
+    safe to use from several threads at once are used through ``use``, which
+    holds the model's lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaders: Dict[str, Callable[..., Any]] = {}
+        self._entries: Dict[Tuple, _Entry] = {}
+
+    def register(self, name: str, loader: Callable[..., Any]):
+        """
+        Register how to load a model.
+
+        Args:
+            name: Model name used with ``get``
+            loader: Function returning the loaded model; its keyword arguments
+                are the model configuration
+        """
+        with self._lock:
+            self._loaders[name] = loader
+
+    def _key(self, name: str, config: Dict[str, Any]) -> Tuple:
+        """Build the key of a model with its full configuration, defaults included."""
+        loader = self._loaders.get(name)
+        if loader is None:
+            raise KeyError(f"No loader registered for model '{name}'")
+        arguments = inspect.signature(loader).bind(**config)
+        arguments.apply_defaults()
+        return (name,) + tuple(sorted(arguments.arguments.items()))
+
+    def _entry(self, name: str, config: Dict[str, Any]) -> Tuple[Tuple, _Entry]:
+        with self._lock:
+            key = self._key(name, config)
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            return key, entry
+
+    def get(self, name: str, **config) -> Any:
+        """
+        Get a model, loading it on first use.
+
+        Args:
+            name: Registered model name
+            **config: Arguments for the model's loader (must be hashable)
+
+        Returns:
+            The shared model instance
+        """
+        return self._load(*self._entry(name, config))
+
+    def _load(self, key: Tuple, entry: _Entry) -> Any:
+        """Load the model of an entry unless another thread already did."""
+        model = entry.model
+        if model is not None:
+            return model
+        with entry.load_lock:
+            if entry.model is None:
+                print(f"Loading model {_describe(key)}...")
+                entry.model = self._loaders[key[0]](**dict(key[1:]))
+            return entry.model
+
+    @contextmanager
+    def use(self, name: str, **config) -> Iterator[Any]:
+        """
+        Use a model exclusively, for models that are not thread-safe.
+
+        Usage: ``with registry.use("spacy") as nlp: doc = nlp(text)``
+
+        Args:
+            name: Registered model name
+            **config: Arguments for the model's loader
+
+        Returns:
+            Context manager yielding the model while holding its lock
+        """
+        key, entry = self._entry(name, config)
+        model = self._load(key, entry)
+        with entry.use_lock:
+            yield model
+
+    def warm_up(self, *names: str):
+        """
+        Load models now instead of on first use.
+
+        Args:
+            *names: Registered model names, loaded with their default
+                configuration (all registered models if none are given)
+        """
+        for name in names or sorted(self._loaders):
+            self.get(name)
+
+    def evict(self, name: Optional[str] = None, **config) -> int:
+        """
+        Drop loaded models so their memory can be freed.
+
+        Objects still holding a model keep it alive; processors fetch their
+        models from the registry on every use, so they pick up a fresh instance.
+
+        Args:
+            name: Model name to evict (all models if None)
+            **config: Only evict the model with this configuration
+
+        Returns:
+            Number of models evicted
+        """
+        with self._lock:
+            if name is None:
+                keys = list(self._entries)
+            elif config:
+                keys = [self._key(name, config)]
+            else:
+                keys = [key for key in self._entries if key[0] == name]
+            evicted = 0
+            for key in keys:
+                entry = self._entries.pop(key, None)
+                if entry is not None and entry.model is not None:
+                    evicted += 1
+        if evicted:
+            gc.collect()
+        return evicted
+
+    def loaded(self) -> List[str]:
+        """
+        List the loaded models.
+
+        Returns:
+            Descriptions of the loaded models with their configuration
+        """
+        with self._lock:
+            return [
+                _describe(key)
+                for key, entry in self._entries.items()
+                if entry.model is not None
+            ]
+
+
+def _describe(key: Tuple) -> str:
+    name, *config = key
+    if not config:
+        return name
+    return f"{name} ({', '.join(f'{k}={v}' for k, v in config)})"
+
+
+_registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    """
+    Get the model registry shared by all components of this process.
+
+    Returns:
+        The process-wide ModelRegistry instance
+    """
+    return _registry
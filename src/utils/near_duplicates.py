@@ -0,0 +1,345 @@
+"""
+Perceptual-hash index of images with known model results.
+
+The same screenshot is often saved several times at different resolutions or
+JPEG qualities, which changes its bytes (and so its content hash) but not what
+OCR and the LLM make of it. Images are fingerprinted with a 64-bit difference
+hash (dHash); an image within a small Hamming distance of an indexed one can
+reuse that image's cached results instead of running the models again.
+
+The index is an SQLite multi-index hash table: each hash is split into four
+16-bit bands, each with its own B-tree index. Two hashes within distance d
+share at least one band with at most d // 4 differing bits, so a lookup only
+reads the entries whose band values are that close (by the pigeonhole principle
+none are missed). The band indexes also hold the full hash, so candidates are
+checked without touching the table, and lookups stay below a millisecond with
+a million entries.
+
+Index entries point at results in the ResultCache, so entries whose results
+were all evicted are pruned along with the cache.
+"""
+
+import io
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from itertools import combinations
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from ..config import (
+    NEAR_DUPLICATE_INDEX_FILE,
+    NEAR_DUPLICATE_MAX_ASPECT_DIFFERENCE,
+    NEAR_DUPLICATE_MAX_DISTANCE,
+)
+from .cache import ResultCache
+
+_BANDS = 4
+_BAND_BITS = 16
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+# Hashes with fewer (or more) set bits come from nearly uniform images, whose
+# hashes collide regardless of content
+_MIN_SET_BITS = 8
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    content_hash TEXT PRIMARY KEY,
+    phash INTEGER NOT NULL,
+    aspect REAL NOT NULL,
+    band0 INTEGER NOT NULL,
+    band1 INTEGER NOT NULL,
+    band2 INTEGER NOT NULL,
+    band3 INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS images_band0 ON images (band0, phash);
+CREATE INDEX IF NOT EXISTS images_band1 ON images (band1, phash);
+CREATE INDEX IF NOT EXISTS images_band2 ON images (band2, phash);
+CREATE INDEX IF NOT EXISTS images_band3 ON images (band3, phash);
+"""
+
+# SQLite page cache per connection, in KiB (the band indexes should stay cached)
+_CACHE_KIB = 16384
+
+
+class Fingerprint(NamedTuple):
+    """Perceptual hash of an image and its aspect ratio (width / height)."""
+
+    phash: int
+    aspect: float
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits of two 64-bit hashes (signed or unsigned)."""
+    return bin((a ^ b) & 0xFFFFFFFFFFFFFFFF).count("1")
+
+
+def dhash(image) -> int:
+    """
+    Compute the 64-bit difference hash of an image.
+
+    The image is shrunk to 9x8 grayscale pixels; each bit tells whether a
+    pixel is brighter than its right neighbour. Resizing and recompressing an
+    image barely changes the hash.
+
+    Args:
+        image: PIL image
+
+    Returns:
+        The hash as an unsigned 64-bit integer
+    """
+    from PIL import Image
+
+    pixels = list(image.convert("L").resize((9, 8), Image.Resampling.BOX).getdata())
+    bits = 0
+    for row in range(0, 72, 9):
+        for col in range(row, row + 8):
+            bits = (bits << 1) | (pixels[col] > pixels[col + 1])
+    return bits
+
+
+def image_fingerprint(source: Union[str, Path, bytes]) -> Optional[Fingerprint]:
+    """
+    Fingerprint an image file.
+
+    JPEGs are decoded at reduced size, as the hash only needs a few pixels.
+
+    Args:
+        source: Path to the image or its encoded bytes
+
+    Returns:
+        The fingerprint, or None if the image cannot be decoded or is too
+        uniform for its hash to be meaningful
+    """
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as image:
+            width, height = image.size
+            image.draft("L", (72, 64))
+            phash = dhash(image)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        print(f"Could not fingerprint image: {e}")
+        return None
+    if not _MIN_SET_BITS <= bin(phash).count("1") <= 64 - _MIN_SET_BITS:
+        return None
+    return Fingerprint(phash, width / height)
+
+
+def file_fingerprint(file_path: Union[str, Path]) -> Optional[Fingerprint]:
+    """
+    Fingerprint an image file, memoized per path, size and modification time.
+
+    Args:
+        file_path: Path to the image
+
+    Returns:
+        The fingerprint (see ``image_fingerprint``)
+    """
+    stat = os.stat(file_path)
+    return _file_fingerprint(str(file_path), stat.st_size, stat.st_mtime_ns)
+
+
+@lru_cache(maxsize=256)
+def _file_fingerprint(file_path: str, size: int, mtime_ns: int) -> Optional[Fingerprint]:
+    return image_fingerprint(file_path)
+
+
+def _to_signed(value: int) -> int:
+    """Map an unsigned 64-bit hash to SQLite's signed INTEGER range."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _bands(phash: int) -> List[int]:
+    return [(phash >> (_BAND_BITS * band)) & _BAND_MASK for band in range(_BANDS)]
+
+
+def _neighbours(value: int, radius: int) -> List[int]:
+    """All band values within ``radius`` differing bits of a band value."""
+    values = [value]
+    for flips in range(1, radius + 1):
+        for bits in combinations(range(_BAND_BITS), flips):
+            flipped = value
+            for bit in bits:
+                flipped ^= 1 << bit
+            values.append(flipped)
+    return values
+
+
+class NearDuplicateIndex:
+    """
+    Persistent index of image fingerprints by content hash.
+
+    Like ResultCache, the SQLite database runs in WAL mode with one connection
+    per thread, so it can be shared by threads and worker processes.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = NEAR_DUPLICATE_INDEX_FILE,
+        max_distance: int = NEAR_DUPLICATE_MAX_DISTANCE,
+        max_aspect_difference: float = NEAR_DUPLICATE_MAX_ASPECT_DIFFERENCE,
+    ):
+        """
+        Args:
+            path: Path to the index database
+            max_distance: Largest Hamming distance between the hashes of two
+                images considered near-duplicates
+            max_aspect_difference: Largest relative difference of the aspect
+                ratios of two images considered near-duplicates
+        """
+        self.path = Path(path)
+        self.max_distance = max_distance
+        self.max_aspect_difference = max_aspect_difference
+        self._local = threading.local()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get the SQLite connection for the current thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                str(self.path), timeout=30, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA cache_size=-{_CACHE_KIB}")
+            self._local.connection = connection
+        return connection
+
+    def add(self, content_hash: str, fingerprint: Fingerprint):
+        """
+        Index an image.
+
+        Args:
+            content_hash: Content hash the image's results are cached under
+            fingerprint: Fingerprint of the image
+        """
+        self.add_many([(content_hash, fingerprint)])
+
+    def add_many(self, items: Iterable[Tuple[str, Fingerprint]]):
+        """
+        Index several images in one transaction.
+
+        Args:
+            items: Pairs of content hash and fingerprint
+        """
+        now = time.time()
+        rows = (
+            (content_hash, _to_signed(phash), aspect, *_bands(phash), now)
+            for content_hash, (phash, aspect) in items
+        )
+        connection = self._connection()
+        connection.execute("BEGIN")
+        try:
+            connection.executemany(
+                "INSERT OR IGNORE INTO images "
+                "(content_hash, phash, aspect, band0, band1, band2, band3, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def find(self, fingerprint: Fingerprint) -> List[Tuple[int, str]]:
+        """
+        Find the indexed near-duplicates of an image.
+
+        Args:
+            fingerprint: Fingerprint of the image
+
+        Returns:
+            Pairs of (Hamming distance, content hash), closest first
+        """
+        phash, aspect = fingerprint
+        signed = _to_signed(phash)
+        radius = self.max_distance // _BANDS
+        connection = self._connection()
+        # Candidates come from the covering band indexes alone
+        close = {}
+        for band, value in enumerate(_bands(phash)):
+            values = _neighbours(value, radius)
+            rows = connection.execute(
+                f"SELECT rowid, phash FROM images INDEXED BY images_band{band} "
+                f"WHERE band{band} IN ({', '.join('?' * len(values))})",
+                values,
+            )
+            for rowid, other in rows:
+                if rowid not in close:
+                    distance = hamming_distance(signed, other)
+                    if distance <= self.max_distance:
+                        close[rowid] = distance
+
+        matches = []
+        for rowid, distance in close.items():
+            content_hash, other_aspect = connection.execute(
+                "SELECT content_hash, aspect FROM images WHERE rowid = ?", (rowid,)
+            ).fetchone()
+            if abs(other_aspect - aspect) <= self.max_aspect_difference * aspect:
+                matches.append((distance, content_hash))
+        matches.sort()
+        return matches
+
+    def remove(self, content_hash: str) -> bool:
+        """
+        Remove an image from the index.
+
+        Args:
+            content_hash: Content hash the image was indexed under
+
+        Returns:
+            True if the image was indexed
+        """
+        return (
+            self._connection()
+            .execute("DELETE FROM images WHERE content_hash = ?", (content_hash,))
+            .rowcount
+            > 0
+        )
+
+    def prune(self, cache: ResultCache) -> int:
+        """
+        Remove the images without any results left in a result cache.
+
+        Args:
+            cache: Result cache the indexed images' results are stored in
+
+        Returns:
+            Number of removed images
+        """
+        connection = self._connection()
+        connection.execute("ATTACH DATABASE ? AS cache", (str(cache.path),))
+        try:
+            return connection.execute(
+                "DELETE FROM images WHERE content_hash NOT IN "
+                "(SELECT input_hash FROM cache.results WHERE input_hash IS NOT NULL)"
+            ).rowcount
+        finally:
+            connection.execute("DETACH DATABASE cache")
+
+    def count(self) -> int:
+        """Number of indexed images."""
+        return self._connection().execute("SELECT COUNT(*) FROM images").fetchone()[0]
+
+    def clear(self) -> int:
+        """
+        Remove all images from the index.
+
+        Returns:
+            Number of removed images
+        """
+        return self._connection().execute("DELETE FROM images").rowcount
+
+    def close(self):
+        """Close the connection of the current thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
@@ -0,0 +1,255 @@
+"""
+Token-bucket rate limiting of model backend calls.
+"""
+
+import asyncio
+import multiprocessing
+import time
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from .file_utils import check_time_in_string
+from .metrics import get_metrics
+
+T = TypeVar("T")
+
+# HTTP status codes meaning the server is overloaded and the call may be retried
+RETRYABLE_STATUS_CODES = (429, 503)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at a fixed rate, with room for short bursts.
+
+    The bucket state lives in shared memory guarded by a process-shared lock, so
+    one bucket can be handed to worker processes (e.g. through a pool initializer)
+    and all of them draw from the same budget. A backoff blocks the bucket until
+    a point in time, for all processes at once.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        capacity: Optional[float] = None,
+        context=None,
+    ):
+        """
+        Args:
+            rate_per_minute: Tokens added per minute
+            capacity: Maximum number of stored tokens (defaults to one minute's worth)
+            context: multiprocessing context used to allocate the shared state
+        """
+        context = context or multiprocessing.get_context()
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_minute)
+        # Shared state: available tokens, time of last refill, blocked until
+        self._state = context.Array("d", [self.capacity, time.time(), 0.0])
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from the bucket, sleeping until they are available.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            Number of seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._state.get_lock():
+                now = time.time()
+                available = min(
+                    self.capacity,
+                    self._state[0] + (now - self._state[1]) * self.rate_per_second,
+                )
+                self._state[1] = now
+                if now < self._state[2]:
+                    self._state[0] = available
+                    wait_time = self._state[2] - now
+                elif available >= tokens:
+                    self._state[0] = available - tokens
+                    return waited
+                else:
+                    self._state[0] = available
+                    wait_time = (tokens - available) / self.rate_per_second
+            time.sleep(wait_time)
+            waited += wait_time
+
+    def backoff(self, seconds: float):
+        """
+        Block the bucket for a number of seconds and drop the stored tokens.
+
+        Args:
+            seconds: How long no tokens are handed out
+        """
+        with self._state.get_lock():
+            now = time.time()
+            self._state[0] = 0.0
+            self._state[1] = now
+            self._state[2] = max(self._state[2], now + seconds)
+
+
+class RateLimiter:
+    """
+    Rate limits calls per model backend (e.g. "description", "keywords", "ocr").
+
+    Each backend has its own token bucket, so throughput is only limited by the
+    backend that is actually saturated. Failed calls are retried when the error
+    says how long to wait ("... after N seconds") or signals an overloaded server,
+    backing off exponentially otherwise. Backends without a rate are unlimited but
+    still get retries.
+    """
+
+    def __init__(
+        self,
+        rates_per_minute: Dict[str, float],
+        max_retries: int = 3,
+        backoff_seconds: float = 2.0,
+        context=None,
+    ):
+        """
+        Args:
+            rates_per_minute: Calls per minute allowed per backend; 0 or None
+                means unlimited
+            max_retries: How often a failed call is retried
+            backoff_seconds: Initial wait before retrying without a server hint,
+                doubled on every further retry
+            context: multiprocessing context used to allocate the shared state
+        """
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.buckets = {
+            backend: TokenBucket(rate, context=context)
+            for backend, rate in rates_per_minute.items()
+            if rate
+        }
+        self.retries: Dict[str, int] = {}
+
+    def acquire(self, backend: str) -> float:
+        """
+        Wait for permission to call a backend.
+
+        Args:
+            backend: Name of the backend
+
+        Returns:
+            Number of seconds spent waiting
+        """
+        bucket = self.buckets.get(backend)
+        if bucket is None:
+            return 0.0
+        return bucket.acquire()
+
+    def backoff(self, backend: str, seconds: float):
+        """Stop calling a backend for a number of seconds."""
+        bucket = self.buckets.get(backend)
+        if bucket is not None:
+            bucket.backoff(seconds)
+
+    def call(self, backend: str, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Call a backend function within its rate limit, retrying when it is throttled.
+
+        Args:
+            backend: Name of the backend
+            func: Function performing the call
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The return value of func
+        """
+        attempt = 0
+        while True:
+            self._record_wait(backend, self.acquire(backend))
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                wait_time = self._prepare_retry(backend, e, attempt)
+                if wait_time is None:
+                    raise
+                attempt += 1
+                if backend not in self.buckets:
+                    time.sleep(wait_time)
+
+    async def acall(
+        self, backend: str, func: Callable[..., Awaitable[T]], *args, **kwargs
+    ) -> T:
+        """
+        Await a backend coroutine within its rate limit, retrying when it is throttled.
+
+        Behaves like ``call``; waiting for the shared token bucket happens on a
+        worker thread, so the event loop keeps running.
+
+        Args:
+            backend: Name of the backend
+            func: Coroutine function performing the call
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The result of the awaited call
+        """
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            self._record_wait(
+                backend, await loop.run_in_executor(None, self.acquire, backend)
+            )
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                wait_time = self._prepare_retry(backend, e, attempt)
+                if wait_time is None:
+                    raise
+                attempt += 1
+                if backend not in self.buckets:
+                    await asyncio.sleep(wait_time)
+
+    @staticmethod
+    def _record_wait(backend: str, waited: float):
+        """Count the time spent waiting for a backend's bucket."""
+        if waited:
+            get_metrics().increment(
+                "rate_limit_wait_seconds_total", waited, backend=backend
+            )
+        if waited >= 1:
+            print(f"Rate limit for {backend} reached, waited {waited:.2f} seconds.")
+
+    def _prepare_retry(
+        self, backend: str, error: Exception, attempt: int
+    ) -> Optional[float]:
+        """
+        Decide whether to retry a failed call and back off the backend if so.
+
+        Returns:
+            Seconds to wait before the retry, or None to give up
+        """
+        wait_time = self._retry_delay(error, attempt)
+        if wait_time is None or attempt >= self.max_retries:
+            return None
+        self.retries[backend] = self.retries.get(backend, 0) + 1
+        get_metrics().increment("retries_total", backend=backend)
+        print(
+            f"{backend} call failed ({error}), retrying in {wait_time:.0f} seconds "
+            f"({attempt + 1}/{self.max_retries})."
+        )
+        self.backoff(backend, wait_time)
+        return wait_time
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Decide how long to wait before retrying a failed call.
+
+        Returns:
+            Seconds to wait, or None if the call should not be retried
+        """
+        hint = check_time_in_string(str(error))
+        if hint == -1:
+            # Quota exhausted for days, retrying is pointless
+            return None
+        if hint is not None:
+            return float(hint)
+        if getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES:
+            return self.backoff_seconds * (2**attempt)
+        return None
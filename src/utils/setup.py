@@ -2,11 +2,33 @@
 Setup utilities for the Image File Namer application.
 """
 
+import importlib.util
 import subprocess
 import sys
+from pathlib import Path
 from typing import Optional
 
-import spacy
+
+def is_spacy_model_installed(model_name: str) -> bool:
+    """
+    Check whether a spaCy model is installed without loading it.
+
+    spaCy models are installed as Python packages (or given as a path to a model
+    directory), so looking up the package is enough and takes milliseconds
+    instead of the seconds ``spacy.load`` needs.
+
+    Args:
+        model_name: Name of the spaCy model package, or path to a model directory
+
+    Returns:
+        True if the model is available
+    """
+    if Path(model_name).is_dir():
+        return True
+    try:
+        return importlib.util.find_spec(model_name) is not None
+    except (ImportError, ValueError):
+        return False
 
 
 def download_spacy_model(model_name: str) -> Optional[int]:
@@ -19,30 +41,29 @@ def download_spacy_model(model_name: str) -> Optional[int]:
     Returns:
         0 on success, 1 on failure, None if user cancels
     """
-    try:
-        # Try to load the spaCy model to check if it's already installed
-        spacy.load(model_name)
+    if is_spacy_model_installed(model_name):
         print(f"Model {model_name} is already installed.")
         return 0
-    except OSError:
-        # If model is not installed, ask the user for permission to download
-        response = input(
-            f"Model {model_name} not found. Do you want to download it? (yes/no): "
-        )
-        if response.lower() == "yes":
-            try:
-                # Run the download command
-                subprocess.run(
-                    [sys.executable, "-m", "spacy", "download", model_name], check=True
-                )
-                print(f"Model {model_name} downloaded successfully.")
-                return 0
-            except subprocess.CalledProcessError as e:
-                print(f"Failed to download {model_name}: {str(e)}")
-                return 1
-        else:
-            print("Download cancelled.")
-            return None
+
+    # If model is not installed, ask the user for permission to download
+    response = input(
+        f"Model {model_name} not found. Do you want to download it? (yes/no): "
+    )
+    if response.lower() == "yes":
+        try:
+            # Run the download command
+            subprocess.run(
+                [sys.executable, "-m", "spacy", "download", model_name], check=True
+            )
+            importlib.invalidate_caches()
+            print(f"Model {model_name} downloaded successfully.")
+            return 0
+        except subprocess.CalledProcessError as e:
+            print(f"Failed to download {model_name}: {str(e)}")
+            return 1
+    else:
+        print("Download cancelled.")
+        return None
 
 
 def setup_dependencies():
@@ -3,38 +3,206 @@ Text processing and OCR utilities.
 """
 
 import re
-from typing import List
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
-from ..config import OCR_CORRECTIONS
+from ..config import ILLEGAL_CHARS, OCR_CORRECTIONS, TEXT_CLEANER_CACHE_SIZE
 
+# Numbers followed by K, M or h (number of likes, views or hours ago)
+_COUNTS = re.compile(r"\d+[KMh]")
+# Single characters that are not part of a word
+_SINGLE_CHARS = re.compile(r"\b\w\b")
+_REPEATED_WHITESPACE = re.compile(r"\s{2,}")
+_URLS = re.compile(r"https?://\S+")
+_MULTIPLE_SPACES = re.compile(r" +")
+_WHITESPACE_SPLIT = re.compile(r"(\s+)")
 
-def fix_common_ocr_mistakes(text: str) -> str:
+# Potential OCR gibberish
+_GIBBERISH = re.compile(
+    r"\b(?!\w*'[a-z])(([qxzj]{2,})|([bcdfghjklmnpqrstvwxyz]*[aeiouy]{3,}[bcdfghjklmnpqrstvwxyz]*)|([aeiouy]*[bcdfghjklmnpqrstvwxyz]{5,}[aeiouy]*))\b"
+)
+
+
+def _contains_whitespace(texts) -> bool:
+    return any(char.isspace() for text in texts for char in text)
+
+
+class OCRTextCleaner:
     """
-    Fix common OCR mistakes in text.
+    Compiled OCR text cleanup: gibberish removal, OCR corrections and illegal
+    character stripping.
+
+    ``clean`` gives the same result as
+    ``sanitize_filename_basic(fix_common_ocr_mistakes(remove_gibberish(text)))``
+    but splits the text into whitespace separated tokens once and cleans every
+    distinct token only once. All cleanup steps only look inside a token, so
+    only the whitespace between the tokens needs handling. Long OCR dumps of
+    scrolled screenshots repeat the same tokens a lot, which the per-token
+    cache turns into dictionary lookups.
+    """
+
+    def __init__(
+        self,
+        corrections: Optional[Dict[str, str]] = None,
+        illegal_chars: str = ILLEGAL_CHARS,
+        cache_size: int = TEXT_CLEANER_CACHE_SIZE,
+    ):
+        """
+        Args:
+            corrections: Mapping of OCR mistakes to their corrections
+                (defaults to OCR_CORRECTIONS)
+            illegal_chars: Characters stripped from filenames
+            cache_size: Number of cleaned tokens kept
+        """
+        self.corrections = dict(OCR_CORRECTIONS if corrections is None else corrections)
+        self._illegal_table = str.maketrans("", "", illegal_chars)
+        # Corrections or illegal characters with whitespace would make the steps
+        # reach across tokens, so fall back to cleaning the text as a whole
+        self.tokenwise = not _contains_whitespace(
+            [*self.corrections, *self.corrections.values(), illegal_chars]
+        )
+        self._clean_token = lru_cache(maxsize=cache_size)(self._clean_token)
+
+    def fix_common_ocr_mistakes(self, text: str) -> str:
+        """Fix common OCR mistakes in text, see fix_common_ocr_mistakes()."""
+        text = self._fix_token(text)
+
+        # Remove more than 1 consecutive space
+        text = _REPEATED_WHITESPACE.sub(" ", text).strip()
+
+        # Remove string beginning with https or http
+        return _URLS.sub("", text)
+
+    def remove_gibberish(self, text: str) -> str:
+        """Remove potential OCR gibberish from text, see remove_gibberish()."""
+        matches = []
+        cleaned_text = _GIBBERISH.sub(self._collector(matches), text)
+        if matches:
+            print("Potential OCR gibberish detected:", matches)
+        return cleaned_text.strip()
+
+    def clean(self, text: str) -> str:
+        """
+        Remove gibberish, fix OCR mistakes and strip illegal filename characters.
+
+        Args:
+            text: Text to clean, e.g. keywords and OCR words
+
+        Returns:
+            Cleaned text
+        """
+        if not self.tokenwise:
+            fixed = self.fix_common_ocr_mistakes(self.remove_gibberish(text))
+            cleaned = _MULTIPLE_SPACES.sub(" ", fixed.translate(self._illegal_table))
+            return cleaned.strip()
+
+        parts = _WHITESPACE_SPLIT.split(text)
+        matches = []
+        result = []
+        # Whitespace since the last token that survived the OCR fixes, and the
+        # (collapsed) whitespace since the last token that survived everything
+        whitespace = ""
+        pending = []
+        fixed_before = False
+
+        for index in range(0, len(parts), 2):
+            if index:
+                whitespace += parts[index - 1]
+            token = parts[index]
+            if not token:
+                continue
+
+            gibberish, fixed, cleaned = self._clean_token(token)
+            matches.extend(gibberish)
+            if not fixed:
+                continue
+
+            # fix_common_ocr_mistakes collapses runs of 2+ whitespace characters
+            if fixed_before:
+                pending.append(" " if len(whitespace) >= 2 else whitespace)
+            fixed_before = True
+            whitespace = ""
+            if not cleaned:
+                continue
+
+            # sanitize_filename_basic collapses runs of spaces only
+            if result:
+                result.append(_MULTIPLE_SPACES.sub(" ", "".join(pending)))
+            pending = []
+            result.append(cleaned)
+
+        if matches:
+            print("Potential OCR gibberish detected:", matches)
+        return "".join(result)
+
+    def _clean_token(self, token: str) -> Tuple[Tuple[tuple, ...], str, str]:
+        """
+        Clean a single token.
+
+        Returns:
+            Tuple of (gibberish matches, token after gibberish removal and the
+            OCR fixes, token after URL and illegal character removal as well)
+        """
+        matches = []
+        token = _GIBBERISH.sub(self._collector(matches), token)
+        fixed = self._fix_token(token)
+        cleaned = _URLS.sub("", fixed).translate(self._illegal_table)
+        return tuple(matches), fixed, cleaned
+
+    def _fix_token(self, text: str) -> str:
+        """Apply the corrections and remove counts and single characters."""
+        # Apply predefined corrections
+        for mistake, correction in self.corrections.items():
+            if mistake in text:
+                text = text.replace(mistake, correction)
+
+        # Remove string of numbers followed by either K or M (for number of likes, views or hours ago)
+        text = _COUNTS.sub("", text)
+
+        # Remove single characters that are not part of a word
+        return _SINGLE_CHARS.sub("", text)
+
+    @staticmethod
+    def _collector(matches: List[tuple]):
+        """Replacement function removing a match and recording its groups."""
+
+        def collect(match):
+            matches.append(match.groups(""))
+            return ""
+
+        return collect
+
+
+_default_cleaner = OCRTextCleaner()
+
+
+def clean_ocr_text(text: str) -> str:
+    """
+    Remove gibberish, fix common OCR mistakes and strip illegal filename characters.
+
+    Same result as ``sanitize_filename_basic(fix_common_ocr_mistakes(remove_gibberish(text)))``
+    in a single pass over the tokens of the text.
 
     Args:
-        text: Text with potential OCR mistakes
+        text: Text to clean
 
     Returns:
-        Text with common mistakes corrected
+        Cleaned text
     """
-    # Apply predefined corrections
-    for mistake, correction in OCR_CORRECTIONS.items():
-        text = text.replace(mistake, correction)
+    return _default_cleaner.clean(text)
 
-    # Remove string of numbers followed by either K or M (for number of likes, views or hours ago)
-    text = re.sub(r"\d+[KMh]", "", text)
 
-    # Remove single characters that are not part of a word
-    text = re.sub(r"\b\w\b", "", text)
-
-    # Remove more than 1 consecutive space
-    text = re.sub(r"\s{2,}", " ", text).strip()
+def fix_common_ocr_mistakes(text: str) -> str:
+    """
+    Fix common OCR mistakes in text.
 
-    # Remove string beginning with https or http
-    text = re.sub(r"https?://\S+", "", text)
+    Args:
+        text: Text with potential OCR mistakes
 
-    return text
+    Returns:
+        Text with common mistakes corrected
+    """
+    return _default_cleaner.fix_common_ocr_mistakes(text)
 
 
 def remove_gibberish(text: str) -> str:
@@ -47,14 +215,4 @@ def remove_gibberish(text: str) -> str:
     Returns:
         Text with gibberish removed
     """
-    # Regex pattern for potential OCR gibberish
-    pattern = r"\b(?!\w*'[a-z])(([qxzj]{2,})|([bcdfghjklmnpqrstvwxyz]*[aeiouy]{3,}[bcdfghjklmnpqrstvwxyz]*)|([aeiouy]*[bcdfghjklmnpqrstvwxyz]{5,}[aeiouy]*))\b"
-
-    # Finding matches
-    matches = re.findall(pattern, text)
-    if matches:
-        print("Potential OCR gibberish detected:", matches)
-
-    # Removing gibberish
-    cleaned_text = re.sub(pattern, "", text)
-    return cleaned_text.strip()
+    return _default_cleaner.remove_gibberish(text)
@@ -0,0 +1,227 @@
+"""
+Compiled word lists with hot reload.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple, Union
+
+from ..config import WORDLIST_RELOAD_CHECK_SECONDS
+from .file_utils import load_words_from_file
+
+
+def _is_word_char(char: str) -> bool:
+    """Whether a character counts as a word character for regex \\b."""
+    return char.isalnum() or char == "_"
+
+
+def _at_boundary(text: str, index: int) -> bool:
+    """Whether regex \\b would match at a position of the text."""
+    before = index > 0 and _is_word_char(text[index - 1])
+    after = index < len(text) and _is_word_char(text[index])
+    return before != after
+
+
+class PhraseAutomaton:
+    """
+    Aho-Corasick automaton finding many phrases in one pass over a text.
+
+    Matching is case-insensitive: phrases and texts are lowercased.
+    """
+
+    def __init__(self, phrases):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[str, ...]] = [()]
+
+        for phrase in {phrase.lower() for phrase in phrases if phrase}:
+            node = 0
+            for char in phrase:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                node = next_node
+            self._output[node] += (phrase,)
+
+        # Breadth-first construction of the failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] += self._output[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Find all occurrences of the phrases in an already lowercased text.
+
+        Args:
+            text: Lowercased text to search
+
+        Returns:
+            Iterator of (start, end, phrase) tuples
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for phrase in output[node]:
+                yield index + 1 - len(phrase), index + 1, phrase
+
+
+class WordList:
+    """
+    A word list file, compiled into a set and a phrase matcher.
+
+    The file is re-read only when its modification time or size changes, which
+    is checked at most every WORDLIST_RELOAD_CHECK_SECONDS, so long-running
+    processes pick up edits without a restart.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._checked = 0.0
+        # Snapshot replaced as a whole on reload: (words, lowercased, automaton,
+        # lowercased -> original spellings)
+        self._compiled = self._compile(set())
+        self._load(self._stat())
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _compile(words):
+        originals: Dict[str, List[str]] = {}
+        for word in words:
+            originals.setdefault(word.lower(), []).append(word)
+        return (
+            frozenset(words),
+            frozenset(originals),
+            PhraseAutomaton(originals),
+            originals,
+        )
+
+    def _load(self, signature: Optional[Tuple[int, int]]):
+        if signature is None:
+            if self._signature is not None or not self._checked:
+                print(f"File '{self.path}' not found.")
+            words = set()
+        else:
+            words = load_words_from_file(str(self.path)) or set()
+        self._compiled = self._compile(words)
+        self._signature = signature
+        self._checked = time.monotonic()
+
+    def refresh(self) -> bool:
+        """
+        Reload the file if it changed on disk.
+
+        Returns:
+            True if the word list was reloaded
+        """
+        if time.monotonic() - self._checked < WORDLIST_RELOAD_CHECK_SECONDS:
+            return False
+        with self._lock:
+            signature = self._stat()
+            self._checked = time.monotonic()
+            if signature == self._signature:
+                return False
+            self._load(signature)
+            return True
+
+    @property
+    def words(self) -> FrozenSet[str]:
+        """The words as written in the file."""
+        self.refresh()
+        return self._compiled[0]
+
+    @property
+    def lowered(self) -> FrozenSet[str]:
+        """The lowercased words."""
+        self.refresh()
+        return self._compiled[1]
+
+    def find_words(self, text: str) -> List[str]:
+        """
+        Find the words that occur in a text as whole words.
+
+        Equivalent to searching ``\\b<word>\\b`` case-insensitively for every word,
+        but in a single pass over the text.
+
+        Args:
+            text: Text to search
+
+        Returns:
+            Matching words as written in the file
+        """
+        self.refresh()
+        _, _, automaton, originals = self._compiled
+        text = text.lower()
+        found = {}
+        for start, end, phrase in automaton.iter_matches(text):
+            if phrase in found:
+                continue
+            if _at_boundary(text, start) and _at_boundary(text, end):
+                found[phrase] = originals[phrase]
+        return [word for words in found.values() for word in words]
+
+    def find_substrings(self, text: str) -> List[str]:
+        """
+        Find the words that occur anywhere in a text, case-insensitively.
+
+        Args:
+            text: Text to search
+
+        Returns:
+            Matching words as written in the file
+        """
+        self.refresh()
+        _, _, automaton, originals = self._compiled
+        found = {}
+        for _, _, phrase in automaton.iter_matches(text.lower()):
+            found.setdefault(phrase, originals[phrase])
+        return [word for words in found.values() for word in words]
+
+
+_registry: Dict[str, WordList] = {}
+_registry_lock = threading.Lock()
+
+
+def get_wordlist(path: Union[str, Path]) -> WordList:
+    """
+    Get the shared compiled word list for a file.
+
+    Every caller in the process gets the same WordList, so it is compiled once
+    and NERProcessor and FilenameBuilder always see the same version.
+
+    Args:
+        path: Path to the word list file
+
+    Returns:
+        The WordList for the file
+    """
+    key = os.path.abspath(path)
+    with _registry_lock:
+        wordlist = _registry.get(key)
+        if wordlist is None:
+            wordlist = _registry[key] = WordList(path)
+        return wordlist
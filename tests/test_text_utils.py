@@ -0,0 +1,144 @@
+"""
+Equivalence tests for the OCR text cleanup engine and the word removal in
+FilenameBuilder.sanitize_filename.
+
+Both were rewritten for speed; the previous implementations are kept as
+references in benchmarks/bench_text_cleanup.py and benchmarks/bench_sanitize.py
+and the new code must give byte-identical output, including what it prints.
+"""
+
+import random
+
+import pytest
+
+from benchmarks.bench_sanitize import legacy_sanitize_filename, make_texts, random_word
+from benchmarks.bench_text_cleanup import (
+    legacy_clean,
+    legacy_fix_common_ocr_mistakes,
+    legacy_remove_gibberish,
+    ocr_dump,
+    quietly,
+    random_text,
+)
+from benchmarks.corpus import generate_ocr_texts
+from src.config import ILLEGAL_CHARS, OCR_CORRECTIONS
+from src.core.filename_builder import FilenameBuilder
+from src.utils import (
+    OCRTextCleaner,
+    WordList,
+    clean_ocr_text,
+    fix_common_ocr_mistakes,
+    remove_gibberish,
+)
+
+# A correction containing a space makes OCRTextCleaner clean whole texts
+FALLBACK_CORRECTIONS = {**OCR_CORRECTIONS, "Mr.Smith": "Mr. Smith", "O Anon": "QAnon"}
+
+EDGE_CASES = [
+    "",
+    " ",
+    "\n",
+    "a",
+    "x y z",
+    "  Trurnp  ",
+    # Whitespace runs of every kind between, before and after tokens
+    "news \t\n views",
+    "the  news\n\n\nto\t\tday ",
+    "\n\n Trurnp \t OAnon \n\n",
+    "1K\n\n2M",
+    "word   word word",
+    # URLs, alone, glued to other text and followed by whitespace runs
+    "https://a.b c",
+    "see https://t.co/Xyz123\n\nfor more",
+    "5http://a.b http://x.y/z?q=1  end",
+    "https://example.com/a_b-c.html",
+    # Corrections, including ones next to punctuation and whitespace
+    "Mr.Smith met Mr. Smith",
+    "O Anon and OAnon",
+    "Trurnp's exarnple,darnage",
+    # Tokens made entirely of illegal characters
+    ILLEGAL_CHARS,
+    "news — • views",
+    "<<>> ## @@ headline $$ %%",
+    "a ... b ::: c",
+    "|||| ~~ »» ©",
+    # Gibberish next to words that must survive
+    "zzqq queue strngths rhythm don't it's aeiou",
+]
+
+
+def corpus_texts():
+    """Generated OCR texts, random token soups and edge cases."""
+    rng = random.Random(0)
+    texts = generate_ocr_texts(100, seed=0)
+    texts += [random_text(rng) for _ in range(500)]
+    texts.append(ocr_dump(rng, 200))
+    return texts + EDGE_CASES
+
+
+TEXTS = corpus_texts()
+
+
+def assert_same(expected_func, actual_func, texts):
+    """Compare return values and printed output of two functions on all texts."""
+    mismatches = [
+        text for text in texts if quietly(expected_func, text) != quietly(actual_func, text)
+    ]
+    assert not mismatches, f"{len(mismatches)} texts differ, e.g. {mismatches[0]!r}"
+
+
+def test_clean_matches_legacy_chain():
+    cleaner = OCRTextCleaner()
+    assert cleaner.tokenwise
+    assert_same(legacy_clean, cleaner.clean, TEXTS)
+
+
+def test_clean_ocr_text_matches_legacy_chain():
+    # Twice, so the second pass goes through the token cache
+    assert_same(legacy_clean, clean_ocr_text, TEXTS)
+    assert_same(legacy_clean, clean_ocr_text, TEXTS)
+
+
+def test_clean_fallback_matches_legacy_chain():
+    cleaner = OCRTextCleaner(corrections=FALLBACK_CORRECTIONS)
+    assert not cleaner.tokenwise
+    assert_same(
+        lambda text: legacy_clean(text, FALLBACK_CORRECTIONS), cleaner.clean, TEXTS
+    )
+
+
+def test_illegal_whitespace_falls_back():
+    assert not OCRTextCleaner(illegal_chars=ILLEGAL_CHARS + " ").tokenwise
+
+
+@pytest.mark.parametrize(
+    "legacy, current",
+    [
+        (legacy_remove_gibberish, remove_gibberish),
+        (legacy_fix_common_ocr_mistakes, fix_common_ocr_mistakes),
+    ],
+)
+def test_single_steps_match_legacy(legacy, current):
+    assert_same(legacy, current, TEXTS)
+
+
+@pytest.mark.parametrize("size", [10, 500])
+def test_sanitize_filename_matches_legacy(tmp_path, size):
+    rng = random.Random(size)
+    vocabulary = list({random_word(rng) for _ in range(size * 2)})
+    stopwords = rng.sample(vocabulary, size)
+    # Phrase entries still go through a regex each
+    stopwords += ["new york", "o'brien"]
+    path = tmp_path / "words_to_remove.txt"
+    path.write_text("\n".join(stopwords), encoding="utf-8")
+
+    builder = FilenameBuilder()
+    builder._words_to_remove = WordList(path)
+    words_to_remove = builder.words_to_remove
+    texts = make_texts(rng, vocabulary + ["New York", "O'Brien"], 200)
+    texts += ["", "  ", "New  York new york", "O'Brien's " * 3, "a-b c.d e_f"]
+
+    for text in texts:
+        assert builder.sanitize_filename(text) == legacy_sanitize_filename(
+            text, words_to_remove
+        ), text